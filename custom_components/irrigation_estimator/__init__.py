@@ -1,23 +1,65 @@
 """The Irrigation Estimator integration."""
 
+from functools import partial
+
+from homeassistant.components.recorder import get_instance
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.typing import ConfigType
+
+from . import websocket_api
+from .audit_log import DailyAuditLog, get_audit_log_path
+from .const import DOMAIN, PLATFORMS, SIGNAL_ENGINE_UPDATED
+from .engine import CalculationEngine
+from .services import async_setup_services
+from .statistics import MEAN_STATISTICS, SUM_STATISTICS, get_statistic_id
 
-from .const import PLATFORMS
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up integration wide services."""
+    async_setup_services(hass)
+    websocket_api.async_setup(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
+    entry.runtime_data = CalculationEngine(hass, entry)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    # Not left to an entity, live states are held until the restore is done
+    entry.runtime_data.async_schedule_history_restore()
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+    # Let subscribers drop the entry, it is no longer loaded by then
+    entry.async_on_unload(
+        partial(async_dispatcher_send, hass, SIGNAL_ENGINE_UPDATED, entry.entry_id)
+    )
     return True
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await hass.config_entries.async_reload(entry.entry_id)
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options, reload the entry only if sensors changed."""
+    engine: CalculationEngine = entry.runtime_data
+    if not engine.async_apply_options():
+        await hass.config_entries.async_reload(entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Handle removal of an entry."""
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove data stored for the entry."""
+    audit_log = DailyAuditLog(get_audit_log_path(hass, entry.entry_id))
+    await hass.async_add_executor_job(audit_log.remove)
+    if "recorder" in hass.config.components:
+        get_instance(hass).async_clear_statistics(
+            [
+                get_statistic_id(entry.entry_id, key)
+                for key in (*SUM_STATISTICS, *MEAN_STATISTICS)
+            ]
+        )
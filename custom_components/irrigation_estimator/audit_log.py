@@ -0,0 +1,207 @@
+"""Append-only log of daily calculations."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+import datetime
+import math
+import mmap
+import os
+import struct
+from typing import NamedTuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .const import DOMAIN
+
+AUDIT_LOG_MAGIC = b"IEAL"
+AUDIT_LOG_VERSION = 2
+
+# magic, format version, record size
+_HEADER = struct.Struct("<4sHH8x")
+# day ordinal, computed at (unix time), duration (s), 9 inputs, 5 outputs
+_RECORD = struct.Struct("<idf14f")
+
+
+class AuditRecord(NamedTuple):
+    """Inputs, outputs and timing of one daily calculation."""
+
+    date: datetime.date
+    computed_at: datetime.datetime
+    duration: float
+    temp_min: float | None
+    temp_max: float | None
+    rh_min: float | None
+    rh_max: float | None
+    mean_pressure: float | None
+    mean_wind: float | None
+    mean_radiation: float | None
+    sunshine_hours: float | None
+    precipitation: float | None
+    evapotranspiration: float | None
+    evapotranspiration_tall: float | None
+    bucket_delta: float | None
+    bucket: float | None
+    runtime: float | None
+
+
+def _pack(record: AuditRecord) -> bytes:
+    return _RECORD.pack(
+        record.date.toordinal(),
+        record.computed_at.timestamp(),
+        record.duration,
+        *(math.nan if value is None else value for value in record[3:]),
+    )
+
+
+def _unpack(buffer, offset: int) -> AuditRecord:
+    ordinal, computed_at, duration, *values = _RECORD.unpack_from(buffer, offset)
+    return AuditRecord(
+        datetime.date.fromordinal(ordinal),
+        datetime.datetime.fromtimestamp(computed_at, tz=datetime.UTC),
+        duration,
+        *(None if math.isnan(value) else value for value in values),
+    )
+
+
+def get_audit_log_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Return location of the audit log of a config entry."""
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry_id}.audit")
+
+
+class DailyAuditLog:
+    """Fixed-width binary records, one per daily calculation.
+
+    Records are appended in date order, so reads can bisect the memory-mapped
+    file by date. All methods do blocking I/O and must run in an executor.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the log."""
+        self.path = path
+        self._last_ordinal: int | None = None
+
+    @contextmanager
+    def _map(self) -> Iterator[mmap.mmap | None]:
+        with ExitStack() as stack:
+            try:
+                file = stack.enter_context(open(self.path, "rb"))
+            except FileNotFoundError:
+                yield None
+                return
+            if os.fstat(file.fileno()).st_size < _HEADER.size:
+                yield None
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                self._check_header(buffer)
+                yield buffer
+
+    @staticmethod
+    def _check_header(buffer) -> None:
+        magic, version, record_size = _HEADER.unpack_from(buffer)
+        if magic != AUDIT_LOG_MAGIC or record_size != _RECORD.size:
+            raise ValueError("Not an audit log")
+        if version != AUDIT_LOG_VERSION:
+            raise ValueError(f"Unsupported audit log version {version}")
+
+    @staticmethod
+    def _count(buffer) -> int:
+        return (len(buffer) - _HEADER.size) // _RECORD.size
+
+    @staticmethod
+    def _ordinal_at(buffer, index: int) -> int:
+        return struct.unpack_from("<i", buffer, _HEADER.size + index * _RECORD.size)[0]
+
+    def _slice(self, buffer, start: int, end: int) -> list[AuditRecord]:
+        return [
+            _unpack(buffer, _HEADER.size + index * _RECORD.size)
+            for index in range(start, end)
+        ]
+
+    def append(self, record: AuditRecord) -> None:
+        """Append a record, dates must not go backwards.
+
+        Reads ignore a record partially written before a crash, it is cut
+        off here so the new record stays aligned.
+        """
+        if self._last_ordinal is None and (last := self.last()) is not None:
+            self._last_ordinal = last.date.toordinal()
+        ordinal = record.date.toordinal()
+        if self._last_ordinal is not None and ordinal < self._last_ordinal:
+            raise ValueError(f"Record for {record.date} is older than the last one")
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "ab") as file:
+            size = file.tell()
+            if size < _HEADER.size:
+                file.truncate(0)
+                file.write(
+                    _HEADER.pack(AUDIT_LOG_MAGIC, AUDIT_LOG_VERSION, _RECORD.size)
+                )
+            elif partial := (size - _HEADER.size) % _RECORD.size:
+                file.truncate(size - partial)
+            file.write(_pack(record))
+        self._last_ordinal = ordinal
+
+    def __len__(self) -> int:
+        """Return number of records."""
+        with self._map() as buffer:
+            return 0 if buffer is None else self._count(buffer)
+
+    def get(self, day: datetime.date) -> AuditRecord | None:
+        """Return the latest record of a day."""
+        with self._map() as buffer:
+            if buffer is None:
+                return None
+            index = bisect_right(
+                range(self._count(buffer)),
+                day.toordinal(),
+                key=lambda i: self._ordinal_at(buffer, i),
+            )
+            if index == 0 or self._ordinal_at(buffer, index - 1) != day.toordinal():
+                return None
+            return _unpack(buffer, _HEADER.size + (index - 1) * _RECORD.size)
+
+    def read(
+        self,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+    ) -> list[AuditRecord]:
+        """Return records between start and end dates, both inclusive."""
+        with self._map() as buffer:
+            if buffer is None:
+                return []
+            count = self._count(buffer)
+            first = 0
+            last = count
+            if start is not None:
+                first = bisect_left(
+                    range(count),
+                    start.toordinal(),
+                    key=lambda i: self._ordinal_at(buffer, i),
+                )
+            if end is not None:
+                last = bisect_right(
+                    range(count),
+                    end.toordinal(),
+                    key=lambda i: self._ordinal_at(buffer, i),
+                )
+            return self._slice(buffer, first, last)
+
+    def last(self) -> AuditRecord | None:
+        """Return the most recent record."""
+        with self._map() as buffer:
+            if buffer is None or (count := self._count(buffer)) == 0:
+                return None
+            return _unpack(buffer, _HEADER.size + (count - 1) * _RECORD.size)
+
+    def remove(self) -> None:
+        """Delete the log file."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self._last_ordinal = None
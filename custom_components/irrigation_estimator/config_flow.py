@@ -15,7 +15,9 @@ from homeassistant.const import (
 )
 from homeassistant.helpers import selector
 from homeassistant.helpers.schema_config_entry_flow import (
+    SchemaCommonFlowHandler,
     SchemaConfigFlowHandler,
+    SchemaFlowError,
     SchemaFlowFormStep,
     SchemaFlowMenuStep,
 )
@@ -24,26 +26,50 @@ import voluptuous as vol
 from .const import (
     CONF_ACCURATE_SOLAR_RADIATION,
     CONF_AREA,
+    CONF_COMPACT,
+    CONF_CREATE_DEVICE,
+    CONF_ET_MODEL,
+    CONF_FALLBACK_POLICY,
     CONF_FLOW,
+    CONF_MAXIMUM_CYCLE,
     CONF_MAXIMUM_DURATION,
+    CONF_MINIMUM_COVERAGE,
     CONF_NUMBER_OF_SPRINKLERS,
     CONF_PRECIPITATION_SENSOR_TYPE,
+    CONF_REFERENCE_CROP,
     CONF_SENSOR_HUMIDITY,
     CONF_SENSOR_PRECIPITATION,
     CONF_SENSOR_PRESSURE,
     CONF_SENSOR_SOLAR_RADIATION,
     CONF_SENSOR_TEMPERATURE,
     CONF_SENSOR_WINDSPEED,
+    CONF_SOAK_TIME,
     CONF_SOLAR_RADIATION_THRESHOLD,
+    CONF_WEATHER_ENTITY,
     CONF_WIND_MEASUREMENT_HEIGHT,
+    DEFAULT_ET_MODEL,
+    DEFAULT_FALLBACK_POLICY,
+    DEFAULT_MAXIMUM_CYCLE,
     DEFAULT_MAXIMUM_DURATION,
+    DEFAULT_MINIMUM_COVERAGE,
+    DEFAULT_REFERENCE_CROP,
+    DEFAULT_SOAK_TIME,
     DEFAULT_SOLAR_RADIATION_THRESHOLD,
     DOMAIN,
+    MODEL_FAO56,
+    MODEL_HARGREAVES,
+    MODEL_PRIESTLEY_TAYLOR,
     NAME,
+    OPTION_CARRY_FORWARD,
     OPTION_CUMULATIVE,
+    OPTION_ESTIMATE,
+    OPTION_GRASS,
     OPTION_HOURLY,
+    OPTION_SKIP,
+    OPTION_TALL,
     VOLUME_FLOW_RATE_LITRES_PER_MINUTE,
 )
+from .models import MODELS
 
 OPTIONS_SCHEMA = vol.Schema(
     {
@@ -66,17 +92,20 @@ OPTIONS_SCHEMA = vol.Schema(
                 mode=selector.NumberSelectorMode.BOX,
             ),
         ),
-        vol.Required(CONF_SENSOR_TEMPERATURE): selector.EntitySelector(
-            selector.EntitySelectorConfig(domain=Platform.SENSOR),
+        vol.Optional(CONF_WEATHER_ENTITY): selector.EntitySelector(
+            selector.EntitySelectorConfig(domain=Platform.WEATHER),
         ),
-        vol.Required(CONF_SENSOR_HUMIDITY): selector.EntitySelector(
-            selector.EntitySelectorConfig(domain=Platform.SENSOR),
+        vol.Optional(CONF_SENSOR_TEMPERATURE): selector.EntitySelector(
+            selector.EntitySelectorConfig(domain=Platform.SENSOR, multiple=True),
         ),
-        vol.Required(CONF_SENSOR_PRESSURE): selector.EntitySelector(
-            selector.EntitySelectorConfig(domain=Platform.SENSOR),
+        vol.Optional(CONF_SENSOR_HUMIDITY): selector.EntitySelector(
+            selector.EntitySelectorConfig(domain=Platform.SENSOR, multiple=True),
         ),
-        vol.Required(CONF_SENSOR_WINDSPEED): selector.EntitySelector(
-            selector.EntitySelectorConfig(domain=Platform.SENSOR),
+        vol.Optional(CONF_SENSOR_PRESSURE): selector.EntitySelector(
+            selector.EntitySelectorConfig(domain=Platform.SENSOR, multiple=True),
+        ),
+        vol.Optional(CONF_SENSOR_WINDSPEED): selector.EntitySelector(
+            selector.EntitySelectorConfig(domain=Platform.SENSOR, multiple=True),
         ),
         vol.Required(CONF_WIND_MEASUREMENT_HEIGHT): selector.NumberSelector(
             selector.NumberSelectorConfig(
@@ -86,7 +115,7 @@ OPTIONS_SCHEMA = vol.Schema(
                 mode=selector.NumberSelectorMode.BOX,
             ),
         ),
-        vol.Required(CONF_SENSOR_SOLAR_RADIATION): selector.EntitySelector(
+        vol.Optional(CONF_SENSOR_SOLAR_RADIATION): selector.EntitySelector(
             selector.EntitySelectorConfig(domain=Platform.SENSOR),
         ),
         vol.Required(
@@ -117,6 +146,68 @@ OPTIONS_SCHEMA = vol.Schema(
                 mode=selector.SelectSelectorMode.DROPDOWN,
             ),
         ),
+        vol.Required(
+            CONF_MINIMUM_COVERAGE,
+            default=DEFAULT_MINIMUM_COVERAGE,
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=24,
+                step=PRECISION_WHOLE,
+                unit_of_measurement=UnitOfTime.HOURS,
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_FALLBACK_POLICY,
+            default=DEFAULT_FALLBACK_POLICY,
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[
+                    selector.SelectOptionDict(value=OPTION_SKIP, label="skip"),
+                    selector.SelectOptionDict(
+                        value=OPTION_CARRY_FORWARD, label="carry forward"
+                    ),
+                    selector.SelectOptionDict(
+                        value=OPTION_ESTIMATE, label="estimate from temperature"
+                    ),
+                ],
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            ),
+        ),
+        vol.Required(
+            CONF_REFERENCE_CROP,
+            default=DEFAULT_REFERENCE_CROP,
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[
+                    selector.SelectOptionDict(value=OPTION_GRASS, label="grass"),
+                    selector.SelectOptionDict(
+                        value=OPTION_TALL, label="tall crop (alfalfa)"
+                    ),
+                ],
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            ),
+        ),
+        vol.Required(
+            CONF_ET_MODEL,
+            default=DEFAULT_ET_MODEL,
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[
+                    selector.SelectOptionDict(
+                        value=MODEL_FAO56, label="FAO-56 Penman-Monteith"
+                    ),
+                    selector.SelectOptionDict(
+                        value=MODEL_PRIESTLEY_TAYLOR, label="Priestley-Taylor"
+                    ),
+                    selector.SelectOptionDict(
+                        value=MODEL_HARGREAVES, label="Hargreaves-Samani"
+                    ),
+                ],
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            ),
+        ),
         vol.Required(
             CONF_MAXIMUM_DURATION,
             default=DEFAULT_MAXIMUM_DURATION,
@@ -128,9 +219,56 @@ OPTIONS_SCHEMA = vol.Schema(
                 mode=selector.NumberSelectorMode.BOX,
             ),
         ),
+        vol.Required(
+            CONF_MAXIMUM_CYCLE,
+            default=DEFAULT_MAXIMUM_CYCLE,
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                step=PRECISION_WHOLE,
+                unit_of_measurement=UnitOfTime.SECONDS,
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_SOAK_TIME,
+            default=DEFAULT_SOAK_TIME,
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                step=PRECISION_WHOLE,
+                unit_of_measurement=UnitOfTime.SECONDS,
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(CONF_COMPACT, default=False): selector.BooleanSelector(),
+        vol.Required(CONF_CREATE_DEVICE, default=False): selector.BooleanSelector(),
     }
 )
 
+
+async def validate_sources(
+    handler: SchemaCommonFlowHandler, user_input: dict[str, Any]
+) -> dict[str, Any]:
+    """Require a sensor for every quantity of the ET model.
+
+    Quantities the weather entity provides need none, solar radiation is
+    not one of them.
+    """
+    quantities = MODELS[user_input.get(CONF_ET_MODEL, DEFAULT_ET_MODEL)].quantities
+    required = [CONF_SENSOR_SOLAR_RADIATION]
+    if not user_input.get(CONF_WEATHER_ENTITY):
+        required += [
+            CONF_SENSOR_TEMPERATURE,
+            CONF_SENSOR_HUMIDITY,
+            CONF_SENSOR_PRESSURE,
+            CONF_SENSOR_WINDSPEED,
+        ]
+    if not all(user_input.get(key) for key in required if key in quantities):
+        raise SchemaFlowError("missing_source")
+    return user_input
+
+
 CONFIG_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_NAME, default=NAME): selector.TextSelector(
@@ -140,11 +278,11 @@ CONFIG_SCHEMA = vol.Schema(
 ).extend(OPTIONS_SCHEMA.schema)
 
 CONFIG_FLOW: dict[str, SchemaFlowFormStep | SchemaFlowMenuStep] = {
-    "user": SchemaFlowFormStep(CONFIG_SCHEMA)
+    "user": SchemaFlowFormStep(CONFIG_SCHEMA, validate_user_input=validate_sources)
 }
 
 OPTIONS_FLOW: dict[str, SchemaFlowFormStep | SchemaFlowMenuStep] = {
-    "init": SchemaFlowFormStep(OPTIONS_SCHEMA)
+    "init": SchemaFlowFormStep(OPTIONS_SCHEMA, validate_user_input=validate_sources)
 }
 
 
@@ -17,6 +17,13 @@ PLATFORMS = [Platform.SENSOR]
 ATTR_THROUGHPUT = "throughput"
 ATTR_PRECIPITATION_RATE = "precipitation_rate"
 ATTR_PRECIPITATION = "precipitation"
+ATTR_EVAPOTRANSPIRATION = "evapotranspiration"
+ATTR_EVAPOTRANSPIRATION_TODAY = "evapotranspiration_today"
+ATTR_EVAPOTRANSPIRATION_TALL = "evapotranspiration_tall"
+ATTR_MEAN_EVAPOTRANSPIRATION = "mean_evapotranspiration"
+ATTR_BUCKET_DELTA = "bucket_delta"
+ATTR_BUCKET = "bucket"
+ATTR_RUNTIME = "runtime"
 ATTR_MIN_TEMP = "min_temp"
 ATTR_MAX_TEMP = "max_temp"
 ATTR_MIN_RH = "min_rh"
@@ -25,15 +32,32 @@ ATTR_MEAN_WIND = "mean_wind"
 ATTR_MEAN_PRESSURE = "mean_pressure"
 ATTR_SUNSHINE_HOURS = "sunshine_hours"
 ATTR_MEAN_RADIATION = "mean_radiation"
+ATTR_HISTORY_RESTORED = "history_restored"
+ATTR_QUEUE_DEPTH = "queue_depth"
+ATTR_COVERAGE = "coverage"
+ATTR_QUALITY = "quality"
+ATTR_ET_MODEL = "et_model"
+ATTR_WINDOWS = "windows"
+ATTR_TRACKERS = "trackers"
+ATTR_DATE = "date"
 
 # Configuration and options
 CONF_NUMBER_OF_SPRINKLERS = "number_of_sprinklers"
 CONF_FLOW = "flow"
 CONF_AREA = "area"
 CONF_MAXIMUM_DURATION = "maximum_duration"
+CONF_MAXIMUM_CYCLE = "maximum_cycle"
+CONF_SOAK_TIME = "soak_time"
 CONF_WIND_MEASUREMENT_HEIGHT = "wind_meas_height"
+CONF_MINIMUM_COVERAGE = "minimum_coverage"
+CONF_FALLBACK_POLICY = "fallback_policy"
+CONF_REFERENCE_CROP = "reference_crop"
+CONF_ET_MODEL = "et_model"
+CONF_COMPACT = "compact"
+CONF_CREATE_DEVICE = "create_device"
 
 # Sensors settings
+CONF_WEATHER_ENTITY = "weather_entity"
 CONF_SENSOR_TEMPERATURE = "sensor_temperature"
 CONF_SENSOR_HUMIDITY = "sensor_humidity"
 CONF_SENSOR_PRESSURE = "sensor_pressure"
@@ -46,23 +70,72 @@ CONF_PRECIPITATION_SENSOR_TYPE = "precipitation_sensor_type"
 
 # Entities
 ENTITY_EVAPOTRANSPIRATION = "Evapotranspiration"
+ENTITY_EVAPOTRANSPIRATION_TODAY = "Evapotranspiration today"
+ENTITY_EVAPOTRANSPIRATION_TALL = "Tall reference evapotranspiration"
 ENTITY_RUNTIME = "Run time"
 ENTITY_BUCKET = "Bucket"
 ENTITY_BUCKET_DELTA = "Bucket delta"
+ENTITY_MIN_TEMP = "Minimum temperature"
+ENTITY_MAX_TEMP = "Maximum temperature"
+ENTITY_MIN_RH = "Minimum humidity"
+ENTITY_MAX_RH = "Maximum humidity"
+ENTITY_MEAN_WIND = "Mean wind speed"
+ENTITY_MEAN_PRESSURE = "Mean pressure"
+ENTITY_MEAN_RADIATION = "Mean solar radiation"
+ENTITY_SUNSHINE_HOURS = "Sunshine hours"
+ENTITY_QUEUE_DEPTH = "Calculation queue"
+ENTITY_ZONE = "Zone"
 
 # Selector values
 OPTION_CUMULATIVE = "cumulative"
 OPTION_HOURLY = "hourly"
+OPTION_SKIP = "skip"
+OPTION_CARRY_FORWARD = "carry_forward"
+OPTION_ESTIMATE = "estimate"
+OPTION_GRASS = "grass"
+OPTION_TALL = "tall"
+
+# ET models, best first
+MODEL_FAO56 = "fao56"
+MODEL_PRIESTLEY_TAYLOR = "priestley_taylor"
+MODEL_HARGREAVES = "hargreaves"
 
 # Services
 SERVICE_RESET_BUCKET = "reset_bucket"
 SERVICE_FORCE_DAILY_UPDATE = "force_daily_update"
+SERVICE_SCHEDULE = "schedule"
+SERVICE_WHAT_IF = "what_if"
+SERVICE_PROFILE = "profile"
+SERVICE_GET_STATUS = "get_status"
+
+# Service fields
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_MAX_FLOW = "max_flow"
+ATTR_START = "start"
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_ALBEDO = "albedo"
+ATTR_SECONDS = "seconds"
+ATTR_TOP = "top"
+
+# Dispatcher signals
+SIGNAL_ENGINE_UPDATED = f"{DOMAIN}_engine_updated"
 
 # UNITS
 VOLUME_FLOW_RATE_LITRES_PER_MINUTE = "l/min"
 
 # OPTIONS DEFAULTS
 DEFAULT_MAXIMUM_DURATION = 0  # seconds
+DEFAULT_MAXIMUM_CYCLE = 0  # seconds
+DEFAULT_SOAK_TIME = 0  # seconds
 DEFAULT_SOLAR_RADIATION_THRESHOLD = 3500
+DEFAULT_ALBEDO = 0.23
+DEFAULT_MINIMUM_COVERAGE = 12  # hours, entries without the option use 0
+DEFAULT_FALLBACK_POLICY = OPTION_CARRY_FORWARD
+DEFAULT_REFERENCE_CROP = OPTION_GRASS
+DEFAULT_ET_MODEL = MODEL_FAO56
+
+# Threads shared by the calculations of all entries
+WORKER_POOL_SIZE = 2
 
 CONVERT_W_M2_TO_MJ_M2_DAY = 0.0864
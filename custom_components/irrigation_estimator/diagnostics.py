@@ -0,0 +1,22 @@
+"""Diagnostics support for Irrigation Estimator."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .engine import CalculationEngine
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    engine: CalculationEngine = entry.runtime_data
+    return {
+        "options": dict(entry.options or entry.data),
+        "results": engine.as_dict(),
+        "worker_pool": engine.worker_pool.as_dict(),
+    }
@@ -0,0 +1,1315 @@
+"""Calculation engine shared by the sensors of a config entry."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import datetime
+from functools import partial
+import heapq
+import logging
+import math
+import time
+from typing import Any
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.components.weather import (
+    ATTR_WEATHER_HUMIDITY,
+    ATTR_WEATHER_PRESSURE,
+    ATTR_WEATHER_PRESSURE_UNIT,
+    ATTR_WEATHER_TEMPERATURE,
+    ATTR_WEATHER_TEMPERATURE_UNIT,
+    ATTR_WEATHER_WIND_SPEED,
+    ATTR_WEATHER_WIND_SPEED_UNIT,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    ATTR_UNIT_OF_MEASUREMENT,
+    CONF_ELEVATION,
+    CONF_LATITUDE,
+    CONF_LONGITUDE,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+    UnitOfLength,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+    UnitOfVolumetricFlux,
+)
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_change,
+)
+from homeassistant.helpers.start import async_at_started
+import homeassistant.util.dt as dt_util
+from homeassistant.util.unit_conversion import (
+    DistanceConverter,
+    PressureConverter,
+    SpeedConverter,
+    TemperatureConverter,
+)
+import numpy as np
+
+from .audit_log import AuditRecord, DailyAuditLog, get_audit_log_path
+from .const import (
+    ATTR_BUCKET,
+    ATTR_BUCKET_DELTA,
+    ATTR_ET_MODEL,
+    ATTR_EVAPOTRANSPIRATION,
+    ATTR_EVAPOTRANSPIRATION_TALL,
+    ATTR_EVAPOTRANSPIRATION_TODAY,
+    ATTR_HISTORY_RESTORED,
+    ATTR_PRECIPITATION,
+    ATTR_QUALITY,
+    ATTR_RUNTIME,
+    ATTR_WINDOWS,
+    CONF_ACCURATE_SOLAR_RADIATION,
+    CONF_AREA,
+    CONF_COMPACT,
+    CONF_CREATE_DEVICE,
+    CONF_ET_MODEL,
+    CONF_FALLBACK_POLICY,
+    CONF_FLOW,
+    CONF_MAXIMUM_CYCLE,
+    CONF_MAXIMUM_DURATION,
+    CONF_MINIMUM_COVERAGE,
+    CONF_NUMBER_OF_SPRINKLERS,
+    CONF_PRECIPITATION_SENSOR_TYPE,
+    CONF_REFERENCE_CROP,
+    CONF_SENSOR_HUMIDITY,
+    CONF_SENSOR_PRECIPITATION,
+    CONF_SENSOR_PRESSURE,
+    CONF_SENSOR_SOLAR_RADIATION,
+    CONF_SENSOR_TEMPERATURE,
+    CONF_SENSOR_WINDSPEED,
+    CONF_SOAK_TIME,
+    CONF_SOLAR_RADIATION_THRESHOLD,
+    CONF_WEATHER_ENTITY,
+    CONF_WIND_MEASUREMENT_HEIGHT,
+    DEFAULT_ALBEDO,
+    DEFAULT_ET_MODEL,
+    DEFAULT_FALLBACK_POLICY,
+    DEFAULT_MAXIMUM_CYCLE,
+    DEFAULT_REFERENCE_CROP,
+    DEFAULT_SOAK_TIME,
+    DOMAIN,
+    MODEL_HARGREAVES,
+    OPTION_CUMULATIVE,
+    OPTION_ESTIMATE,
+    OPTION_HOURLY,
+    OPTION_SKIP,
+    OPTION_TALL,
+    SIGNAL_ENGINE_UPDATED,
+)
+from .helpers import (
+    HourlyCoverage,
+    MinMaxAvgTracker,
+    RateIntegrator,
+    ReorderBuffer,
+    SunshineTracker,
+    TrackerSummary,
+    daylight_hours,
+    estimate_hargreaves_daily,
+    get_config_value,
+    summarize_values,
+)
+from .history_reader import reduce_history
+from .models import (
+    TALL_REFERENCE_RATIO,
+    DailyWeather,
+    EtModel,
+    lighter_models,
+    select_model,
+)
+from .series import DailySeries
+from .statistics import async_add_statistics, build_statistics
+from .whatif import (
+    evaluate_grid,
+    mean_by_day,
+    radiation_samples,
+    sunshine_hours_by_threshold,
+)
+from .worker_pool import async_get_worker_pool
+
+_LOGGER = logging.getLogger(__name__)
+
+# How long states are held back to put late ones in order
+REORDER_WINDOW = datetime.timedelta(seconds=5)
+# How long a sensor holding its value still covers the hours after its last report
+STEADY_SENSOR_WINDOW = datetime.timedelta(hours=3)
+# Longest outage replayed from the recorder at startup
+MAX_CATCH_UP_DAYS = 31
+
+# Options deciding the subscriptions and entities, changing one reloads the entry
+RELOAD_OPTIONS = (
+    CONF_WEATHER_ENTITY,
+    CONF_SENSOR_TEMPERATURE,
+    CONF_SENSOR_HUMIDITY,
+    CONF_SENSOR_PRESSURE,
+    CONF_SENSOR_WINDSPEED,
+    CONF_SENSOR_SOLAR_RADIATION,
+    CONF_ACCURATE_SOLAR_RADIATION,
+    CONF_SENSOR_PRECIPITATION,
+    CONF_PRECIPITATION_SENSOR_TYPE,
+    CONF_COMPACT,
+    CONF_CREATE_DEVICE,
+    CONF_ET_MODEL,
+)
+
+# Attributes of a weather entity that can stand in for a sensor, with units
+WEATHER_ATTRIBUTES = {
+    CONF_SENSOR_TEMPERATURE: (ATTR_WEATHER_TEMPERATURE, ATTR_WEATHER_TEMPERATURE_UNIT),
+    CONF_SENSOR_HUMIDITY: (ATTR_WEATHER_HUMIDITY, None),
+    CONF_SENSOR_PRESSURE: (ATTR_WEATHER_PRESSURE, ATTR_WEATHER_PRESSURE_UNIT),
+    CONF_SENSOR_WINDSPEED: (ATTR_WEATHER_WIND_SPEED, ATTR_WEATHER_WIND_SPEED_UNIT),
+}
+
+
+@dataclass(frozen=True)
+class _ClosedDay:
+    """Inputs of a day swapped out of the engine at rollover."""
+
+    date: datetime.date
+    inputs: tuple
+    # Quantities with data covering the minimum hours
+    quantities: frozenset[str]
+    precipitation: float
+
+
+class CalculationEngine:
+    """Listens to sensors and makes backend calculations."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        clock: Callable[[], datetime.datetime] = dt_util.utcnow,
+    ) -> None:
+        """Initialize the ET calculation engine.
+
+        clock returns the current time in UTC. It only decides when held back
+        states are released and when an idle day is closed, everything else
+        follows the last_updated timestamps of the states.
+        """
+        self.hass = hass
+        self._clock = clock
+        self._config_entry = config_entry
+        self._latitude = hass.config.as_dict().get(CONF_LATITUDE)
+        self._longitude = hass.config.as_dict().get(CONF_LONGITUDE)
+        self._elevation = hass.config.as_dict().get(CONF_ELEVATION)
+
+        self._read_options()
+        self._reload_values = self._option_values(RELOAD_OPTIONS)
+        self._precipitation_sensor_type = get_config_value(
+            config_entry, CONF_PRECIPITATION_SENSOR_TYPE
+        )
+        self._accurate_solar_radiation = get_config_value(
+            config_entry, CONF_ACCURATE_SOLAR_RADIATION
+        )
+
+        self._sensors = {
+            CONF_SENSOR_TEMPERATURE: get_config_value(
+                config_entry, CONF_SENSOR_TEMPERATURE
+            ),
+            CONF_SENSOR_HUMIDITY: get_config_value(config_entry, CONF_SENSOR_HUMIDITY),
+            CONF_SENSOR_PRESSURE: get_config_value(config_entry, CONF_SENSOR_PRESSURE),
+            CONF_SENSOR_WINDSPEED: get_config_value(
+                config_entry, CONF_SENSOR_WINDSPEED
+            ),
+            CONF_SENSOR_SOLAR_RADIATION: get_config_value(
+                config_entry, CONF_SENSOR_SOLAR_RADIATION
+            ),
+            CONF_SENSOR_PRECIPITATION: get_config_value(
+                config_entry, CONF_SENSOR_PRECIPITATION
+            ),
+        }
+        # The configured ET model first, then the lighter ones it degrades to
+        self._models = lighter_models(
+            get_config_value(config_entry, CONF_ET_MODEL, DEFAULT_ET_MODEL)
+        )
+        self._quantities = self._models[0].quantities
+        # Sensors of quantities no model needs are not listened to
+        for key in self._sensors:
+            if key != CONF_SENSOR_PRECIPITATION and key not in self._quantities:
+                self._sensors[key] = None
+        self._weather_entity = get_config_value(config_entry, CONF_WEATHER_ENTITY)
+        # Quantities without a sensor of their own come from the weather entity
+        self._weather_quantities = tuple(
+            key
+            for key in WEATHER_ATTRIBUTES
+            if self._weather_entity
+            and key in self._quantities
+            and not self._sensors[key]
+        )
+        # Redundant sensors of a quantity are fused into its tracker
+        self._quantities_by_entity = {
+            entity_id: key
+            for key in reversed(self._sensors)
+            for entity_id in self._entities(key)
+        }
+        self._entity_ids = list(
+            dict.fromkeys(
+                entity_id for key in self._sensors for entity_id in self._entities(key)
+            )
+        )
+        if self._weather_quantities:
+            self._entity_ids.append(self._weather_entity)
+
+        self.sunshine_tracker = SunshineTracker(
+            self._solar_radiation_threshold)
+        self.solar_radiation_tracker = MinMaxAvgTracker()
+        self.temp_tracker = MinMaxAvgTracker()
+        self.wind_tracker = MinMaxAvgTracker()
+        self.rh_tracker = MinMaxAvgTracker()
+        self.pressure_tracker = MinMaxAvgTracker()
+        self.precipitation_integrator = RateIntegrator()
+        self.coverage = {
+            key: HourlyCoverage()
+            for key in (
+                CONF_SENSOR_TEMPERATURE,
+                CONF_SENSOR_HUMIDITY,
+                CONF_SENSOR_PRESSURE,
+                CONF_SENSOR_WINDSPEED,
+                CONF_SENSOR_SOLAR_RADIATION,
+            )
+            if key in self._quantities
+        }
+        self.quality: float | None = None
+        # Model that computed the last day's ETo
+        self.et_model: str | None = None
+
+        self.evapotranspiration = 0
+        self.evapotranspiration_tall = 0
+        self.precipitation = 0.0
+        self.bucket_delta = 0.0
+        self.bucket = 0.0
+        self.runtime = 0
+        self.evapotranspiration_today: float | None = None
+        self._live_eto_inputs: tuple | None = None
+        self._live_eto_model: str | None = None
+        self._live_eto_rate = 0.0
+
+        self._audit_log = DailyAuditLog(
+            get_audit_log_path(hass, config_entry.entry_id))
+        self._period_start = dt_util.as_local(clock())
+        self._reorder = ReorderBuffer()
+        self._live_since: datetime.datetime | None = None
+        # Live states wait in the reorder buffer until history is restored
+        self._hold_states = True
+        self._history_restored = asyncio.Event()
+        self._daily_lock = asyncio.Lock()
+        # Results of the last days, for rolling totals
+        self.series = DailySeries()
+        # Last published day, running sums before and after it
+        self._statistics: tuple[datetime.date, dict, dict] | None = None
+        # Last logged day at startup
+        self._last_logged: asyncio.Future[AuditRecord | None] | None = None
+        self.worker_pool = async_get_worker_pool(hass)
+
+        self._listeners: dict[CALLBACK_TYPE, CALLBACK_TYPE] = {}
+        self._unsub_status: CALLBACK_TYPE | None = None
+        self._unsub_time: CALLBACK_TYPE | None = None
+        self._unsub_update_entities: CALLBACK_TYPE | None = None
+
+    def _read_options(self) -> None:
+        """Read the options that can change while the engine runs."""
+        config_entry = self._config_entry
+        self.number_of_sprinklers = get_config_value(
+            config_entry, CONF_NUMBER_OF_SPRINKLERS
+        )
+        self.flow = get_config_value(config_entry, CONF_FLOW)
+        self.throughput = self.number_of_sprinklers * self.flow
+        self.area = get_config_value(config_entry, CONF_AREA)
+        self.precipitation_rate = round((self.throughput * 60) / self.area, 2)
+        self._solar_radiation_threshold = get_config_value(
+            config_entry, CONF_SOLAR_RADIATION_THRESHOLD
+        )
+        self.maximum_duration = get_config_value(
+            config_entry, CONF_MAXIMUM_DURATION)
+        self.maximum_cycle = get_config_value(
+            config_entry, CONF_MAXIMUM_CYCLE, DEFAULT_MAXIMUM_CYCLE
+        )
+        self.soak_time = get_config_value(
+            config_entry, CONF_SOAK_TIME, DEFAULT_SOAK_TIME)
+        self._wind_meas_height = get_config_value(
+            config_entry, CONF_WIND_MEASUREMENT_HEIGHT
+        )
+        # Entries from before the option keep the ungated behavior
+        self._minimum_coverage = get_config_value(
+            config_entry, CONF_MINIMUM_COVERAGE, 0
+        )
+        self._fallback_policy = get_config_value(
+            config_entry, CONF_FALLBACK_POLICY, DEFAULT_FALLBACK_POLICY
+        )
+        self._reference_crop = get_config_value(
+            config_entry, CONF_REFERENCE_CROP, DEFAULT_REFERENCE_CROP
+        )
+
+    def _option_values(self, keys: Iterable[str]) -> tuple:
+        return tuple(get_config_value(self._config_entry, key) for key in keys)
+
+    @callback
+    def async_apply_options(self) -> bool:
+        """Apply changed options to the running engine, keeping its state.
+
+        Returns False if an option in RELOAD_OPTIONS changed, the entry must
+        then be reloaded.
+        """
+        if self._option_values(RELOAD_OPTIONS) != self._reload_values:
+            return False
+        self._read_options()
+        self.sunshine_tracker.radiation_watermark = self._solar_radiation_threshold
+        self._update_runtime()
+        # Wind measurement height may have changed
+        self._live_eto_inputs = None
+        self._async_update_listeners()
+        return True
+
+    @callback
+    def _subscribe_events(self):
+        self._unsubscribe_events()
+        self._live_since = self._clock()
+        self._unsub_status = async_track_state_change_event(
+            self.hass, self._entity_ids, self._async_sensor_state_listener
+        )
+        self._unsub_time = async_track_time_change(
+            self.hass,
+            self._async_midnight,
+            hour=0,
+            minute=0,
+            second=10,
+        )
+        self._unsub_update_entities = async_track_time_change(
+            self.hass,
+            self._async_update_entities,
+            second=40,
+        )
+        if self._precipitation_sensor_type == OPTION_HOURLY:
+            # Nothing is known about the rate while we were not listening
+            self.precipitation_integrator.reset()
+            new_state = self.hass.states.get(
+                self._sensors[CONF_SENSOR_PRECIPITATION])
+            if new_state is not None and new_state.state not in (
+                STATE_UNAVAILABLE,
+                STATE_UNKNOWN,
+            ):
+                self.precipitation_integrator.update(
+                    _to_millimeters_per_hour(
+                        float(new_state.state),
+                        new_state.attributes.get(ATTR_UNIT_OF_MEASUREMENT),
+                    ),
+                    self._clock(),
+                )
+
+    @callback
+    def _unsubscribe_events(self):
+        self._async_release_states(None)
+        if self._unsub_status:
+            self._unsub_status()
+            self._unsub_status = None
+        if self._unsub_time:
+            self._unsub_time()
+            self._unsub_time = None
+        if self._unsub_update_entities:
+            self._unsub_update_entities()
+            self._unsub_update_entities = None
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE):
+        """Subscribe to updates."""
+        subscribe = not self._listeners
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.pop(remove_listener)
+            if not self._listeners:
+                self._unsubscribe_events()
+
+        self._listeners[remove_listener] = update_callback
+        if subscribe:
+            self._subscribe_events()
+
+        return remove_listener
+
+    @callback
+    def _async_update_listeners(self):
+        self.worker_pool.run_profiled(self._notify_listeners)
+
+    def _notify_listeners(self):
+        for update_callback in list(self._listeners.values()):
+            update_callback()
+        async_dispatcher_send(
+            self.hass, SIGNAL_ENGINE_UPDATED, self._config_entry.entry_id
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return current results."""
+        return {
+            ATTR_EVAPOTRANSPIRATION: self.evapotranspiration,
+            ATTR_EVAPOTRANSPIRATION_TODAY: self.evapotranspiration_today,
+            ATTR_EVAPOTRANSPIRATION_TALL: self.evapotranspiration_tall,
+            ATTR_PRECIPITATION: self.precipitation,
+            ATTR_BUCKET_DELTA: self.bucket_delta,
+            ATTR_BUCKET: self.bucket,
+            ATTR_RUNTIME: self.runtime,
+            ATTR_HISTORY_RESTORED: self.history_restored,
+            ATTR_QUALITY: self.quality,
+            ATTR_ET_MODEL: self.et_model,
+            ATTR_WINDOWS: self.series.as_dict(),
+        }
+
+    @callback
+    def _async_sensor_state_listener(self, event: Event):
+        new_state = event.data.get("new_state")
+        if new_state is None or new_state.state in (
+            STATE_UNKNOWN,
+            STATE_UNAVAILABLE,
+            None,
+        ):
+            return
+        self._reorder.push(new_state.last_updated, new_state)
+        self._async_release_states(self._clock() - REORDER_WINDOW)
+
+    @callback
+    def async_ingest_states(self, states: Iterable[State]) -> None:
+        """Ingest states right away, in the order of their timestamps.
+
+        Used to replay or backfill states.
+        """
+        for state in states:
+            if state.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE, None):
+                self._reorder.push(state.last_updated, state)
+        self._async_release_states(None)
+
+    @callback
+    def _async_release_states(self, timestamp: datetime.datetime | None) -> None:
+        """Ingest held back states older than timestamp, or all of them."""
+        if self._hold_states and timestamp is not None:
+            return
+        if states := self._reorder.pop_before(timestamp):
+            self.worker_pool.run_profiled(self._ingest_states, states)
+
+    def _ingest_states(self, states: list[State]) -> None:
+        for new_state in states:
+            if new_state.last_updated < self._period_start:
+                _LOGGER.debug("Dropping %s, its day is already closed", new_state)
+                continue
+            while new_state.last_updated >= self._period_end:
+                self._async_close_day(self._period_end)
+            self._ingest_state(new_state)
+
+    def _ingest_state(self, new_state: State) -> None:
+        for key, value, unit in self._state_values(new_state):
+            self._ingest_value(key, value, unit, new_state.last_updated)
+
+    def _state_values(self, state: State) -> list[tuple[str, float, str | None]]:
+        """Return the quantities a state carries, none if one is not numeric.
+
+        Only reads the configuration, so it is safe in the worker pool.
+        """
+        values: list[tuple[str, float, str | None]] = []
+        try:
+            if state.entity_id == self._weather_entity and self._weather_quantities:
+                # Every quantity the weather entity stands in for, in one pass
+                values += _weather_values(state, self._weather_quantities)
+            if (key := self._quantities_by_entity.get(state.entity_id)) is not None:
+                values.append(
+                    (
+                        key,
+                        float(state.state),
+                        state.attributes.get(ATTR_UNIT_OF_MEASUREMENT),
+                    )
+                )
+        except (TypeError, ValueError):
+            _LOGGER.warning("Skipping %s, it is not numeric", state)
+            return []
+        return values
+
+    def _ingest_value(
+        self, key: str, value: float, unit: str | None, timestamp: datetime.datetime
+    ) -> None:
+        if (coverage := self.coverage.get(key)) is not None:
+            coverage.mark(dt_util.as_local(timestamp).hour)
+
+        if key == CONF_SENSOR_TEMPERATURE:
+            self.temp_tracker.update(_convert(key, value, unit))
+        elif key == CONF_SENSOR_HUMIDITY:
+            self.rh_tracker.update(value)
+        elif key == CONF_SENSOR_WINDSPEED:
+            self.wind_tracker.update(_convert(key, value, unit))
+        elif key == CONF_SENSOR_PRESSURE:
+            self.pressure_tracker.update(_convert(key, value, unit))
+        elif key == CONF_SENSOR_SOLAR_RADIATION:
+            if self._accurate_solar_radiation:
+                self.solar_radiation_tracker.update(value)
+            else:
+                self.sunshine_tracker.update(value, timestamp)
+        elif key == CONF_SENSOR_PRECIPITATION:
+            if self._precipitation_sensor_type == OPTION_CUMULATIVE:
+                self.precipitation = DistanceConverter.convert(
+                    value, unit, UnitOfLength.MILLIMETERS
+                )
+            elif self._precipitation_sensor_type == OPTION_HOURLY:
+                self.precipitation += self.precipitation_integrator.update(
+                    _to_millimeters_per_hour(value, unit), timestamp
+                )
+
+    def _entities(self, key: str) -> list[str]:
+        """Return the sensors configured for a quantity."""
+        return cv.ensure_list(self._sensors[key])
+
+    def _sources(self, key: str) -> list[str]:
+        """Return the entities a quantity is read from."""
+        if key in self._weather_quantities:
+            return [self._weather_entity]
+        return self._entities(key)
+
+    @callback
+    def _mark_steady_sensors(self, now: datetime.datetime) -> None:
+        """Cover the hour for sensors holding a recent valid value.
+
+        A sensor whose value does not change fires no events, yet its value
+        is still known, e.g. solar radiation at night. Only
+        STEADY_SENSOR_WINDOW after its last report, changed or not, is
+        credited, so a sensor that stopped reporting does not cover the whole
+        day. Nothing is credited while a missed day may be replayed.
+        """
+        if self._hold_states:
+            return
+        for key, coverage in self.coverage.items():
+            for entity_id in self._sources(key):
+                state = self.hass.states.get(entity_id)
+                if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+                    continue
+                if now - state.last_reported > STEADY_SENSOR_WINDOW:
+                    continue
+                if (
+                    key in self._weather_quantities
+                    and state.attributes.get(WEATHER_ATTRIBUTES[key][0]) is None
+                ):
+                    continue
+                coverage.mark(now.hour)
+                break
+
+    async def _async_update_entities(self, _):
+        now = dt_util.as_local(self._clock())
+        self._async_release_states(now - REORDER_WINDOW)
+        self._mark_steady_sensors(now)
+        await self._async_update_live_eto(now)
+        self._async_update_listeners()
+
+    async def _async_update_live_eto(self, now: datetime.datetime) -> None:
+        """Estimate ETo of the running day, assuming the rest of it looks alike.
+
+        Runs once a minute. The daily rate is only recomputed, in the worker
+        pool, when a tracker moved meaningfully, otherwise it is just scaled
+        by the elapsed time. The best model the day's data supports so far is
+        used. Nothing is estimated while a missed day may be replayed.
+        """
+        if self._hold_states:
+            return
+        inputs = self._weather_inputs()
+        if (model := select_model(self._available_quantities(), self._models)) is None:
+            self._live_eto_inputs = None
+            self.evapotranspiration_today = None
+            return
+
+        start = dt_util.start_of_local_day(now)
+        elapsed = (now - start) / (
+            dt_util.start_of_local_day(start + datetime.timedelta(days=1)) - start
+        )
+        if elapsed <= 0:
+            return
+
+        if (
+            self._live_eto_inputs is None
+            or self._live_eto_model != model.name
+            or not all(
+                (old is None and new is None)
+                or (
+                    old is not None
+                    and new is not None
+                    and math.isclose(old, new, rel_tol=0.01, abs_tol=0.1)
+                )
+                for old, new in zip(self._live_eto_inputs, inputs, strict=True)
+            )
+        ):
+            self._live_eto_inputs = inputs
+            self._live_eto_model = model.name
+            day_of_year = now.timetuple().tm_yday
+            *weather, sunshine_hours = inputs
+            sunshine_hours = min(
+                sunshine_hours / elapsed, daylight_hours(day_of_year, self._latitude)
+            )
+            rate, _ = await self.worker_pool.async_run(
+                "live_eto",
+                model.estimate,
+                DailyWeather(
+                    day_of_year,
+                    self._latitude,
+                    self._elevation,
+                    self._wind_meas_height,
+                    *weather,
+                    sunshine_hours,
+                ),
+            )
+            if self._live_eto_inputs is not inputs:
+                # The day rolled over meanwhile
+                return
+            self._live_eto_rate = rate
+        self.evapotranspiration_today = round(self._live_eto_rate * elapsed, 2)
+
+    @property
+    def period_start(self) -> datetime.datetime:
+        """Return start of the running day."""
+        return self._period_start
+
+    @property
+    def _period_end(self) -> datetime.datetime:
+        return dt_util.start_of_local_day(
+            self._period_start.date() + datetime.timedelta(days=1)
+        )
+
+    @callback
+    def _async_midnight(self, _) -> None:
+        if self._hold_states:
+            # The catch-up closes the days that ended meanwhile
+            return
+        now = self._clock()
+        # A state from after midnight may close the day already
+        self._async_release_states(now - REORDER_WINDOW)
+        if now >= self._period_end:
+            self._async_close_day(self._period_end)
+
+    async def async_update_daily(self) -> None:
+        """Close the running day now and perform daily calculations."""
+        if self._hold_states:
+            _LOGGER.warning(
+                "%s: history is being restored, the day is not closed",
+                self._config_entry.title,
+            )
+            return
+        await self._async_finish_day(self._close_day(self._clock()))
+
+    @callback
+    def _async_close_day(self, boundary: datetime.datetime) -> None:
+        """Close the running day at boundary, finish it in a task."""
+        self._config_entry.async_create_task(
+            self.hass,
+            self._async_finish_day(self._close_day(boundary)),
+            f"{DOMAIN} rollover {self._config_entry.entry_id}",
+        )
+
+    def _close_day(self, boundary: datetime.datetime) -> _ClosedDay:
+        """Swap the day's trackers for fresh ones, states up to boundary count."""
+        self._ingest_states(self._reorder.pop_before(boundary))
+        self.precipitation += self.precipitation_integrator.advance(boundary)
+        closed = _ClosedDay(
+            self._period_start.date(),
+            self._audit_inputs(),
+            self._available_quantities(self._minimum_coverage),
+            self.precipitation,
+        )
+        self.quality = self._quality()
+        self._reset_trackers()
+        self.precipitation = 0.0
+        self._period_start = dt_util.as_local(boundary)
+        self._live_eto_inputs = None
+        self.evapotranspiration_today = None
+        return closed
+
+    async def _async_finish_day(self, closed: _ClosedDay) -> None:
+        """Compute ETo and ETr of a closed day in the worker pool, update the bucket.
+
+        ETo comes from the best model the day's data supports, the fallback
+        policy applies if there is none or it fails. The day's precipitation
+        and record are never lost. The bucket is driven by the reference crop
+        of the entry. Days are finished in the order they were closed.
+        """
+        async with self._daily_lock:
+            started = time.perf_counter()
+            model = select_model(closed.quantities, self._models)
+            if model is None or not await self._async_run_model(model, closed):
+                await self._async_apply_fallback_policy(closed)
+            driver = (
+                self.evapotranspiration_tall
+                if self._reference_crop == OPTION_TALL
+                else self.evapotranspiration
+            )
+            self.bucket_delta = closed.precipitation - (driver or 0.0)
+            self.bucket += self.bucket_delta
+            self._update_runtime()
+            duration = time.perf_counter() - started
+
+            record = AuditRecord(
+                closed.date,
+                self._clock(),
+                duration,
+                *closed.inputs,
+                self.evapotranspiration,
+                self.evapotranspiration_tall,
+                self.bucket_delta,
+                self.bucket,
+                self.runtime,
+            )
+            await self.hass.async_add_executor_job(self._append_audit_record, record)
+            self.series.add_record(record)
+            if self._statistics is not None:
+                date, before, after = self._statistics
+                if record.date == date:
+                    self._async_publish_statistics(
+                        await self.async_read_audit_log(date, date), dict(before)
+                    )
+                else:
+                    self._async_publish_statistics([record], dict(after))
+            self._async_update_listeners()
+
+    async def _async_run_model(self, model: EtModel, closed: _ClosedDay) -> bool:
+        """Set ETo and ETr of a closed day from a model, False if it failed."""
+        try:
+            eto, etr = await self.worker_pool.async_run(
+                f"daily_{model.name}",
+                model.estimate,
+                DailyWeather(
+                    closed.date.timetuple().tm_yday,
+                    self._latitude,
+                    self._elevation,
+                    self._wind_meas_height,
+                    *closed.inputs[:8],
+                ),
+            )
+        except Exception:
+            _LOGGER.exception("%s failed for %s", model.name, closed.date)
+            return False
+        self.evapotranspiration = round(eto, 2)
+        self.evapotranspiration_tall = round(etr, 2)
+        self.et_model = model.name
+        return True
+
+    async def _async_apply_fallback_policy(self, closed: _ClosedDay) -> None:
+        """Set ETo of a closed day no model could compute."""
+        temp_c_min, temp_c_max = closed.inputs[:2]
+        if self._fallback_policy == OPTION_SKIP:
+            self.evapotranspiration = None
+            self.evapotranspiration_tall = None
+            self.et_model = None
+            return
+        if (
+            self._fallback_policy == OPTION_ESTIMATE
+            and temp_c_min is not None
+            and temp_c_max is not None
+        ):
+            try:
+                eto = await self.worker_pool.async_run(
+                    f"daily_{MODEL_HARGREAVES}",
+                    estimate_hargreaves_daily,
+                    closed.date.timetuple().tm_yday,
+                    self._latitude,
+                    temp_c_min,
+                    temp_c_max,
+                )
+            except Exception:
+                _LOGGER.exception(
+                    "Estimating ETo of %s from temperature failed", closed.date
+                )
+            else:
+                self.evapotranspiration = round(eto, 2)
+                self.evapotranspiration_tall = round(eto * TALL_REFERENCE_RATIO, 2)
+                self.et_model = MODEL_HARGREAVES
+                return
+        _LOGGER.debug(
+            "Not enough data for %s, keeping ETo of the previous day", closed.date
+        )
+
+    def _audit_inputs(self) -> tuple:
+        return (
+            self.temp_tracker.min,
+            self.temp_tracker.max,
+            self.rh_tracker.min,
+            self.rh_tracker.max,
+            self.pressure_tracker.avg,
+            self.wind_tracker.avg,
+            self.solar_radiation_tracker.avg,
+            self.sunshine_tracker.get_hours(),
+            self.precipitation,
+        )
+
+    def _append_audit_record(self, record: AuditRecord) -> None:
+        try:
+            self._audit_log.append(record)
+        except (OSError, ValueError) as err:
+            _LOGGER.error("Unable to write audit log %s: %s",
+                          self._audit_log.path, err)
+
+    async def async_load_series(self) -> None:
+        """Fill the daily series from the audit log."""
+        async with self._daily_lock:
+            series = DailySeries()
+            for record in await self.async_read_audit_log(
+                self._period_start.date()
+                - datetime.timedelta(days=series.capacity)
+            ):
+                series.add_record(record)
+            self.series = series
+
+    async def async_restore_results(
+        self, restored_at: datetime.datetime | None
+    ) -> bool:
+        """Take the results of the last logged day if they are newer.
+
+        restored_at is when the state an entity restored was last updated,
+        None if it has none. The state may be stale, e.g. of an entity unused
+        since switching to or from compact mode. Returns True if the logged
+        results were taken.
+        """
+        if self._last_logged is None:
+            # Read once for all entities restoring at startup
+            self._last_logged = self.hass.async_add_executor_job(self._audit_log.last)
+        last = await self._last_logged
+        if last is None or (restored_at is not None and restored_at >= last.computed_at):
+            return False
+        self.evapotranspiration = last.evapotranspiration
+        self.evapotranspiration_tall = last.evapotranspiration_tall
+        self.bucket_delta = last.bucket_delta
+        self.bucket = last.bucket
+        self.runtime = last.runtime
+        return True
+
+    async def async_import_statistics(self) -> None:
+        """Publish every logged day as external long-term statistics.
+
+        Rows of days published before are replaced, so this also imports
+        backfilled days in bulk.
+        """
+        async with self._daily_lock:
+            self._async_publish_statistics(await self.async_read_audit_log(), {})
+
+    @callback
+    def _async_publish_statistics(
+        self, records: list[AuditRecord], sums: dict[str, float]
+    ) -> None:
+        """Publish records in date order, sums are the totals before them."""
+        if not records or "recorder" not in self.hass.config.components:
+            return
+        date = records[-1].date
+        statistics = build_statistics(
+            (record for record in records if record.date < date), sums
+        )
+        before = dict(sums)
+        for key, rows in build_statistics(
+            (record for record in records if record.date == date), sums
+        ).items():
+            statistics[key] += rows
+        self._statistics = (date, before, sums)
+        async_add_statistics(self.hass, self._config_entry, statistics)
+
+    async def async_what_if(
+        self,
+        start: datetime.date | None,
+        end: datetime.date | None,
+        wind_meas_heights: list[float] | None = None,
+        albedos: list[float] | None = None,
+        thresholds: list[float] | None = None,
+        accurate: list[bool] | None = None,
+    ) -> dict[str, list]:
+        """Evaluate a grid of parameters over the logged days.
+
+        Days are evaluated with the models of the entry and the bucket is
+        driven by its reference crop. Sunshine hours for other thresholds and
+        missing mean radiation are derived from recorder history of the solar
+        radiation sensor.
+        """
+        wind_meas_heights = wind_meas_heights or [self._wind_meas_height]
+        albedos = albedos or [DEFAULT_ALBEDO]
+        thresholds = thresholds or [self._solar_radiation_threshold]
+        accurate = accurate or [self._accurate_solar_radiation]
+
+        records = await self.async_read_audit_log(start, end)
+        if not records:
+            return {}
+
+        sunshine = np.full((len(thresholds), len(records)), np.nan)
+        if not self._accurate_solar_radiation:
+            stored = [
+                np.nan if record.sunshine_hours is None else record.sunshine_hours
+                for record in records
+            ]
+            for index, threshold in enumerate(thresholds):
+                if threshold == self._solar_radiation_threshold:
+                    sunshine[index] = stored
+        mean_radiation = np.array(
+            [
+                np.nan if record.mean_radiation is None else record.mean_radiation
+                for record in records
+            ]
+        )
+
+        # Models without solar radiation leave no sensor to read history of
+        entity_id = self._sensors[CONF_SENSOR_SOLAR_RADIATION]
+        if (
+            entity_id
+            and "recorder" in self.hass.config.components
+            and (
+                (not all(accurate) and np.isnan(sunshine).any())
+                or (any(accurate) and np.isnan(mean_radiation).any())
+            )
+        ):
+            index_by_date = {record.date: i for i, record in enumerate(records)}
+            history_start = dt_util.start_of_local_day(records[0].date)
+            history_end = dt_util.start_of_local_day(
+                records[-1].date + datetime.timedelta(days=1)
+            )
+
+            states = (
+                await get_instance(self.hass).async_add_executor_job(
+                    partial(
+                        history.state_changes_during_period,
+                        self.hass,
+                        history_start,
+                        history_end,
+                        entity_id=entity_id,
+                        no_attributes=True,
+                    )
+                )
+            ).get(entity_id, [])
+            timestamps, values, day_index = await self.worker_pool.async_run(
+                "what_if_history", radiation_samples, states, index_by_date
+            )
+            sunshine = np.where(
+                np.isnan(sunshine),
+                sunshine_hours_by_threshold(
+                    timestamps, values, day_index, len(records), thresholds
+                ),
+                sunshine,
+            )
+            mean_radiation = np.where(
+                np.isnan(mean_radiation),
+                mean_by_day(values, day_index, len(records)),
+                mean_radiation,
+            )
+
+        return await self.worker_pool.async_run(
+            "what_if",
+            evaluate_grid,
+            records,
+            self._latitude,
+            self._elevation,
+            wind_meas_heights,
+            albedos,
+            thresholds,
+            accurate,
+            sunshine,
+            mean_radiation,
+            self._models,
+            self._reference_crop,
+        )
+
+    async def async_read_audit_log(
+        self,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+    ) -> list[AuditRecord]:
+        """Read logged daily calculations, without touching the recorder."""
+        return await self.hass.async_add_executor_job(
+            self._audit_log.read, start, end
+        )
+
+    def _update_runtime(self):
+        self.runtime = 0
+        if self.bucket is not None and self.bucket < 0:
+            self.runtime = abs(self.bucket) / self.precipitation_rate * 3600
+            if self.maximum_duration > 0:
+                self.runtime = min(self.maximum_duration, self.runtime)
+
+    def _available_quantities(self, minimum_hours: int = 0) -> frozenset[str]:
+        """Return quantities with data, covering at least minimum_hours.
+
+        A quantity without a single covered hour has no data, whatever the
+        minimum.
+        """
+        trackers = {
+            CONF_SENSOR_TEMPERATURE: self.temp_tracker,
+            CONF_SENSOR_HUMIDITY: self.rh_tracker,
+            CONF_SENSOR_PRESSURE: self.pressure_tracker,
+            CONF_SENSOR_WINDSPEED: self.wind_tracker,
+        }
+        return frozenset(
+            key
+            for key, coverage in self.coverage.items()
+            if coverage.hours >= max(minimum_hours, 1)
+            and (key not in trackers or trackers[key].is_tracking())
+        )
+
+    def _weather_inputs(self) -> tuple:
+        return (
+            self.temp_tracker.min,
+            self.temp_tracker.max,
+            self.rh_tracker.min,
+            self.rh_tracker.max,
+            self.pressure_tracker.avg,
+            self.wind_tracker.avg,
+            self.solar_radiation_tracker.avg,
+            self.sunshine_tracker.get_hours(),
+        )
+
+    def _quality(self) -> float:
+        """Return share of the day's hours covered by the inputs."""
+        return round(
+            sum(coverage.hours for coverage in self.coverage.values())
+            / (24 * len(self.coverage)),
+            2,
+        )
+
+    def _reset_trackers(self):
+        for coverage in self.coverage.values():
+            coverage.reset()
+        self.wind_tracker.reset()
+        self.temp_tracker.reset()
+        self.rh_tracker.reset()
+        self.pressure_tracker.reset()
+        self.sunshine_tracker.reset()
+        self.solar_radiation_tracker.reset()
+
+    @property
+    def history_restored(self) -> bool:
+        """Return True once trackers have been restored from history."""
+        return self._history_restored.is_set()
+
+    async def async_wait_history_restored(self) -> None:
+        """Wait until trackers have been restored from history."""
+        await self._history_restored.wait()
+
+    @callback
+    def async_schedule_history_restore(self) -> None:
+        """Restore trackers in the background once Home Assistant has started.
+
+        Called once the entities restored their state. Logged days are then
+        published as long-term statistics.
+        """
+
+        @callback
+        def _start(hass: HomeAssistant) -> None:
+            self._config_entry.async_create_background_task(
+                hass,
+                self._async_restore_history(),
+                f"{DOMAIN} restore history {self._config_entry.entry_id}",
+            )
+
+        self._config_entry.async_on_unload(async_at_started(self.hass, _start))
+
+    async def _async_restore_history(self) -> None:
+        await self.async_load_series()
+        try:
+            if not await self.async_catch_up():
+                await self.async_retrieve_history()
+        finally:
+            self._hold_states = False
+            self._async_release_states(self._clock() - REORDER_WINDOW)
+            self._history_restored.set()
+            self._async_update_listeners()
+        await self.async_import_statistics()
+
+    async def async_catch_up(self) -> bool:
+        """Replay what was missed since the last logged day from the recorder.
+
+        States of all sensors, from the start of the first missed day up to
+        the moment the engine subscribed, are read and parsed one day at a
+        time in the worker pool and ingested on the event loop, so every
+        missed day is closed and finished like a live one and the missed
+        hours of the running day are filled in. Trackers restored with the
+        sensors' state are discarded, the replay rebuilds them. Returns False if nothing was missed.
+        """
+        if "recorder" not in self.hass.config.components:
+            return False
+        last = await self.hass.async_add_executor_job(self._audit_log.last)
+        if last is None:
+            return False
+        first = last.date + datetime.timedelta(days=1)
+        today = self._period_start.date()
+        if dt_util.start_of_local_day(first) >= self._period_start:
+            return False
+        if (today - first).days > MAX_CATCH_UP_DAYS:
+            _LOGGER.warning(
+                "%s: no data since %s, only the last %d days are caught up",
+                self._config_entry.title,
+                last.date,
+                MAX_CATCH_UP_DAYS,
+            )
+            first = today - datetime.timedelta(days=MAX_CATCH_UP_DAYS)
+
+        if first < today:
+            _LOGGER.info(
+                "%s: catching up %d missed days",
+                self._config_entry.title,
+                (today - first).days,
+            )
+        end = self._live_since or self._clock()
+
+        self._reset_trackers()
+        self.precipitation = 0.0
+        self.precipitation_integrator.reset()
+        self._period_start = dt_util.start_of_local_day(first)
+        recorder = get_instance(self.hass)
+        # Held back live states are newer and follow the replayed ones
+        while (start := self._period_start) < end:
+            day_end = min(self._period_end, end)
+            states = await recorder.async_add_executor_job(
+                self.worker_pool.run_profiled,
+                partial(
+                    history.get_significant_states,
+                    self.hass,
+                    start,
+                    day_end,
+                    self._entity_ids,
+                    include_start_time_state=False,
+                    significant_changes_only=False,
+                ),
+            )
+            for key, value, unit, timestamp in await self.worker_pool.async_run(
+                "catch_up", self._replay_values, states, start, day_end
+            ):
+                self._ingest_value(key, value, unit, timestamp)
+            if day_end < self._period_end:
+                break
+            self._async_close_day(self._period_end)
+        while self._period_end <= self._clock():
+            self._async_close_day(self._period_end)
+        return True
+
+    def _replay_values(
+        self,
+        states: dict[str, list[State]],
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> list[tuple[str, float, str | None, datetime.datetime]]:
+        """Return values of recorded states between start and end, in order.
+
+        Runs in the worker pool and leaves the engine untouched, the values
+        are ingested on the event loop.
+        """
+        return [
+            (key, value, unit, state.last_updated)
+            for state in heapq.merge(
+                *states.values(), key=lambda state: state.last_updated
+            )
+            if start <= state.last_updated < end
+            and state.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE, None)
+            for key, value, unit in self._state_values(state)
+        ]
+
+    async def async_retrieve_history(self):
+        """Merge avg records from base sensor history into live values.
+
+        Live events are tracked from the moment the engine subscribed, so
+        history is only read up to that point. States are streamed and
+        reduced in the recorder executor, only the reduced values are merged
+        on the event loop.
+        """
+        if "recorder" not in self.hass.config.components:
+            return
+
+        start = dt_util.start_of_local_day(self._period_start)
+        end = self._live_since or self._clock()
+        if end <= start:
+            return
+
+        to_update = {
+            CONF_SENSOR_WINDSPEED: self.wind_tracker,
+            CONF_SENSOR_PRESSURE: self.pressure_tracker,
+        }
+        if self._accurate_solar_radiation:
+            to_update[CONF_SENSOR_SOLAR_RADIATION] = self.solar_radiation_tracker
+
+        if weather_keys := [key for key in to_update if key in self._weather_quantities]:
+            # Values are attributes, the weather entity is read once for all,
+            # including the updates that left its condition unchanged
+            weather_history = await get_instance(self.hass).async_add_executor_job(
+                self.worker_pool.run_profiled,
+                partial(
+                    history.get_significant_states,
+                    self.hass,
+                    start,
+                    end,
+                    [self._weather_entity],
+                    significant_changes_only=False,
+                ),
+            )
+            summaries = await self.worker_pool.async_run(
+                "history",
+                _summarize_weather_history,
+                weather_history.get(self._weather_entity, []),
+                weather_keys,
+            )
+            for key in weather_keys:
+                to_update.pop(key).merge(summaries[key])
+
+        # Every sensor is reduced in parallel, redundant ones are fused
+        sources = [
+            (key, entity_id)
+            for key in to_update
+            for entity_id in self._entities(key)
+        ]
+        recorder = get_instance(self.hass)
+        summaries = await asyncio.gather(
+            *(
+                recorder.async_add_executor_job(
+                    self.worker_pool.run_profiled,
+                    reduce_history,
+                    self.hass,
+                    entity_id,
+                    start,
+                    end,
+                )
+                for _, entity_id in sources
+            )
+        )
+        for (key, _), summary in zip(sources, summaries, strict=True):
+            to_update[key].merge(summary)
+
+
+def _convert(key: str, value: float, unit: str | None) -> float:
+    """Convert a value of a quantity to the unit the calculations use."""
+    if key == CONF_SENSOR_TEMPERATURE:
+        return TemperatureConverter.convert(value, unit, UnitOfTemperature.CELSIUS)
+    if key == CONF_SENSOR_WINDSPEED:
+        return SpeedConverter.convert(value, unit, UnitOfSpeed.METERS_PER_SECOND)
+    if key == CONF_SENSOR_PRESSURE:
+        return PressureConverter.convert(value, unit, UnitOfPressure.HPA)
+    return value
+
+
+def _weather_values(
+    state: State, keys: Iterable[str]
+) -> Iterable[tuple[str, float, str | None]]:
+    """Yield the quantities of keys carried by a weather entity state."""
+    for key in keys:
+        attribute, unit_attribute = WEATHER_ATTRIBUTES[key]
+        if (value := state.attributes.get(attribute)) is None:
+            continue
+        unit = state.attributes.get(unit_attribute) if unit_attribute else None
+        yield key, float(value), unit
+
+
+def _summarize_weather_history(
+    states: list[State], keys: list[str]
+) -> dict[str, TrackerSummary]:
+    """Reduce weather entity history to a summary per quantity."""
+    values: dict[str, list[float]] = {key: [] for key in keys}
+    for state in states:
+        for key, value, unit in _weather_values(state, keys):
+            values[key].append(_convert(key, value, unit))
+    return {key: summarize_values(key_values) for key, key_values in values.items()}
+
+
+def _to_millimeters_per_hour(value: float, unit: str | None) -> float:
+    """Convert a precipitation rate, length units are taken as per last hour."""
+    if unit in SpeedConverter.VALID_UNITS:
+        return SpeedConverter.convert(
+            value, unit, UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR
+        )
+    return DistanceConverter.convert(value, unit, UnitOfLength.MILLIMETERS)
+
+
@@ -1,20 +1,61 @@
 """Helper functions."""
 
-from datetime import UTC, datetime, timedelta, timezone
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import heapq
+import itertools
 from typing import Any
 
 import aquacropeto
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+import numpy as np
 
 from .const import CONVERT_W_M2_TO_MJ_M2_DAY
 
 
-def get_config_value(config_entry: ConfigEntry, key: str) -> Any:
+def get_config_value(config_entry: ConfigEntry, key: str, default: Any = None) -> Any:
     """Get val from options or initial config."""
     if config_entry.options:
-        return config_entry.options[key]
-    return config_entry.data[key]
+        return config_entry.options.get(key, default)
+    return config_entry.data.get(key, default)
+
+
+@dataclass(frozen=True, slots=True)
+class TrackerSummary:
+    """Min, max and weighted mean of a set of samples.
+
+    Summaries form a monoid: merging is associative and the empty summary is
+    its identity. Samples can thus be reduced in any grouping, in parallel
+    chunks or per redundant sensor, and merged afterwards.
+    """
+
+    min: float | None = None
+    max: float | None = None
+    weighted_sum: float = 0.0
+    weight: float = 0.0
+    count: int = 0
+
+    @property
+    def avg(self) -> float | None:
+        """Return weighted mean of the samples."""
+        return self.weighted_sum / self.weight if self.weight else None
+
+    def merge(self, other: TrackerSummary) -> TrackerSummary:
+        """Return summary of the samples of both."""
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        return TrackerSummary(
+            min(self.min, other.min),
+            max(self.max, other.max),
+            self.weighted_sum + other.weighted_sum,
+            self.weight + other.weight,
+            self.count + other.count,
+        )
 
 
 class MinMaxAvgTracker:
@@ -25,7 +66,8 @@ class MinMaxAvgTracker:
         self.min = None
         self.max = None
         self.avg = None
-        self._accumulator = 0
+        self._weighted_sum = 0.0
+        self._weight = 0.0
         self._count = 0
 
     def reset(self) -> None:
@@ -33,47 +75,107 @@ class MinMaxAvgTracker:
         self.min = None
         self.max = None
         self.avg = None
-        self._accumulator = 0
+        self._weighted_sum = 0.0
+        self._weight = 0.0
         self._count = 0
 
-    def update(self, new_value) -> None:
+    def update(self, new_value, weight: float = 1.0) -> None:
         """Update with new value."""
         if self.min is None or self.min > new_value:
             self.min = new_value
         if self.max is None or self.max < new_value:
             self.max = new_value
-        self._accumulator += new_value
+        self._weighted_sum += new_value * weight
+        self._weight += weight
         self._count += 1
-        self.avg = self._accumulator / self._count
+        self.avg = self._weighted_sum / self._weight
 
     def load_history(self, history_data) -> None:
-        """Load stats from source sensor history."""
-        self.reset()
-        for state in history_data:
-            if state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN, None):
-                continue
-
-            val = float(state.state)
-            if self.min is None or self.min > val:
-                self.min = val
-            if self.max is None or self.max < val:
-                self.max = val
-            self._accumulator += val
-            self._count += 1
-        if self._count > 0:
-            self.avg = self._accumulator / self._count
+        """Merge stats from source sensor history into current values."""
+        self.merge(summarize_history(history_data))
+
+    def summary(self) -> TrackerSummary:
+        """Return the tracked samples as a summary."""
+        return TrackerSummary(
+            self.min, self.max, self._weighted_sum, self._weight, self._count
+        )
+
+    def merge(self, summary: TrackerSummary) -> None:
+        """Merge a summary of other samples into current values.
+
+        Min and max restored without their samples are kept.
+        """
+        if summary.count == 0:
+            return
+        if self.min is None or self.min > summary.min:
+            self.min = summary.min
+        if self.max is None or self.max < summary.max:
+            self.max = summary.max
+        self._weighted_sum += summary.weighted_sum
+        self._weight += summary.weight
+        self._count += summary.count
+        self.avg = self._weighted_sum / self._weight
 
     def is_tracking(self):
         """Check if data is available."""
         return any(item is not None for item in (self.min, self.max, self.avg))
 
 
+def summarize_history(history_data) -> TrackerSummary:
+    """Reduce sensor history to a summary of its values."""
+    return summarize_values(state.state for state in history_data)
+
+
+def summarize_values(states) -> TrackerSummary:
+    """Reduce raw state values to a summary, skipping invalid ones."""
+    values = np.array(
+        [
+            state
+            for state in states
+            if state not in (STATE_UNAVAILABLE, STATE_UNKNOWN, None)
+        ],
+        dtype=float,
+    )
+    if not values.size:
+        return TrackerSummary()
+    return TrackerSummary(
+        float(values.min()),
+        float(values.max()),
+        float(values.sum()),
+        float(values.size),
+        values.size,
+    )
+
+
+class HourlyCoverage:
+    """Hours of a day in which a sensor reported, as a 24-bit mask."""
+
+    __slots__ = ("mask",)
+
+    def __init__(self, mask: int = 0) -> None:
+        """Initialize the coverage."""
+        self.mask = mask
+
+    def reset(self) -> None:
+        """Clear all hours."""
+        self.mask = 0
+
+    def mark(self, hour: int) -> None:
+        """Mark an hour of the day (0-23) as covered."""
+        self.mask |= 1 << hour
+
+    @property
+    def hours(self) -> int:
+        """Return number of covered hours."""
+        return self.mask.bit_count()
+
+
 class SunshineTracker:
     """Calculates amount of bright sunshine hours based on input value that is related to solar radiation."""
 
     def __init__(self, radiation_watermark: float) -> None:
         """Initialize the tracker."""
-        self._radiation_watermark = radiation_watermark
+        self.radiation_watermark = radiation_watermark
         self._timestamp: datetime = None
         self.sunshine_hours = timedelta(seconds=0)
 
@@ -81,18 +183,117 @@ class SunshineTracker:
         """Reset the internal counter."""
         self.sunshine_hours = timedelta(seconds=0)
 
-    def update(self, radiation: float) -> None:
-        """Update counters using a new value."""
-        if self._timestamp is not None and radiation >= self._radiation_watermark:
-            self.sunshine_hours += datetime.now(
-                tz=UTC) - self._timestamp
-        self._timestamp = datetime.now(tz=UTC)
+    def update(self, radiation: float, timestamp: datetime) -> None:
+        """Update counters using a new value measured at timestamp."""
+        if self._timestamp is not None and timestamp < self._timestamp:
+            return
+        if self._timestamp is not None and radiation >= self.radiation_watermark:
+            self.sunshine_hours += timestamp - self._timestamp
+        self._timestamp = timestamp
 
     def get_hours(self) -> float:
         """Return amount of sunshine hours counted."""
         return self.sunshine_hours / timedelta(hours=1)
 
 
+class ReorderBuffer:
+    """Holds timestamped items back so they can be released in order."""
+
+    def __init__(self) -> None:
+        """Initialize the buffer."""
+        self._heap: list[tuple[datetime, int, Any]] = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        """Return number of held items."""
+        return len(self._heap)
+
+    def push(self, timestamp: datetime, item: Any) -> None:
+        """Hold an item."""
+        heapq.heappush(self._heap, (timestamp, next(self._counter), item))
+
+    def pop_before(self, timestamp: datetime | None) -> list[Any]:
+        """Release items older than timestamp, or all of them, oldest first."""
+        items = []
+        while self._heap and (timestamp is None or self._heap[0][0] < timestamp):
+            items.append(heapq.heappop(self._heap)[2])
+        return items
+
+
+class RateIntegrator:
+    """Integrates a rate over time using the trapezoidal rule."""
+
+    def __init__(self) -> None:
+        """Initialize the integrator."""
+        self._timestamp: datetime = None
+        self._rate: float = None
+
+    def reset(self) -> None:
+        """Forget the last sample."""
+        self._timestamp = None
+        self._rate = None
+
+    def update(self, rate: float, timestamp: datetime) -> float:
+        """Add a per hour rate sample, return the amount since the previous sample."""
+        if self._timestamp is not None and timestamp < self._timestamp:
+            return 0.0
+        amount = 0.0
+        if self._timestamp is not None:
+            hours = (timestamp - self._timestamp) / timedelta(hours=1)
+            amount = (self._rate + rate) / 2 * hours
+        self._timestamp = timestamp
+        self._rate = rate
+        return amount
+
+    def advance(self, timestamp: datetime) -> float:
+        """Integrate up to timestamp assuming the last rate still holds."""
+        if self._timestamp is None or timestamp <= self._timestamp:
+            return 0.0
+        amount = self._rate * ((timestamp - self._timestamp) / timedelta(hours=1))
+        self._timestamp = timestamp
+        return amount
+
+
+def daylight_hours(day_of_year, latitude) -> float:
+    """Return maximum possible sunshine duration of a day."""
+    sha = aquacropeto.sunset_hour_angle(
+        aquacropeto.deg2rad(latitude), aquacropeto.sol_dec(day_of_year)
+    )
+    return float(aquacropeto.daylight_hours(sha))
+
+
+def estimate_hargreaves_daily(
+    day_of_year,
+    latitude,
+    temp_c_min,  # 24h minimum temp [C]
+    temp_c_max,  # 24h max temp [C]
+) -> float:
+    """Estimate ETo from temperature only, FAO-56 equation 52."""
+    sha = aquacropeto.sunset_hour_angle(
+        aquacropeto.deg2rad(latitude), aquacropeto.sol_dec(day_of_year)
+    )
+    et_rad = aquacropeto.et_rad(
+        aquacropeto.deg2rad(latitude),
+        aquacropeto.sol_dec(day_of_year),
+        sha,
+        aquacropeto.inv_rel_dist_earth_sun(day_of_year),
+    )
+    return float(
+        aquacropeto.hargreaves(
+            temp_c_min,
+            temp_c_max,
+            aquacropeto.daily_mean_t(temp_c_min, temp_c_max),
+            et_rad,
+        )
+    )
+
+
+# Standardized Penman-Monteith constants Cn, Cd of the reference surfaces
+# (ASCE-EWRI 2005): short clipped grass and 0.5 m tall alfalfa
+GRASS_REFERENCE = (900, 0.34)
+TALL_REFERENCE = (1600, 0.38)
+
+
 def estimate_fao56_daily(
     day_of_year,
     latitude,
@@ -106,8 +307,121 @@ def estimate_fao56_daily(
     wind_m_s,  # 24h avg wind speed [m/s]
     sol_rad=None,  # solar radioation [W*m-2]
     sunshine_hours=None,  # 24h sunshine hours
+    albedo=0.23,
 ) -> float:
     """Estimate fao56 from weather."""
+    return float(
+        estimate_fao56_array(
+            day_of_year,
+            latitude,
+            elevation,
+            wind_meas_height,
+            temp_c_min,
+            temp_c_max,
+            rh_min,
+            rh_max,
+            atmos_pres,
+            wind_m_s,
+            np.nan if sol_rad is None else sol_rad,
+            np.nan if sunshine_hours is None else sunshine_hours,
+            albedo,
+        )
+    )
+
+
+def estimate_reference_et_daily(
+    day_of_year,
+    latitude,
+    elevation,  # above sea level [m]
+    wind_meas_height,  # wind speed meas height [m]
+    temp_c_min,  # 24h minimum temp [C]
+    temp_c_max,  # 24h max temp [C]
+    rh_min,  # 24h minimum relative humidity [%]
+    rh_max,  # 24h max relative humidity [%]
+    atmos_pres,  # 24h avg atm. pressure, absolute [hPa]
+    wind_m_s,  # 24h avg wind speed [m/s]
+    sol_rad=None,  # solar radioation [W*m-2]
+    sunshine_hours=None,  # 24h sunshine hours
+    albedo=0.23,
+) -> tuple[float, float]:
+    """Estimate grass ETo and tall reference ETr from weather."""
+    eto, etr = estimate_reference_et_array(
+        day_of_year,
+        latitude,
+        elevation,
+        wind_meas_height,
+        temp_c_min,
+        temp_c_max,
+        rh_min,
+        rh_max,
+        atmos_pres,
+        wind_m_s,
+        np.nan if sol_rad is None else sol_rad,
+        np.nan if sunshine_hours is None else sunshine_hours,
+        albedo,
+    )
+    return float(eto), float(etr)
+
+
+def estimate_fao56_array(
+    day_of_year,
+    latitude,
+    elevation,
+    wind_meas_height,
+    temp_c_min,
+    temp_c_max,
+    rh_min,
+    rh_max,
+    atmos_pres,
+    wind_m_s,
+    sol_rad,
+    sunshine_hours,
+    albedo=0.23,
+) -> np.ndarray:
+    """Estimate fao56 for broadcastable arrays of inputs.
+
+    Where sol_rad is NaN, solar radiation is estimated from sunshine hours.
+    """
+    return estimate_reference_et_array(
+        day_of_year,
+        latitude,
+        elevation,
+        wind_meas_height,
+        temp_c_min,
+        temp_c_max,
+        rh_min,
+        rh_max,
+        atmos_pres,
+        wind_m_s,
+        sol_rad,
+        sunshine_hours,
+        albedo,
+        (GRASS_REFERENCE,),
+    )[0]
+
+
+def estimate_reference_et_array(
+    day_of_year,
+    latitude,
+    elevation,
+    wind_meas_height,
+    temp_c_min,
+    temp_c_max,
+    rh_min,
+    rh_max,
+    atmos_pres,
+    wind_m_s,
+    sol_rad,
+    sunshine_hours,
+    albedo=0.23,
+    references=(GRASS_REFERENCE, TALL_REFERENCE),
+) -> tuple[np.ndarray, ...]:
+    """Estimate reference ET of each (Cn, Cd) surface in references.
+
+    Radiation, vapour pressure and psychrometric terms are computed once,
+    only the final step of the standardized Penman-Monteith equation
+    differs between the surfaces.
+    """
     temp_c_mean = aquacropeto.daily_mean_t(temp_c_min, temp_c_max)
 
     svp = aquacropeto.mean_svp(temp_c_min, temp_c_max)
@@ -117,7 +431,131 @@ def estimate_fao56_daily(
         rh_min,
         rh_max,
     )
+    net_rad = _net_radiation(
+        day_of_year,
+        latitude,
+        elevation,
+        temp_c_min,
+        temp_c_max,
+        avp,
+        sol_rad,
+        sunshine_hours,
+        albedo,
+    )
+
+    temp_k_mean = aquacropeto.celsius2kelvin(temp_c_mean)
+    ws = aquacropeto.wind_speed_2m(wind_m_s, wind_meas_height)
+    delta_svp = aquacropeto.delta_svp(temp_c_mean)
+    # value stored is in hPa, but needs to be provided in kPa
+    psy = aquacropeto.psy_const(np.divide(atmos_pres, 10))
+    radiation_term = 0.408 * net_rad * delta_svp  # soil heat flux is 0 daily
+    aerodynamic_term = psy * ws * (svp - avp) / temp_k_mean
+
+    return tuple(
+        (radiation_term + cn * aerodynamic_term)
+        / (delta_svp + psy * (1 + cd * ws))
+        for cn, cd in references
+    )
+
 
+def estimate_priestley_taylor_daily(
+    day_of_year,
+    latitude,
+    elevation,  # above sea level [m]
+    temp_c_min,  # 24h minimum temp [C]
+    temp_c_max,  # 24h max temp [C]
+    rh_min,  # 24h minimum relative humidity [%]
+    rh_max,  # 24h max relative humidity [%]
+    atmos_pres=None,  # 24h avg atm. pressure, absolute [hPa]
+    sol_rad=None,  # solar radioation [W*m-2]
+    sunshine_hours=None,  # 24h sunshine hours
+    albedo=0.23,
+    alpha=1.26,
+) -> float:
+    """Estimate ETo from radiation and temperature, without wind.
+
+    Pressure is derived from elevation if not measured.
+    """
+    return float(
+        estimate_priestley_taylor_array(
+            day_of_year,
+            latitude,
+            elevation,
+            temp_c_min,
+            temp_c_max,
+            rh_min,
+            rh_max,
+            np.nan if atmos_pres is None else atmos_pres,
+            np.nan if sol_rad is None else sol_rad,
+            np.nan if sunshine_hours is None else sunshine_hours,
+            albedo,
+            alpha,
+        )
+    )
+
+
+def estimate_priestley_taylor_array(
+    day_of_year,
+    latitude,
+    elevation,
+    temp_c_min,
+    temp_c_max,
+    rh_min,
+    rh_max,
+    atmos_pres,
+    sol_rad,
+    sunshine_hours,
+    albedo=0.23,
+    alpha=1.26,
+) -> np.ndarray:
+    """Estimate Priestley-Taylor ETo for broadcastable arrays of inputs.
+
+    Where atmos_pres is NaN, pressure is derived from elevation.
+    """
+    temp_c_mean = aquacropeto.daily_mean_t(temp_c_min, temp_c_max)
+    avp = aquacropeto.avp_from_rhmin_rhmax(
+        aquacropeto.svp_from_t(temp_c_min),
+        aquacropeto.svp_from_t(temp_c_max),
+        rh_min,
+        rh_max,
+    )
+    net_rad = _net_radiation(
+        day_of_year,
+        latitude,
+        elevation,
+        temp_c_min,
+        temp_c_max,
+        avp,
+        sol_rad,
+        sunshine_hours,
+        albedo,
+    )
+    delta_svp = aquacropeto.delta_svp(temp_c_mean)
+    psy = aquacropeto.psy_const(
+        np.where(
+            np.isnan(atmos_pres),
+            aquacropeto.atm_pressure(elevation),
+            np.divide(atmos_pres, 10),
+        )
+    )
+    return alpha * 0.408 * net_rad * delta_svp / (delta_svp + psy)
+
+
+def _net_radiation(
+    day_of_year,
+    latitude,
+    elevation,
+    temp_c_min,
+    temp_c_max,
+    avp,
+    sol_rad,
+    sunshine_hours,
+    albedo,
+):
+    """Return net radiation [MJ m-2 day-1].
+
+    Where sol_rad is NaN, solar radiation is estimated from sunshine hours.
+    """
     sha = aquacropeto.sunset_hour_angle(
         aquacropeto.deg2rad(latitude), aquacropeto.sol_dec(day_of_year)
     )
@@ -129,14 +567,15 @@ def estimate_fao56_daily(
         aquacropeto.inv_rel_dist_earth_sun(day_of_year),
     )
 
-    if sol_rad is None:
-        sol_rad = aquacropeto.sol_rad_from_sun_hours(
+    sol_rad = np.where(
+        np.isnan(sol_rad),
+        aquacropeto.sol_rad_from_sun_hours(
             aquacropeto.daylight_hours(sha), sunshine_hours, et_rad
-        )
-    else:
-        sol_rad *= CONVERT_W_M2_TO_MJ_M2_DAY
+        ),
+        np.multiply(sol_rad, CONVERT_W_M2_TO_MJ_M2_DAY),
+    )
 
-    net_in_sol_rad = aquacropeto.net_in_sol_rad(sol_rad, 0.23)
+    net_in_sol_rad = aquacropeto.net_in_sol_rad(sol_rad, albedo)
     net_out_lw_rad = aquacropeto.net_out_lw_rad(
         aquacropeto.celsius2kelvin(temp_c_min),
         aquacropeto.celsius2kelvin(temp_c_max),
@@ -144,19 +583,4 @@ def estimate_fao56_daily(
         aquacropeto.cs_rad(elevation, et_rad),
         avp,
     )
-    net_rad = aquacropeto.net_rad(net_in_sol_rad, net_out_lw_rad)
-
-    eto = aquacropeto.fao56_penman_monteith(
-        net_rad=net_rad,
-        t=aquacropeto.celsius2kelvin(temp_c_mean),
-        ws=aquacropeto.wind_speed_2m(wind_m_s, wind_meas_height),
-        svp=svp,
-        avp=avp,
-        delta_svp=aquacropeto.delta_svp(temp_c_mean),
-        psy=aquacropeto.psy_const(
-            atmos_pres / 10
-        ),  # value stored is in hPa, but needs to be provided in kPa
-        shf=0,
-    )
-
-    return float(eto)
+    return aquacropeto.net_rad(net_in_sol_rad, net_out_lw_rad)
@@ -0,0 +1,68 @@
+"""Streaming reduction of recorded sensor history."""
+
+from __future__ import annotations
+
+import datetime
+from functools import reduce
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.db_schema import States
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .helpers import TrackerSummary, summarize_values
+
+# Rows fetched from the database at a time
+HISTORY_CHUNK_SIZE = 4096
+
+
+def reduce_history(
+    hass: HomeAssistant,
+    entity_id: str,
+    start: datetime.datetime,
+    end: datetime.datetime,
+) -> TrackerSummary:
+    """Return summary of the states of entity_id from start to end.
+
+    Does blocking I/O and must run in the recorder executor.
+    """
+    with session_scope(hass=hass, read_only=True) as session:
+        metadata_id = get_instance(hass).states_meta_manager.get(
+            entity_id, session, False
+        )
+        if metadata_id is None:
+            return TrackerSummary()
+        return reduce_states(session, metadata_id, start, end)
+
+
+def reduce_states(
+    session: Session,
+    metadata_id: int,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    chunk_size: int = HISTORY_CHUNK_SIZE,
+) -> TrackerSummary:
+    """Reduce recorded states chunk by chunk.
+
+    Only the state column is read, a chunk at a time, so memory use does not
+    depend on the length of the history. Rows of attribute-only updates
+    repeat the state and are skipped.
+    """
+    statement = (
+        select(States.state)
+        .where(
+            States.metadata_id == metadata_id,
+            States.last_updated_ts >= start.timestamp(),
+            States.last_updated_ts < end.timestamp(),
+            (States.last_changed_ts == States.last_updated_ts)
+            | States.last_changed_ts.is_(None),
+        )
+        .execution_options(yield_per=chunk_size)
+    )
+    return reduce(
+        TrackerSummary.merge,
+        map(summarize_values, session.execute(statement).scalars().partitions()),
+        TrackerSummary(),
+    )
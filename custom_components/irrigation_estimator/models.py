@@ -0,0 +1,164 @@
+"""Registry of the models estimating reference ET of a day."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Collection
+from dataclasses import dataclass
+
+from .const import (
+    CONF_SENSOR_HUMIDITY,
+    CONF_SENSOR_PRESSURE,
+    CONF_SENSOR_SOLAR_RADIATION,
+    CONF_SENSOR_TEMPERATURE,
+    CONF_SENSOR_WINDSPEED,
+    MODEL_FAO56,
+    MODEL_HARGREAVES,
+    MODEL_PRIESTLEY_TAYLOR,
+)
+from .helpers import (
+    estimate_hargreaves_daily,
+    estimate_priestley_taylor_daily,
+    estimate_reference_et_daily,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class DailyWeather:
+    """Inputs of a day, None where a quantity has no data."""
+
+    day_of_year: int
+    latitude: float
+    elevation: float  # above sea level [m]
+    wind_meas_height: float  # [m]
+    temp_c_min: float | None
+    temp_c_max: float | None
+    rh_min: float | None
+    rh_max: float | None
+    atmos_pres: float | None  # [hPa]
+    wind_m_s: float | None
+    sol_rad: float | None  # [W*m-2]
+    sunshine_hours: float | None
+
+
+# Ratio of tall (alfalfa) to short (grass) reference ET, for models that
+# only estimate the short one. Measured ratios are about 1.1 to 1.4, lower
+# in humid, calm climates and higher in arid, windy ones.
+TALL_REFERENCE_RATIO = 1.2
+
+
+@dataclass(frozen=True, slots=True)
+class EtModel:
+    """Model estimating ETo and ETr.
+
+    quantities are the sensor keys the model needs data of, the engine
+    only subscribes to those.
+    """
+
+    name: str
+    quantities: frozenset[str]
+    estimate: Callable[[DailyWeather], tuple[float, float]]
+
+
+# Registered models, best first
+MODELS: dict[str, EtModel] = {}
+
+
+def register_model(model: EtModel) -> EtModel:
+    """Add a model after the ones registered before, which it ranks below."""
+    MODELS[model.name] = model
+    return model
+
+
+def lighter_models(name: str) -> list[EtModel]:
+    """Return a model and the ones it can degrade to, best first.
+
+    A model can degrade to every model needing a subset of its quantities.
+    """
+    quantities = MODELS[name].quantities
+    return [model for model in MODELS.values() if model.quantities <= quantities]
+
+
+def select_model(
+    available: Collection[str], models: Collection[EtModel] | None = None
+) -> EtModel | None:
+    """Return the best of the models that has data of all its quantities."""
+    for model in MODELS.values() if models is None else models:
+        if model.quantities <= set(available):
+            return model
+    return None
+
+
+def _fao56(weather: DailyWeather) -> tuple[float, float]:
+    return estimate_reference_et_daily(
+        weather.day_of_year,
+        weather.latitude,
+        weather.elevation,
+        weather.wind_meas_height,
+        weather.temp_c_min,
+        weather.temp_c_max,
+        weather.rh_min,
+        weather.rh_max,
+        weather.atmos_pres,
+        weather.wind_m_s,
+        weather.sol_rad,
+        weather.sunshine_hours,
+    )
+
+
+def _priestley_taylor(weather: DailyWeather) -> tuple[float, float]:
+    eto = estimate_priestley_taylor_daily(
+        weather.day_of_year,
+        weather.latitude,
+        weather.elevation,
+        weather.temp_c_min,
+        weather.temp_c_max,
+        weather.rh_min,
+        weather.rh_max,
+        weather.atmos_pres,
+        weather.sol_rad,
+        weather.sunshine_hours,
+    )
+    return eto, eto * TALL_REFERENCE_RATIO
+
+
+def _hargreaves(weather: DailyWeather) -> tuple[float, float]:
+    eto = estimate_hargreaves_daily(
+        weather.day_of_year,
+        weather.latitude,
+        weather.temp_c_min,
+        weather.temp_c_max,
+    )
+    return eto, eto * TALL_REFERENCE_RATIO
+
+
+register_model(
+    EtModel(
+        MODEL_FAO56,
+        frozenset(
+            (
+                CONF_SENSOR_TEMPERATURE,
+                CONF_SENSOR_HUMIDITY,
+                CONF_SENSOR_PRESSURE,
+                CONF_SENSOR_WINDSPEED,
+                CONF_SENSOR_SOLAR_RADIATION,
+            )
+        ),
+        _fao56,
+    )
+)
+register_model(
+    EtModel(
+        MODEL_PRIESTLEY_TAYLOR,
+        frozenset(
+            (
+                CONF_SENSOR_TEMPERATURE,
+                CONF_SENSOR_HUMIDITY,
+                CONF_SENSOR_SOLAR_RADIATION,
+            )
+        ),
+        _priestley_taylor,
+    )
+)
+register_model(
+    EtModel(MODEL_HARGREAVES, frozenset((CONF_SENSOR_TEMPERATURE,)), _hargreaves)
+)
@@ -0,0 +1,71 @@
+"""On-demand profiling of the calculation engines."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import cProfile
+import pstats
+import threading
+from typing import Any, TypeVar
+
+_T = TypeVar("_T")
+
+
+class ProfileSession:
+    """Collects cProfile stats of calls made from any thread.
+
+    cProfile only sees the thread it was enabled in, so every profiled call
+    gets its own profile and the results are merged.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the session."""
+        self._lock = threading.Lock()
+        self._stats: pstats.Stats | None = None
+        self.calls = 0
+
+    def runcall(self, target: Callable[..., _T], *args: Any) -> _T:
+        """Run target, profiling it unless another profiler is active."""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return target(*args)
+        try:
+            return target(*args)
+        finally:
+            profile.disable()
+            with self._lock:
+                self.calls += 1
+                if self._stats is None:
+                    self._stats = pstats.Stats(profile)
+                else:
+                    self._stats.add(profile)
+
+    def dump(self, path: str) -> bool:
+        """Write stats in pstats format, return False if nothing was profiled."""
+        with self._lock:
+            if self._stats is None:
+                return False
+            self._stats.dump_stats(path)
+            return True
+
+    def top(self, count: int) -> list[dict[str, Any]]:
+        """Return the functions with the highest cumulative time."""
+        with self._lock:
+            if self._stats is None:
+                return []
+            rows = sorted(
+                self._stats.stats.items(),  # type: ignore[attr-defined]
+                key=lambda item: item[1][3],
+                reverse=True,
+            )[:count]
+        return [
+            {
+                "function": pstats.func_std_string(func),
+                "calls": calls,
+                "total_time": round(total_time, 6),
+                "cumulative_time": round(cumulative_time, 6),
+            }
+            for func, (_, calls, total_time, cumulative_time, _) in rows
+        ]
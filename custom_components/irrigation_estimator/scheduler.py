@@ -0,0 +1,126 @@
+"""Packing of zone runtimes into a shared water supply."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import heapq
+import math
+
+
+@dataclass(frozen=True)
+class ZoneDemand:
+    """Watering needed by a zone."""
+
+    zone_id: str
+    runtime: float  # [s]
+    flow: float  # [l/min]
+    maximum_cycle: float = 0  # longest continuous run [s], 0 means no limit
+    soak_time: float = 0  # pause between cycles [s]
+
+
+@dataclass(frozen=True)
+class ScheduledRun:
+    """A single cycle of a zone."""
+
+    zone_id: str
+    start: float  # offset from start of the window [s]
+    duration: float  # [s]
+    flow: float  # [l/min]
+
+    @property
+    def end(self) -> float:
+        """Return end offset of the run."""
+        return self.start + self.duration
+
+
+@dataclass
+class _ZoneState:
+    demand: ZoneDemand
+    cycles: int
+    cycle_length: float
+    ready: float = 0.0
+    running: bool = False
+
+    @property
+    def remaining(self) -> float:
+        """Time until the zone is done if it were never delayed."""
+        return (
+            self.cycles * self.cycle_length
+            + (self.cycles - 1) * self.demand.soak_time
+        )
+
+
+def pack_schedule(zones: list[ZoneDemand], max_flow: float) -> list[ScheduledRun]:
+    """Schedule zone cycles so that their total flow never exceeds max_flow.
+
+    Runtimes longer than the maximum cycle are split into equal cycles with
+    a soak pause in between. Whenever supply frees up, the zones with the
+    longest remaining critical path are started first if they fit, which
+    keeps the total watering window close to its lower bound.
+    """
+    states = []
+    for zone in zones:
+        if zone.runtime <= 0:
+            continue
+        if zone.flow > max_flow:
+            raise ValueError(
+                f"Zone {zone.zone_id} needs {zone.flow} l/min, more than the supply"
+            )
+        cycles = 1
+        if zone.maximum_cycle > 0:
+            cycles = math.ceil(zone.runtime / zone.maximum_cycle)
+        states.append(_ZoneState(zone, cycles, zone.runtime / cycles))
+
+    runs: list[ScheduledRun] = []
+    running: list[tuple[float, int]] = []  # (end, zone index)
+    available = max_flow
+    now = 0.0
+    while True:
+        waiting = sorted(
+            (
+                index
+                for index, state in enumerate(states)
+                if not state.running and state.cycles > 0 and state.ready <= now
+            ),
+            key=lambda index: (-states[index].remaining, -states[index].demand.flow),
+        )
+        for index in waiting:
+            state = states[index]
+            if state.demand.flow > available + 1e-9:
+                continue
+            available -= state.demand.flow
+            state.running = True
+            runs.append(
+                ScheduledRun(
+                    state.demand.zone_id, now, state.cycle_length, state.demand.flow
+                )
+            )
+            heapq.heappush(running, (now + state.cycle_length, index))
+
+        next_ready = min(
+            (
+                state.ready
+                for state in states
+                if not state.running and state.cycles > 0 and state.ready > now
+            ),
+            default=math.inf,
+        )
+        next_end = running[0][0] if running else math.inf
+        now = min(next_ready, next_end)
+        if now == math.inf:
+            break
+
+        while running and running[0][0] <= now:
+            _, index = heapq.heappop(running)
+            state = states[index]
+            state.running = False
+            state.cycles -= 1
+            state.ready = now + state.demand.soak_time
+            available += state.demand.flow
+
+    return runs
+
+
+def schedule_duration(runs: list[ScheduledRun]) -> float:
+    """Return length of the watering window."""
+    return max((run.end for run in runs), default=0.0)
@@ -1,49 +1,45 @@
 """SmartIrrigationEntity class."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
 import datetime
 from enum import IntFlag
-from functools import partial
 import logging
+from typing import Any
 
-from homeassistant.components.recorder import get_instance, history
 from homeassistant.components.sensor import (
     RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
+    SensorExtraStoredData,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
-    ATTR_UNIT_OF_MEASUREMENT,
-    CONF_ELEVATION,
-    CONF_LATITUDE,
-    CONF_LONGITUDE,
-    STATE_UNAVAILABLE,
-    STATE_UNKNOWN,
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfIrradiance,
     UnitOfLength,
     UnitOfPressure,
     UnitOfSpeed,
     UnitOfTemperature,
     UnitOfTime,
 )
-from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
-from homeassistant.helpers import entity_platform
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers import entity_platform, entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import (
-    async_track_state_change_event,
-    async_track_time_change,
-)
-import homeassistant.util.dt as dt_util
-from homeassistant.util.unit_conversion import (
-    DistanceConverter,
-    PressureConverter,
-    SpeedConverter,
-    TemperatureConverter,
-)
 
 from .const import (
+    ATTR_BUCKET_DELTA,
+    ATTR_COVERAGE,
+    ATTR_DATE,
+    ATTR_ET_MODEL,
+    ATTR_EVAPOTRANSPIRATION,
+    ATTR_EVAPOTRANSPIRATION_TALL,
+    ATTR_HISTORY_RESTORED,
     ATTR_MAX_RH,
     ATTR_MAX_TEMP,
     ATTR_MEAN_PRESSURE,
@@ -53,42 +49,49 @@ from .const import (
     ATTR_MIN_TEMP,
     ATTR_PRECIPITATION,
     ATTR_PRECIPITATION_RATE,
+    ATTR_QUALITY,
+    ATTR_QUEUE_DEPTH,
+    ATTR_RUNTIME,
     ATTR_SUNSHINE_HOURS,
     ATTR_THROUGHPUT,
-    CONF_ACCURATE_SOLAR_RADIATION,
+    ATTR_TRACKERS,
     CONF_AREA,
+    CONF_COMPACT,
+    CONF_CREATE_DEVICE,
     CONF_FLOW,
+    CONF_MAXIMUM_CYCLE,
     CONF_MAXIMUM_DURATION,
     CONF_NUMBER_OF_SPRINKLERS,
-    CONF_PRECIPITATION_SENSOR_TYPE,
-    CONF_SENSOR_HUMIDITY,
-    CONF_SENSOR_PRECIPITATION,
-    CONF_SENSOR_PRESSURE,
-    CONF_SENSOR_SOLAR_RADIATION,
-    CONF_SENSOR_TEMPERATURE,
-    CONF_SENSOR_WINDSPEED,
-    CONF_SOLAR_RADIATION_THRESHOLD,
-    CONF_WIND_MEASUREMENT_HEIGHT,
+    CONF_SOAK_TIME,
     DOMAIN,
     ENTITY_BUCKET,
     ENTITY_BUCKET_DELTA,
     ENTITY_EVAPOTRANSPIRATION,
+    ENTITY_EVAPOTRANSPIRATION_TALL,
+    ENTITY_EVAPOTRANSPIRATION_TODAY,
+    ENTITY_MAX_RH,
+    ENTITY_MAX_TEMP,
+    ENTITY_MEAN_PRESSURE,
+    ENTITY_MEAN_RADIATION,
+    ENTITY_MEAN_WIND,
+    ENTITY_MIN_RH,
+    ENTITY_MIN_TEMP,
+    ENTITY_QUEUE_DEPTH,
     ENTITY_RUNTIME,
+    ENTITY_SUNSHINE_HOURS,
+    ENTITY_ZONE,
     ICON,
-    OPTION_CUMULATIVE,
-    OPTION_HOURLY,
     SERVICE_FORCE_DAILY_UPDATE,
     SERVICE_RESET_BUCKET,
 )
-from .helpers import (
-    MinMaxAvgTracker,
-    SunshineTracker,
-    estimate_fao56_daily,
-    get_config_value,
-)
+from .engine import CalculationEngine
+from .helpers import get_config_value
+from .series import SERIES_WINDOWS
 
 _LOGGER = logging.getLogger(__name__)
 
+DATA_WORKER_POOL_SENSOR = f"{DOMAIN}_worker_pool_sensor"
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -96,16 +99,45 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform."""
-    calc_engine = CalculationEngine(hass, config_entry)
+    calc_engine: CalculationEngine = config_entry.runtime_data
 
-    async_add_entities(
-        [
+    if get_config_value(config_entry, CONF_COMPACT, False):
+        entities: list[SensorEntity] = [ZoneSensor(calc_engine, config_entry)]
+    else:
+        entities = [
             EvapotranspirationSensor(calc_engine, config_entry),
+            TallEvapotranspirationSensor(calc_engine, config_entry),
             DailyBucketDelta(calc_engine, config_entry),
             CumulativeBucket(calc_engine, config_entry),
             CumulativeRunTime(calc_engine, config_entry),
+            LiveEvapotranspirationSensor(calc_engine, config_entry),
+            *(
+                TrackerSensor(calc_engine, config_entry, description)
+                for description in TRACKER_SENSORS
+            ),
         ]
-    )
+
+    # The worker pool is shared, its sensor belongs to the first entry set up
+    owner = hass.data.setdefault(DATA_WORKER_POOL_SENSOR, config_entry.entry_id)
+    if owner == config_entry.entry_id:
+        entities.append(TrackerSensor(calc_engine, config_entry, WORKER_POOL_SENSOR))
+
+        @callback
+        def _release_worker_pool_sensor() -> None:
+            hass.data.pop(DATA_WORKER_POOL_SENSOR, None)
+
+        config_entry.async_on_unload(_release_worker_pool_sensor)
+
+    # Drop the entities of the other mode, and stale ones, from the registry
+    unique_ids = {entity.unique_id for entity in entities}
+    registry = er.async_get(hass)
+    for registry_entry in er.async_entries_for_config_entry(
+        registry, config_entry.entry_id
+    ):
+        if registry_entry.unique_id not in unique_ids:
+            registry.async_remove(registry_entry.entity_id)
+
+    async_add_entities(entities)
 
     platform = entity_platform.async_get_current_platform()
     platform.async_register_entity_service(
@@ -120,275 +152,93 @@ async def async_setup_entry(
     )
 
 
-class CalculationEngine:
-    """Listens to sensors and makes backend calculations."""
-
-    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-        """Initialize the ET calculation engine."""
-        self.hass = hass
-        self._latitude = hass.config.as_dict().get(CONF_LATITUDE)
-        self._longitude = hass.config.as_dict().get(CONF_LONGITUDE)
-        self._elevation = hass.config.as_dict().get(CONF_ELEVATION)
-
-        self.number_of_sprinklers = get_config_value(
-            config_entry, CONF_NUMBER_OF_SPRINKLERS
-        )
-        self.flow = get_config_value(config_entry, CONF_FLOW)
-        self.throughput = self.number_of_sprinklers * self.flow
-        self.area = get_config_value(config_entry, CONF_AREA)
-        self.precipitation_rate = round((self.throughput * 60) / self.area, 2)
-        self._precipitation_sensor_type = get_config_value(
-            config_entry, CONF_PRECIPITATION_SENSOR_TYPE
-        )
-        self._solar_radiation_threshold = get_config_value(
-            config_entry, CONF_SOLAR_RADIATION_THRESHOLD
-        )
-        self.maximum_duration = get_config_value(
-            config_entry, CONF_MAXIMUM_DURATION)
-        self._wind_meas_height = get_config_value(
-            config_entry, CONF_WIND_MEASUREMENT_HEIGHT
-        )
-        self._accurate_solar_radiation = get_config_value(
-            config_entry, CONF_ACCURATE_SOLAR_RADIATION
-        )
-
-        self._sensors = {
-            CONF_SENSOR_TEMPERATURE: get_config_value(
-                config_entry, CONF_SENSOR_TEMPERATURE
-            ),
-            CONF_SENSOR_HUMIDITY: get_config_value(config_entry, CONF_SENSOR_HUMIDITY),
-            CONF_SENSOR_PRESSURE: get_config_value(config_entry, CONF_SENSOR_PRESSURE),
-            CONF_SENSOR_WINDSPEED: get_config_value(
-                config_entry, CONF_SENSOR_WINDSPEED
-            ),
-            CONF_SENSOR_SOLAR_RADIATION: get_config_value(
-                config_entry, CONF_SENSOR_SOLAR_RADIATION
-            ),
-            CONF_SENSOR_PRECIPITATION: get_config_value(
-                config_entry, CONF_SENSOR_PRECIPITATION
-            ),
-        }
+def _device_info(config_entry: ConfigEntry) -> DeviceInfo:
+    return DeviceInfo(
+        name=config_entry.title,
+        identifiers={(DOMAIN, config_entry.entry_id)},
+    )
 
-        self.sunshine_tracker = SunshineTracker(
-            self._solar_radiation_threshold)
-        self.solar_radiation_tracker = MinMaxAvgTracker()
-        self.temp_tracker = MinMaxAvgTracker()
-        self.wind_tracker = MinMaxAvgTracker()
-        self.rh_tracker = MinMaxAvgTracker()
-        self.pressure_tracker = MinMaxAvgTracker()
-
-        self.evapotranspiration = 0
-        self.precipitation = 0.0
-        self.bucket_delta = 0.0
-        self.bucket = 0.0
-        self.runtime = 0
-
-        self._listeners: dict[CALLBACK_TYPE, CALLBACK_TYPE] = {}
-        self._unsub_status: CALLBACK_TYPE | None = None
-        self._unsub_time: CALLBACK_TYPE | None = None
-        self._unsub_hourly: CALLBACK_TYPE | None = None
-        self._unsub_update_entities: CALLBACK_TYPE | None = None
 
-    @callback
-    def _subscribe_events(self):
-        self._unsubscribe_events()
-        self._unsub_status = async_track_state_change_event(
-            self.hass, self._sensors.values(), self._async_sensor_state_listener
-        )
-        self._unsub_time = async_track_time_change(
-            self.hass,
-            self.update_daily,
-            hour=0,
-            minute=0,
-            second=10,
-        )
-        self._unsub_update_entities = async_track_time_change(
-            self.hass,
-            self._update_entities,
-            second=40,
+def _result_attributes(coordinator: CalculationEngine) -> dict:
+    """Return how the last day was computed."""
+    return {
+        ATTR_HISTORY_RESTORED: coordinator.history_restored,
+        ATTR_QUALITY: coordinator.quality,
+        ATTR_ET_MODEL: coordinator.et_model,
+    }
+
+
+def _tracker_data(coordinator: CalculationEngine) -> dict:
+    """Return the running day's trackers, for restoring them after a restart.
+
+    Means are not stored, they are restored from history.
+    """
+    return {
+        ATTR_DATE: coordinator.period_start.date().isoformat(),
+        ATTR_MIN_TEMP: coordinator.temp_tracker.min,
+        ATTR_MAX_TEMP: coordinator.temp_tracker.max,
+        ATTR_MIN_RH: coordinator.rh_tracker.min,
+        ATTR_MAX_RH: coordinator.rh_tracker.max,
+        ATTR_SUNSHINE_HOURS: coordinator.sunshine_tracker.get_hours(),
+        ATTR_COVERAGE: {
+            key: coverage.mask for key, coverage in coordinator.coverage.items()
+        },
+    }
+
+
+def _window_attributes(coordinator: CalculationEngine, *columns: str) -> dict:
+    """Return rolling totals and means of the last days for results in columns."""
+    windows = coordinator.series.as_dict()
+    keys = [f"{column}_{days}d" for days in SERIES_WINDOWS for column in columns]
+    if ATTR_EVAPOTRANSPIRATION in columns:
+        keys += [f"mean_{ATTR_EVAPOTRANSPIRATION}_{days}d" for days in SERIES_WINDOWS]
+    return {key: windows[key] for key in keys}
+
+
+def _restore_trackers(
+    coordinator: CalculationEngine, data: State, trackers: dict | None
+) -> None:
+    """Restore results from the attributes and trackers stored by _tracker_data."""
+    coordinator.quality = data.attributes.get(ATTR_QUALITY)
+    coordinator.et_model = data.attributes.get(ATTR_ET_MODEL)
+    if (
+        trackers is None
+        or trackers.get(ATTR_DATE) != coordinator.period_start.date().isoformat()
+    ):
+        # Restarted across midnight, the trackers were of a closed day
+        return
+    coordinator.temp_tracker.min = trackers.get(ATTR_MIN_TEMP)
+    coordinator.temp_tracker.max = trackers.get(ATTR_MAX_TEMP)
+    coordinator.rh_tracker.min = trackers.get(ATTR_MIN_RH)
+    coordinator.rh_tracker.max = trackers.get(ATTR_MAX_RH)
+    coordinator.sunshine_tracker.sunshine_hours = datetime.timedelta(
+        hours=1
+    ) * trackers.get(ATTR_SUNSHINE_HOURS, 0)
+    for key, mask in (trackers.get(ATTR_COVERAGE) or {}).items():
+        if key in coordinator.coverage:
+            coordinator.coverage[key].mask |= mask
+
+
+@dataclass
+class IrrigationExtraStoredData(SensorExtraStoredData):
+    """Sensor data with the running day's trackers."""
+
+    trackers: dict | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation of the sensor data."""
+        return super().as_dict() | {ATTR_TRACKERS: self.trackers}
+
+    @classmethod
+    def from_dict(cls, restored: dict[str, Any]) -> IrrigationExtraStoredData | None:
+        """Initialize stored sensor data from a dict."""
+        if (data := SensorExtraStoredData.from_dict(restored)) is None:
+            return None
+        return cls(
+            data.native_value,
+            data.native_unit_of_measurement,
+            restored.get(ATTR_TRACKERS),
         )
-        if self._precipitation_sensor_type == OPTION_HOURLY:
-            self._unsub_hourly = async_track_time_change(
-                self.hass, self._update_hourly, minute=0, second=0
-            )
-
-    @callback
-    def _unsubscribe_events(self):
-        if self._unsub_status:
-            self._unsub_status()
-            self._unsub_status = None
-        if self._unsub_time:
-            self._unsub_time()
-            self._unsub_time = None
-        if self._unsub_hourly:
-            self._unsub_hourly()
-            self._unsub_hourly = None
-        if self._unsub_update_entities:
-            self._unsub_update_entities()
-            self._unsub_update_entities = None
-
-    @callback
-    def async_add_listener(self, update_callback: CALLBACK_TYPE):
-        """Subscribe to updates."""
-        subscribe = not self._listeners
-
-        @callback
-        def remove_listener() -> None:
-            self._listeners.pop(remove_listener)
-            if not self._listeners:
-                self._unsubscribe_events()
-
-        self._listeners[remove_listener] = update_callback
-        if subscribe:
-            self._subscribe_events()
-
-        return remove_listener
-
-    @callback
-    def _async_update_listeners(self):
-        for update_callback in list(self._listeners.values()):
-            update_callback()
-
-    @callback
-    def _async_sensor_state_listener(self, event: Event):
-        new_state = event.data.get("new_state")
-        if new_state is None or new_state.state in (
-            STATE_UNKNOWN,
-            STATE_UNAVAILABLE,
-            None,
-        ):
-            return
-
-        entity_id = new_state.entity_id
-        value = float(new_state.state)
-        unit = new_state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
-
-        if entity_id == self._sensors[CONF_SENSOR_TEMPERATURE]:
-            self.temp_tracker.update(
-                TemperatureConverter.convert(
-                    value, unit, UnitOfTemperature.CELSIUS)
-            )
-        elif entity_id == self._sensors[CONF_SENSOR_HUMIDITY]:
-            self.rh_tracker.update(value)
-        elif entity_id == self._sensors[CONF_SENSOR_WINDSPEED]:
-            self.wind_tracker.update(
-                SpeedConverter.convert(
-                    value, unit, UnitOfSpeed.METERS_PER_SECOND)
-            )
-        elif entity_id == self._sensors[CONF_SENSOR_PRESSURE]:
-            self.pressure_tracker.update(
-                PressureConverter.convert(value, unit, UnitOfPressure.HPA)
-            )
-        elif entity_id == self._sensors[CONF_SENSOR_SOLAR_RADIATION]:
-            if self._accurate_solar_radiation:
-                self.solar_radiation_tracker.update(value)
-            else:
-                self.sunshine_tracker.update(value)
-        elif entity_id == self._sensors[CONF_SENSOR_PRECIPITATION]:
-            if self._precipitation_sensor_type == OPTION_CUMULATIVE:
-                self.precipitation = DistanceConverter.convert(
-                    value, unit, UnitOfLength.MILLIMETERS
-                )
-
-    @callback
-    def _update_entities(self, _):
-        self._async_update_listeners()
-
-    @callback
-    def _update_hourly(self, _):
-        new_state = self.hass.states.get(
-            self._sensors[CONF_SENSOR_PRECIPITATION])
-        if new_state is not None and new_state.state not in (
-            STATE_UNAVAILABLE,
-            STATE_UNKNOWN,
-        ):
-            value = float(new_state.state)
-            unit = new_state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
-            self.precipitation += DistanceConverter.convert(
-                value, unit, UnitOfLength.MILLIMETERS
-            )
-
-    @callback
-    def update_daily(self, _):
-        """Performs daily calculations"""
-        self._update_eto()
-        self._update_bucket()
-        self._update_runtime()
-        self._async_update_listeners()
-
-    def _update_runtime(self):
-        self.runtime = 0
-        if self.bucket is not None and self.bucket < 0:
-            self.runtime = abs(self.bucket) / self.precipitation_rate * 3600
-            if self.maximum_duration > 0:
-                self.runtime = min(self.maximum_duration, self.runtime)
-
-    def _update_bucket(self):
-        self.bucket_delta = self.precipitation - self.evapotranspiration
-        self.precipitation = 0.0
-        self.bucket += self.bucket_delta
-
-    def _update_eto(self):
-        if all(
-            x.is_tracking()
-            for x in [
-                self.temp_tracker,
-                self.rh_tracker,
-                self.pressure_tracker,
-                self.wind_tracker,
-            ]
-        ):
-            eto = estimate_fao56_daily(
-                datetime.datetime.now(tz=datetime.UTC).timetuple().tm_yday,
-                self._latitude,
-                self._elevation,
-                self._wind_meas_height,
-                self.temp_tracker.min,
-                self.temp_tracker.max,
-                self.rh_tracker.min,
-                self.rh_tracker.max,
-                self.pressure_tracker.avg,
-                self.wind_tracker.avg,
-                self.solar_radiation_tracker.avg,
-                self.sunshine_tracker.get_hours(),
-            )
-            self.evapotranspiration = round(eto, 2)
-            self.wind_tracker.reset()
-            self.temp_tracker.reset()
-            self.rh_tracker.reset()
-            self.pressure_tracker.reset()
-            self.sunshine_tracker.reset()
-            self.solar_radiation_tracker.reset()
-
-    async def async_retrieve_history(self):
-        """Recreates avg records from base sensor history."""
-        if "recorder" not in self.hass.config.components:
-            return
-
-        to_update = [
-            (self._sensors[CONF_SENSOR_WINDSPEED], self.wind_tracker),
-            (self._sensors[CONF_SENSOR_PRESSURE], self.pressure_tracker),
-        ]
-        if self._accurate_solar_radiation:
-            to_update.append(
-                (
-                    self._sensors[CONF_SENSOR_SOLAR_RADIATION],
-                    self.solar_radiation_tracker,
-                )
-            )
-        for entity_id, tracker in to_update:
-            start = dt_util.start_of_local_day()
-            filter_history = await get_instance(self.hass).async_add_executor_job(
-                partial(
-                    history.state_changes_during_period,
-                    self.hass,
-                    start,
-                    entity_id=entity_id,
-                    no_attributes=True,
-                )
-            )
-            if entity_id in filter_history:
-                tracker.load_history(filter_history.get(entity_id, []))
 
 
 class IrrigationEntityFeature(IntFlag):
@@ -407,6 +257,8 @@ class IrrigationSensor(RestoreSensor, SensorEntity):
     _attr_has_entity_name = True
     _attr_should_poll = False
     _attr_icon = ICON
+    # Stores the running day's trackers with its state
+    _store_trackers = False
 
     def __init__(
         self,
@@ -418,10 +270,7 @@ class IrrigationSensor(RestoreSensor, SensorEntity):
         self.coordinator = coordinator
         self._attr_unique_id = f"{config_entry.entry_id}_{sensor_name}"
         self._attr_name = sensor_name
-        self._attr_device_info = DeviceInfo(
-            name=config_entry.title,
-            identifiers={(DOMAIN, config_entry.entry_id)},
-        )
+        self._attr_device_info = _device_info(config_entry)
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
@@ -436,12 +285,43 @@ class IrrigationSensor(RestoreSensor, SensorEntity):
         """Handle updated data from the coordinator."""
         self.async_write_ha_state()
 
+    async def _async_restore_results(self) -> bool:
+        """Take the last logged results if they are newer than the restored state."""
+        data = await self.async_get_last_state()
+        return await self.coordinator.async_restore_results(
+            None if data is None else data.last_updated
+        )
+
+    @property
+    def extra_restore_state_data(self) -> SensorExtraStoredData:
+        """Return sensor specific state data to be restored."""
+        if not self._store_trackers:
+            return super().extra_restore_state_data
+        return IrrigationExtraStoredData(
+            self.native_value,
+            self.native_unit_of_measurement,
+            _tracker_data(self.coordinator),
+        )
+
+    async def _async_restore_trackers(self) -> None:
+        """Restore the running day's trackers stored with the last state."""
+        if (data := await self.async_get_last_state()) is None:
+            return
+        trackers = None
+        if (extra := await self.async_get_last_extra_data()) is not None and (
+            stored := IrrigationExtraStoredData.from_dict(extra.as_dict())
+        ) is not None:
+            trackers = stored.trackers
+        _restore_trackers(self.coordinator, data, trackers)
+
 
 class EvapotranspirationSensor(IrrigationSensor):
     """Daily evapotranspiration."""
 
     _attr_native_unit_of_measurement = UnitOfLength.MILLIMETERS
     _attr_supported_features: IrrigationEntityFeature = IrrigationEntityFeature.UPDATE
+    _unrecorded_attributes = frozenset({ATTR_HISTORY_RESTORED})
+    _store_trackers = True
 
     def __init__(
         self, coordinator: CalculationEngine, config_entry: ConfigEntry
@@ -458,52 +338,50 @@ class EvapotranspirationSensor(IrrigationSensor):
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        attributes = {
-            ATTR_SUNSHINE_HOURS: self.coordinator.sunshine_tracker.get_hours()
-        }
-
-        if self.coordinator.temp_tracker.min:
-            attributes[ATTR_MIN_TEMP] = self.coordinator.temp_tracker.min
-        if self.coordinator.temp_tracker.max:
-            attributes[ATTR_MAX_TEMP] = self.coordinator.temp_tracker.max
-        if self.coordinator.rh_tracker.min:
-            attributes[ATTR_MIN_RH] = self.coordinator.rh_tracker.min
-        if self.coordinator.rh_tracker.max:
-            attributes[ATTR_MAX_RH] = self.coordinator.rh_tracker.max
-        if self.coordinator.wind_tracker.avg:
-            attributes[ATTR_MEAN_WIND] = self.coordinator.wind_tracker.avg
-        if self.coordinator.pressure_tracker.avg:
-            attributes[ATTR_MEAN_PRESSURE] = self.coordinator.pressure_tracker.avg
-        if self.coordinator.solar_radiation_tracker.avg:
-            attributes[
-                ATTR_MEAN_RADIATION
-            ] = self.coordinator.solar_radiation_tracker.avg
-        return attributes
+        return _result_attributes(self.coordinator) | _window_attributes(
+            self.coordinator, ATTR_EVAPOTRANSPIRATION
+        )
 
     async def async_added_to_hass(self) -> None:
         """Restore state once added to hass."""
         await super().async_added_to_hass()
-        if data := await self.async_get_last_sensor_data():
-            self._attr_native_value = data.native_value
+        if not await self._async_restore_results() and (
+            data := await self.async_get_last_sensor_data()
+        ):
             self.coordinator.evapotranspiration = data.native_value
+        self._attr_native_value = self.coordinator.evapotranspiration
+        await self._async_restore_trackers()
 
-        if data := await self.async_get_last_state():
-            # No need to restore avg from history for these
-            self.coordinator.temp_tracker.min = data.attributes.get(
-                ATTR_MIN_TEMP)
-            self.coordinator.temp_tracker.max = data.attributes.get(
-                ATTR_MAX_TEMP)
-            self.coordinator.rh_tracker.min = data.attributes.get(ATTR_MIN_RH)
-            self.coordinator.rh_tracker.max = data.attributes.get(ATTR_MAX_RH)
-            self.coordinator.sunshine_tracker.sunshine_hours = datetime.timedelta(
-                hours=1
-            ) * data.attributes.get(ATTR_SUNSHINE_HOURS)
-        await self.coordinator.async_retrieve_history()
+    async def async_update_daily(self):
+        """Recalculate ET0 and reset trackers"""
+        await self.coordinator.async_update_daily()
+
+
+class TallEvapotranspirationSensor(IrrigationSensor):
+    """Daily ASCE standardized tall reference evapotranspiration."""
+
+    _attr_native_unit_of_measurement = UnitOfLength.MILLIMETERS
+
+    def __init__(
+        self, coordinator: CalculationEngine, config_entry: ConfigEntry
+    ) -> None:
+        """Initialize the tall reference evapotranspiration sensor."""
+        super().__init__(coordinator, config_entry, ENTITY_EVAPOTRANSPIRATION_TALL)
+        self._attr_native_value = coordinator.evapotranspiration_tall
 
     @callback
-    def async_update_daily(self):
-        """Recalculate ET0 and reset trackers"""
-        self.coordinator.update_daily(None)
+    def _handle_coordinator_update(self) -> None:
+        self._attr_native_value = self.coordinator.evapotranspiration_tall
+        return super()._handle_coordinator_update()
+
+    async def async_added_to_hass(self) -> None:
+        """Restore state once added to hass."""
+        await super().async_added_to_hass()
+        if not await self._async_restore_results() and (
+            data := await self.async_get_last_sensor_data()
+        ):
+            self.coordinator.evapotranspiration_tall = data.native_value
+        self._attr_native_value = self.coordinator.evapotranspiration_tall
 
 
 class DailyBucketDelta(IrrigationSensor):
@@ -528,18 +406,23 @@ class DailyBucketDelta(IrrigationSensor):
         """Return the state attributes."""
         return {
             ATTR_PRECIPITATION: self.coordinator.precipitation,
+            **_window_attributes(
+                self.coordinator, ATTR_PRECIPITATION, ATTR_BUCKET_DELTA
+            ),
         }
 
     async def async_added_to_hass(self) -> None:
         """Restore state once added to hass."""
         await super().async_added_to_hass()
-        if data := await self.async_get_last_sensor_data():
-            self._attr_native_value = data.native_value
+        if not await self._async_restore_results() and (
+            data := await self.async_get_last_sensor_data()
+        ):
             self.coordinator.bucket_delta = data.native_value
+        self._attr_native_value = self.coordinator.bucket_delta
 
         if data := await self.async_get_last_state():
             self.coordinator.precipitation = data.attributes.get(
-                ATTR_PRECIPITATION)
+                ATTR_PRECIPITATION, 0.0)
 
 
 class CumulativeBucket(IrrigationSensor):
@@ -572,9 +455,11 @@ class CumulativeBucket(IrrigationSensor):
     async def async_added_to_hass(self) -> None:
         """Restore state once added to hass."""
         await super().async_added_to_hass()
-        if data := await self.async_get_last_sensor_data():
-            self._attr_native_value = data.native_value
+        if not await self._async_restore_results() and (
+            data := await self.async_get_last_sensor_data()
+        ):
             self.coordinator.bucket = data.native_value
+        self._attr_native_value = self.coordinator.bucket
 
 
 class CumulativeRunTime(IrrigationSensor):
@@ -583,6 +468,19 @@ class CumulativeRunTime(IrrigationSensor):
     _attr_native_unit_of_measurement = UnitOfTime.SECONDS
     _attr_device_class = SensorDeviceClass.DURATION
     _attr_supported_features: IrrigationEntityFeature = IrrigationEntityFeature.RESET
+    # Static configuration, no point in recording it on every write
+    _unrecorded_attributes = frozenset(
+        {
+            CONF_NUMBER_OF_SPRINKLERS,
+            CONF_FLOW,
+            ATTR_THROUGHPUT,
+            CONF_AREA,
+            ATTR_PRECIPITATION_RATE,
+            CONF_MAXIMUM_DURATION,
+            CONF_MAXIMUM_CYCLE,
+            CONF_SOAK_TIME,
+        }
+    )
 
     def __init__(
         self, coordinator: CalculationEngine, config_entry: ConfigEntry
@@ -606,9 +504,11 @@ class CumulativeRunTime(IrrigationSensor):
     async def async_added_to_hass(self) -> None:
         """Restore state once added to hass."""
         await super().async_added_to_hass()
-        if data := await self.async_get_last_sensor_data():
-            self._attr_native_value = data.native_value
+        if not await self._async_restore_results() and (
+            data := await self.async_get_last_sensor_data()
+        ):
             self.coordinator.runtime = data.native_value
+        self._attr_native_value = self.coordinator.runtime
 
     @property
     def extra_state_attributes(self):
@@ -620,4 +520,236 @@ class CumulativeRunTime(IrrigationSensor):
             CONF_AREA: self.coordinator.area,
             ATTR_PRECIPITATION_RATE: self.coordinator.precipitation_rate,
             CONF_MAXIMUM_DURATION: self.coordinator.maximum_duration,
+            CONF_MAXIMUM_CYCLE: self.coordinator.maximum_cycle,
+            CONF_SOAK_TIME: self.coordinator.soak_time,
         }
+
+
+class ZoneSensor(IrrigationSensor):
+    """Bucket of a zone with all other results as attributes.
+
+    Used in compact mode, instead of a sensor per result.
+    """
+
+    _attr_native_unit_of_measurement = UnitOfLength.MILLIMETERS
+    _attr_supported_features: IrrigationEntityFeature = (
+        IrrigationEntityFeature.RESET | IrrigationEntityFeature.UPDATE
+    )
+    _unrecorded_attributes = EvapotranspirationSensor._unrecorded_attributes
+    _store_trackers = True
+
+    def __init__(
+        self, coordinator: CalculationEngine, config_entry: ConfigEntry
+    ) -> None:
+        """Initialize the zone sensor."""
+        super().__init__(coordinator, config_entry, ENTITY_ZONE)
+        self._attr_native_value = coordinator.bucket
+        if get_config_value(config_entry, CONF_CREATE_DEVICE, False):
+            # Named after the device
+            self._attr_name = None
+        else:
+            self._attr_device_info = None
+            self._attr_has_entity_name = False
+            self._attr_name = config_entry.title
+
+    @callback
+    def async_reset(self):
+        """Reset the bucket and the run time."""
+        self.coordinator.bucket = 0.0
+        self.coordinator.runtime = 0
+        self._attr_native_value = 0.0
+        self.async_write_ha_state()
+
+    async def async_update_daily(self):
+        """Recalculate ET0 and reset trackers"""
+        await self.coordinator.async_update_daily()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._attr_native_value = self.coordinator.bucket
+        return super()._handle_coordinator_update()
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return {
+            ATTR_EVAPOTRANSPIRATION: self.coordinator.evapotranspiration,
+            ATTR_EVAPOTRANSPIRATION_TALL: self.coordinator.evapotranspiration_tall,
+            ATTR_BUCKET_DELTA: self.coordinator.bucket_delta,
+            ATTR_RUNTIME: self.coordinator.runtime,
+            ATTR_PRECIPITATION: self.coordinator.precipitation,
+            **_window_attributes(
+                self.coordinator,
+                ATTR_EVAPOTRANSPIRATION,
+                ATTR_PRECIPITATION,
+                ATTR_BUCKET_DELTA,
+            ),
+            **_result_attributes(self.coordinator),
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Restore state once added to hass."""
+        await super().async_added_to_hass()
+        data = await self.async_get_last_state()
+        # Stale or missing after switching from separate sensors
+        if not await self._async_restore_results() and data is not None:
+            if (sensor_data := await self.async_get_last_sensor_data()) is not None:
+                self.coordinator.bucket = sensor_data.native_value
+            attributes = data.attributes
+            if (value := attributes.get(ATTR_EVAPOTRANSPIRATION)) is not None:
+                self.coordinator.evapotranspiration = value
+            if (value := attributes.get(ATTR_EVAPOTRANSPIRATION_TALL)) is not None:
+                self.coordinator.evapotranspiration_tall = value
+            if (value := attributes.get(ATTR_BUCKET_DELTA)) is not None:
+                self.coordinator.bucket_delta = value
+            if (value := attributes.get(ATTR_RUNTIME)) is not None:
+                self.coordinator.runtime = value
+        if data is not None:
+            self.coordinator.precipitation = data.attributes.get(
+                ATTR_PRECIPITATION, 0.0
+            )
+        await self._async_restore_trackers()
+        self._attr_native_value = self.coordinator.bucket
+
+
+class LiveEvapotranspirationSensor(SensorEntity):
+    """Evapotranspiration of the running day so far."""
+
+    _attr_native_unit_of_measurement = UnitOfLength.MILLIMETERS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_icon = ICON
+
+    def __init__(
+        self, coordinator: CalculationEngine, config_entry: ConfigEntry
+    ) -> None:
+        """Initialize the live evapotranspiration sensor."""
+        self.coordinator = coordinator
+        self._attr_unique_id = (
+            f"{config_entry.entry_id}_{ENTITY_EVAPOTRANSPIRATION_TODAY}"
+        )
+        self._attr_name = ENTITY_EVAPOTRANSPIRATION_TODAY
+        self._attr_device_info = _device_info(config_entry)
+
+    @property
+    def native_value(self) -> float | None:
+        """Return ETo so far."""
+        return self.coordinator.evapotranspiration_today
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self.async_write_ha_state)
+        )
+
+
+@dataclass(frozen=True, kw_only=True)
+class TrackerSensorEntityDescription(SensorEntityDescription):
+    """Describes a diagnostic tracker sensor."""
+
+    value_fn: Callable[[CalculationEngine], float | None]
+
+
+TRACKER_SENSORS: tuple[TrackerSensorEntityDescription, ...] = (
+    TrackerSensorEntityDescription(
+        key=ATTR_MIN_TEMP,
+        name=ENTITY_MIN_TEMP,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        value_fn=lambda engine: engine.temp_tracker.min,
+    ),
+    TrackerSensorEntityDescription(
+        key=ATTR_MAX_TEMP,
+        name=ENTITY_MAX_TEMP,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        value_fn=lambda engine: engine.temp_tracker.max,
+    ),
+    TrackerSensorEntityDescription(
+        key=ATTR_MIN_RH,
+        name=ENTITY_MIN_RH,
+        device_class=SensorDeviceClass.HUMIDITY,
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda engine: engine.rh_tracker.min,
+    ),
+    TrackerSensorEntityDescription(
+        key=ATTR_MAX_RH,
+        name=ENTITY_MAX_RH,
+        device_class=SensorDeviceClass.HUMIDITY,
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda engine: engine.rh_tracker.max,
+    ),
+    TrackerSensorEntityDescription(
+        key=ATTR_MEAN_WIND,
+        name=ENTITY_MEAN_WIND,
+        device_class=SensorDeviceClass.WIND_SPEED,
+        native_unit_of_measurement=UnitOfSpeed.METERS_PER_SECOND,
+        value_fn=lambda engine: engine.wind_tracker.avg,
+    ),
+    TrackerSensorEntityDescription(
+        key=ATTR_MEAN_PRESSURE,
+        name=ENTITY_MEAN_PRESSURE,
+        device_class=SensorDeviceClass.ATMOSPHERIC_PRESSURE,
+        native_unit_of_measurement=UnitOfPressure.HPA,
+        value_fn=lambda engine: engine.pressure_tracker.avg,
+    ),
+    TrackerSensorEntityDescription(
+        key=ATTR_MEAN_RADIATION,
+        name=ENTITY_MEAN_RADIATION,
+        device_class=SensorDeviceClass.IRRADIANCE,
+        native_unit_of_measurement=UnitOfIrradiance.WATTS_PER_SQUARE_METER,
+        value_fn=lambda engine: engine.solar_radiation_tracker.avg,
+    ),
+    TrackerSensorEntityDescription(
+        key=ATTR_SUNSHINE_HOURS,
+        name=ENTITY_SUNSHINE_HOURS,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        value_fn=lambda engine: engine.sunshine_tracker.get_hours(),
+    ),
+)
+
+# Shared by all entries, created by one of them
+WORKER_POOL_SENSOR = TrackerSensorEntityDescription(
+    key=ATTR_QUEUE_DEPTH,
+    name=ENTITY_QUEUE_DEPTH,
+    value_fn=lambda engine: engine.worker_pool.queue_depth,
+)
+
+
+class TrackerSensor(SensorEntity):
+    """Live value of a daily tracker or of the worker pool, disabled by default."""
+
+    entity_description: TrackerSensorEntityDescription
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        coordinator: CalculationEngine,
+        config_entry: ConfigEntry,
+        description: TrackerSensorEntityDescription,
+    ) -> None:
+        """Initialize the tracker sensor."""
+        self.coordinator = coordinator
+        self.entity_description = description
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+        self._attr_device_info = _device_info(config_entry)
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the tracked value."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self.async_write_ha_state)
+        )
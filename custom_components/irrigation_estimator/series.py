@@ -0,0 +1,109 @@
+"""In-memory series of daily results for rolling totals."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+import datetime
+
+import numpy as np
+
+from .audit_log import AuditRecord
+from .const import (
+    ATTR_BUCKET_DELTA,
+    ATTR_EVAPOTRANSPIRATION,
+    ATTR_PRECIPITATION,
+)
+
+# Daily amounts, the bucket and the run time are levels and have no totals
+SERIES_COLUMNS = (
+    ATTR_EVAPOTRANSPIRATION,
+    ATTR_PRECIPITATION,
+    ATTR_BUCKET_DELTA,
+)
+# Rolling windows exposed by the entities, in days
+SERIES_WINDOWS = (3, 7, 30)
+
+
+class DailySeries:
+    """Prefix sums of the last days' results, one column per result.
+
+    Only prefix sums are kept, in ring buffers one row longer than the
+    capacity, so appending a day and totalling any window of up to capacity
+    days are O(1). Missing values count as zero in totals and are left out
+    of means. Days without a result are filled with empty rows.
+    """
+
+    def __init__(self, capacity: int = max(SERIES_WINDOWS)) -> None:
+        """Initialize the series."""
+        self.capacity = capacity
+        self._sums = np.zeros((capacity + 1, len(SERIES_COLUMNS)))
+        self._counts = np.zeros((capacity + 1, len(SERIES_COLUMNS)), dtype=np.int64)
+        self._rows = 0
+        self._last_date: datetime.date | None = None
+
+    def __len__(self) -> int:
+        """Return number of days held."""
+        return min(self._rows, self.capacity)
+
+    def _slot(self, row: int) -> int:
+        return row % (self.capacity + 1)
+
+    def _append_row(self) -> None:
+        self._sums[self._slot(self._rows + 1)] = self._sums[self._slot(self._rows)]
+        self._counts[self._slot(self._rows + 1)] = self._counts[self._slot(self._rows)]
+        self._rows += 1
+
+    def add(self, date: datetime.date, values: Sequence[float | None]) -> None:
+        """Add results of a day, in SERIES_COLUMNS order.
+
+        Results of the last day again, from a forced update, add up with it.
+        """
+        if self._last_date is None or date > self._last_date:
+            if self._last_date is not None:
+                for _ in range(min((date - self._last_date).days - 1, self.capacity)):
+                    self._append_row()
+            self._append_row()
+            self._last_date = date
+        elif date < self._last_date:
+            raise ValueError(f"Results for {date} are older than the last ones")
+
+        row = np.array([np.nan if value is None else value for value in values])
+        valid = ~np.isnan(row)
+        slot = self._slot(self._rows)
+        self._sums[slot] += np.where(valid, row, 0.0)
+        self._counts[slot] += valid
+
+    def add_record(self, record: AuditRecord) -> None:
+        """Add results of an audit log record."""
+        self.add(record.date, [getattr(record, column) for column in SERIES_COLUMNS])
+
+    def _window(self, column: str, days: int) -> tuple[float, int]:
+        index = SERIES_COLUMNS.index(column)
+        days = min(days, len(self))
+        end = self._slot(self._rows)
+        start = self._slot(self._rows - days)
+        return (
+            float(self._sums[end, index] - self._sums[start, index]),
+            int(self._counts[end, index] - self._counts[start, index]),
+        )
+
+    def total(self, column: str, days: int) -> float | None:
+        """Return total of a result over the last days, None without values."""
+        total, count = self._window(column, days)
+        return round(total, 2) if count else None
+
+    def mean(self, column: str, days: int) -> float | None:
+        """Return daily mean of a result over the last days, None without values."""
+        total, count = self._window(column, days)
+        return round(total / count, 2) if count else None
+
+    def as_dict(self) -> dict[str, float | None]:
+        """Return totals, and ET means, over SERIES_WINDOWS."""
+        windows: dict[str, float | None] = {}
+        for days in SERIES_WINDOWS:
+            for column in SERIES_COLUMNS:
+                windows[f"{column}_{days}d"] = self.total(column, days)
+            windows[f"mean_{ATTR_EVAPOTRANSPIRATION}_{days}d"] = self.mean(
+                ATTR_EVAPOTRANSPIRATION, days
+            )
+        return windows
@@ -0,0 +1,243 @@
+"""Integration wide services."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import math
+
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+import homeassistant.util.dt as dt_util
+import voluptuous as vol
+
+from .const import (
+    ATTR_ALBEDO,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_END_DATE,
+    ATTR_MAX_FLOW,
+    ATTR_SECONDS,
+    ATTR_START,
+    ATTR_START_DATE,
+    ATTR_TOP,
+    CONF_ACCURATE_SOLAR_RADIATION,
+    CONF_SOLAR_RADIATION_THRESHOLD,
+    CONF_WIND_MEASUREMENT_HEIGHT,
+    DOMAIN,
+    SERVICE_GET_STATUS,
+    SERVICE_PROFILE,
+    SERVICE_SCHEDULE,
+    SERVICE_WHAT_IF,
+)
+from .engine import CalculationEngine
+from .profiler import ProfileSession
+from .scheduler import ZoneDemand, pack_schedule, schedule_duration
+from .worker_pool import async_get_worker_pool
+
+SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_MAX_FLOW): vol.All(
+            vol.Coerce(float), vol.Range(min=0, min_included=False)
+        ),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_START): cv.datetime,
+    }
+)
+
+GET_STATUS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+WHAT_IF_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_START_DATE): cv.date,
+        vol.Optional(ATTR_END_DATE): cv.date,
+        vol.Optional(CONF_WIND_MEASUREMENT_HEIGHT): vol.All(
+            cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0.1))]
+        ),
+        vol.Optional(ATTR_ALBEDO): vol.All(
+            cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0, max=1))]
+        ),
+        vol.Optional(CONF_SOLAR_RADIATION_THRESHOLD): vol.All(
+            cv.ensure_list, [vol.Coerce(float)]
+        ),
+        vol.Optional(CONF_ACCURATE_SOLAR_RADIATION): vol.All(
+            cv.ensure_list, [cv.boolean]
+        ),
+    }
+)
+
+MAX_WHAT_IF_COMBINATIONS = 100_000
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_SECONDS, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional(ATTR_TOP, default=20): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=500)
+        ),
+    }
+)
+
+
+@callback
+def async_get_engines(
+    hass: HomeAssistant, entry_ids: list[str] | None = None
+) -> dict[str, tuple[ConfigEntry, CalculationEngine]]:
+    """Return engines of loaded entries, optionally only the given ones."""
+    engines = {
+        entry.entry_id: (entry, entry.runtime_data)
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+    }
+    if entry_ids is None:
+        return engines
+    if unknown := set(entry_ids) - engines.keys():
+        raise ServiceValidationError(
+            f"Config entries not loaded: {', '.join(sorted(unknown))}"
+        )
+    return {entry_id: engines[entry_id] for entry_id in entry_ids}
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register integration services."""
+
+    async def async_schedule(call: ServiceCall) -> ServiceResponse:
+        engines = async_get_engines(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        zones = [
+            ZoneDemand(
+                entry_id,
+                engine.runtime,
+                engine.throughput,
+                engine.maximum_cycle,
+                engine.soak_time,
+            )
+            for entry_id, (_, engine) in engines.items()
+        ]
+        try:
+            runs = pack_schedule(zones, call.data[ATTR_MAX_FLOW])
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+
+        start: datetime.datetime | None = call.data.get(ATTR_START)
+        if start is not None:
+            start = dt_util.as_local(start)
+
+        response_runs = []
+        for run in runs:
+            item = {
+                ATTR_CONFIG_ENTRY_ID: run.zone_id,
+                "name": engines[run.zone_id][0].title,
+                "start": round(run.start, 1),
+                "end": round(run.end, 1),
+                "duration": round(run.duration, 1),
+                "flow": run.flow,
+            }
+            if start is not None:
+                item["start_time"] = (
+                    start + datetime.timedelta(seconds=run.start)
+                ).isoformat()
+                item["end_time"] = (
+                    start + datetime.timedelta(seconds=run.end)
+                ).isoformat()
+            response_runs.append(item)
+
+        return {
+            ATTR_MAX_FLOW: call.data[ATTR_MAX_FLOW],
+            "duration": round(schedule_duration(runs), 1),
+            "runs": response_runs,
+        }
+
+    @callback
+    def async_get_status(call: ServiceCall) -> ServiceResponse:
+        return {
+            "entries": {
+                entry_id: {"name": entry.title, **engine.as_dict()}
+                for entry_id, (entry, engine) in async_get_engines(
+                    hass, call.data.get(ATTR_CONFIG_ENTRY_ID)
+                ).items()
+            }
+        }
+
+    async def async_what_if(call: ServiceCall) -> ServiceResponse:
+        entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+        _, engine = async_get_engines(hass, [entry_id])[entry_id]
+        grid = [
+            call.data.get(key)
+            for key in (
+                CONF_WIND_MEASUREMENT_HEIGHT,
+                ATTR_ALBEDO,
+                CONF_SOLAR_RADIATION_THRESHOLD,
+                CONF_ACCURATE_SOLAR_RADIATION,
+            )
+        ]
+        if math.prod(len(values or [None]) for values in grid) > MAX_WHAT_IF_COMBINATIONS:
+            raise ServiceValidationError(
+                f"At most {MAX_WHAT_IF_COMBINATIONS} combinations are supported"
+            )
+        return await engine.async_what_if(
+            call.data.get(ATTR_START_DATE), call.data.get(ATTR_END_DATE), *grid
+        )
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        pool = async_get_worker_pool(hass)
+        if pool.profile_session is not None:
+            raise ServiceValidationError("Profiling is already running")
+        session = pool.profile_session = ProfileSession()
+        try:
+            await asyncio.sleep(call.data[ATTR_SECONDS])
+        finally:
+            pool.profile_session = None
+
+        path = hass.config.path(
+            f"{DOMAIN}.{dt_util.now().strftime('%Y%m%d%H%M%S')}.prof"
+        )
+        if not await hass.async_add_executor_job(session.dump, path):
+            path = None
+        return {
+            "path": path,
+            "calls": session.calls,
+            "functions": session.top(call.data[ATTR_TOP]),
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_STATUS,
+        async_get_status,
+        schema=GET_STATUS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_WHAT_IF,
+        async_what_if,
+        schema=WHAT_IF_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SCHEDULE,
+        async_schedule,
+        schema=SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
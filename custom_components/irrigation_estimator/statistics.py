@@ -0,0 +1,97 @@
+"""Daily results as external long-term statistics."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfLength
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+
+from .audit_log import AuditRecord
+from .const import (
+    ATTR_BUCKET,
+    ATTR_BUCKET_DELTA,
+    ATTR_EVAPOTRANSPIRATION,
+    ATTR_PRECIPITATION,
+    DOMAIN,
+    ENTITY_BUCKET,
+    ENTITY_BUCKET_DELTA,
+    ENTITY_EVAPOTRANSPIRATION,
+)
+
+# Daily amounts are summed, so graphs show the change per period
+SUM_STATISTICS = {
+    ATTR_EVAPOTRANSPIRATION: ENTITY_EVAPOTRANSPIRATION,
+    ATTR_PRECIPITATION: "Precipitation",
+    ATTR_BUCKET_DELTA: ENTITY_BUCKET_DELTA,
+}
+MEAN_STATISTICS = {
+    ATTR_BUCKET: ENTITY_BUCKET,
+}
+
+
+def get_statistic_id(entry_id: str, key: str) -> str:
+    """Return id of the external statistic of a result."""
+    return f"{DOMAIN}:{entry_id.lower()}_{key}"
+
+
+def build_statistics(
+    records: Iterable[AuditRecord], sums: dict[str, float]
+) -> dict[str, list[StatisticData]]:
+    """Return one row per day and result, continuing the running sums.
+
+    Several records of one day, from forced updates, add up to a single
+    row. sums is updated in place.
+    """
+    days: dict = {}
+    for record in records:
+        day = days.setdefault(record.date, {})
+        for key in SUM_STATISTICS:
+            if (value := getattr(record, key)) is not None:
+                day[key] = day.get(key, 0.0) + value
+        if record.bucket is not None:
+            day[ATTR_BUCKET] = record.bucket
+
+    statistics: dict[str, list[StatisticData]] = {
+        key: [] for key in (*SUM_STATISTICS, *MEAN_STATISTICS)
+    }
+    for date, values in days.items():
+        # Statistics start on the UTC hour, not every zone has whole hour offsets
+        start = dt_util.as_utc(dt_util.start_of_local_day(date)).replace(minute=0)
+        for key in SUM_STATISTICS:
+            if (value := values.get(key)) is None:
+                continue
+            sums[key] = sums.get(key, 0.0) + value
+            statistics[key].append(
+                StatisticData(start=start, state=value, sum=round(sums[key], 2))
+            )
+        if (bucket := values.get(ATTR_BUCKET)) is not None:
+            statistics[ATTR_BUCKET].append(
+                StatisticData(start=start, mean=bucket, min=bucket, max=bucket)
+            )
+    return statistics
+
+
+@callback
+def async_add_statistics(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    statistics: dict[str, list[StatisticData]],
+) -> None:
+    """Queue statistics rows for the recorder, replacing rows of the same days."""
+    for key, rows in statistics.items():
+        if not rows:
+            continue
+        metadata = StatisticMetaData(
+            has_mean=key in MEAN_STATISTICS,
+            has_sum=key in SUM_STATISTICS,
+            name=f"{config_entry.title} {(SUM_STATISTICS | MEAN_STATISTICS)[key]}",
+            source=DOMAIN,
+            statistic_id=get_statistic_id(config_entry.entry_id, key),
+            unit_of_measurement=UnitOfLength.MILLIMETERS,
+        )
+        async_add_external_statistics(hass, metadata, rows)
@@ -0,0 +1,128 @@
+"""WebSocket API for dashboards."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+import voluptuous as vol
+
+from .const import (
+    ATTR_BUCKET,
+    ATTR_BUCKET_DELTA,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_END_DATE,
+    ATTR_EVAPOTRANSPIRATION,
+    ATTR_PRECIPITATION,
+    ATTR_RUNTIME,
+    ATTR_START_DATE,
+    DOMAIN,
+    SIGNAL_ENGINE_UPDATED,
+)
+from .services import async_get_engines
+
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    """Register WebSocket commands."""
+    websocket_api.async_register_command(hass, ws_subscribe)
+    websocket_api.async_register_command(hass, ws_history)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe",
+    }
+)
+@callback
+def ws_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream engine results of all entries.
+
+    The first event carries everything, later ones only the values that
+    changed and the entries that went away.
+    """
+    sent: dict[str, dict[str, Any]] = {}
+
+    def _snapshot(entry, engine) -> dict[str, Any]:
+        return {"name": entry.title, **engine.as_dict()}
+
+    @callback
+    def _forward(entry_id: str) -> None:
+        engines = async_get_engines(hass)
+        if entry_id not in engines:
+            if sent.pop(entry_id, None) is not None:
+                connection.send_message(
+                    websocket_api.event_message(
+                        msg["id"], {"entries": {}, "removed": [entry_id]}
+                    )
+                )
+            return
+
+        current = _snapshot(*engines[entry_id])
+        previous = sent.get(entry_id, {})
+        changes = {
+            key: value
+            for key, value in current.items()
+            if key not in previous or previous[key] != value
+        }
+        sent[entry_id] = current
+        if changes:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"], {"entries": {entry_id: changes}, "removed": []}
+                )
+            )
+
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(
+        hass, SIGNAL_ENGINE_UPDATED, _forward
+    )
+    connection.send_result(msg["id"])
+
+    for entry_id, (entry, engine) in async_get_engines(hass).items():
+        sent[entry_id] = _snapshot(entry, engine)
+    connection.send_message(
+        websocket_api.event_message(
+            msg["id"], {"entries": dict(sent), "removed": []}
+        )
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/history",
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_START_DATE): cv.date,
+        vol.Optional(ATTR_END_DATE): cv.date,
+    }
+)
+@websocket_api.async_response
+async def ws_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return daily series from the audit logs in columnar form."""
+    engines = async_get_engines(hass, msg.get(ATTR_CONFIG_ENTRY_ID))
+    result = {}
+    for entry_id, (_, engine) in engines.items():
+        records = await engine.async_read_audit_log(
+            msg.get(ATTR_START_DATE), msg.get(ATTR_END_DATE)
+        )
+        result[entry_id] = {
+            "date": [record.date.isoformat() for record in records],
+            ATTR_EVAPOTRANSPIRATION: [
+                record.evapotranspiration for record in records
+            ],
+            ATTR_PRECIPITATION: [record.precipitation for record in records],
+            ATTR_BUCKET_DELTA: [record.bucket_delta for record in records],
+            ATTR_BUCKET: [record.bucket for record in records],
+            ATTR_RUNTIME: [record.runtime for record in records],
+        }
+    connection.send_result(msg["id"], {"entries": result})
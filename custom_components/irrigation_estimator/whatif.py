@@ -0,0 +1,248 @@
+"""What-if evaluation of calculation parameters over logged days."""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+import datetime
+
+import homeassistant.util.dt as dt_util
+import numpy as np
+
+from .audit_log import AuditRecord
+from .const import (
+    ATTR_ALBEDO,
+    ATTR_BUCKET,
+    ATTR_EVAPOTRANSPIRATION,
+    ATTR_EVAPOTRANSPIRATION_TALL,
+    ATTR_MEAN_EVAPOTRANSPIRATION,
+    CONF_ACCURATE_SOLAR_RADIATION,
+    CONF_SENSOR_HUMIDITY,
+    CONF_SENSOR_PRESSURE,
+    CONF_SENSOR_SOLAR_RADIATION,
+    CONF_SENSOR_TEMPERATURE,
+    CONF_SENSOR_WINDSPEED,
+    CONF_SOLAR_RADIATION_THRESHOLD,
+    CONF_WIND_MEASUREMENT_HEIGHT,
+    MODEL_FAO56,
+    MODEL_HARGREAVES,
+    MODEL_PRIESTLEY_TAYLOR,
+    OPTION_GRASS,
+    OPTION_TALL,
+)
+from .helpers import (
+    estimate_hargreaves_daily,
+    estimate_priestley_taylor_array,
+    estimate_reference_et_array,
+)
+from .models import TALL_REFERENCE_RATIO, EtModel, select_model
+
+
+def radiation_samples(
+    states, index_by_date: dict[datetime.date, int]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return timestamps, values and record index of radiation history."""
+    timestamps = []
+    values = []
+    day_index = []
+    for state in states:
+        try:
+            value = float(state.state)
+        except (TypeError, ValueError):
+            continue
+        timestamps.append(state.last_updated.timestamp())
+        values.append(value)
+        day_index.append(
+            index_by_date.get(dt_util.as_local(state.last_updated).date(), -1)
+        )
+    return (
+        np.array(timestamps, dtype=float),
+        np.array(values, dtype=float),
+        np.array(day_index, dtype=int),
+    )
+
+
+def sunshine_hours_by_threshold(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    day_index: np.ndarray,
+    days: int,
+    thresholds: list[float],
+) -> np.ndarray:
+    """Return sunshine hours per threshold and day from radiation samples.
+
+    Like SunshineTracker, the interval before a sample counts as sunshine if
+    the sample reaches the threshold. Days without samples are NaN.
+    """
+    result = np.full((len(thresholds), days), np.nan)
+    if len(timestamps) < 2:
+        return result
+    durations = np.diff(timestamps) / 3600
+    values = values[1:]
+    day_index = day_index[1:]
+    thresholds = np.asarray(thresholds, dtype=float)
+
+    for day in np.unique(day_index[(day_index >= 0) & (day_index < days)]):
+        mask = day_index == day
+        order = np.argsort(values[mask])
+        sorted_values = values[mask][order]
+        # hours with radiation at or above each sorted value
+        hours_above = np.cumsum(durations[mask][order][::-1])[::-1]
+        first = np.searchsorted(sorted_values, thresholds, side="left")
+        result[:, day] = np.where(
+            first < len(sorted_values),
+            hours_above[np.minimum(first, len(sorted_values) - 1)],
+            0.0,
+        )
+    return result
+
+
+def mean_by_day(values: np.ndarray, day_index: np.ndarray, days: int) -> np.ndarray:
+    """Return plain mean of the samples of each day, NaN for days without any."""
+    mask = (day_index >= 0) & (day_index < days)
+    counts = np.bincount(day_index[mask], minlength=days)
+    sums = np.bincount(day_index[mask], weights=values[mask], minlength=days)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def record_model(
+    record: AuditRecord, models: Collection[EtModel] | None = None
+) -> EtModel | None:
+    """Return the best of the models the logged inputs of a record support."""
+    available = {
+        CONF_SENSOR_TEMPERATURE: None not in (record.temp_min, record.temp_max),
+        CONF_SENSOR_HUMIDITY: None not in (record.rh_min, record.rh_max),
+        CONF_SENSOR_PRESSURE: record.mean_pressure is not None,
+        CONF_SENSOR_WINDSPEED: record.mean_wind is not None,
+        # No sunshine is counted without radiation data
+        CONF_SENSOR_SOLAR_RADIATION: record.mean_radiation is not None
+        or bool(record.sunshine_hours),
+    }
+    return select_model([key for key, value in available.items() if value], models)
+
+
+def evaluate_grid(
+    records: list[AuditRecord],
+    latitude: float,
+    elevation: float,
+    wind_meas_heights: list[float],
+    albedos: list[float],
+    thresholds: list[float],
+    accurate: list[bool],
+    sunshine: np.ndarray,
+    mean_radiation: np.ndarray,
+    models: Collection[EtModel] | None = None,
+    reference_crop: str = OPTION_GRASS,
+) -> dict[str, list]:
+    """Evaluate ETo, ETr and bucket for every combination of parameters at once.
+
+    sunshine holds hours per threshold and record, mean_radiation one value
+    per record. Each record is evaluated with the best of models its logged
+    inputs support, like the engine degrades. Records none of them supports,
+    or that lack radiation for a threshold, keep their logged results. The
+    bucket is driven by the reference crop. Bucket resets are not replayed,
+    the bucket starts from its value before the first record.
+    """
+
+    def column(name: str) -> np.ndarray:
+        values = (getattr(record, name) for record in records)
+        return np.array(
+            [np.nan if value is None else value for value in values], dtype=float
+        )
+
+    wind_height, albedo, threshold, accurate_radiation = (
+        grid.ravel()
+        for grid in np.meshgrid(
+            np.asarray(wind_meas_heights, dtype=float),
+            np.asarray(albedos, dtype=float),
+            np.arange(len(thresholds)),
+            np.asarray(accurate, dtype=bool),
+            indexing="ij",
+        )
+    )
+    day_of_year = np.array([record.date.timetuple().tm_yday for record in records])
+    model_names = np.array(
+        [
+            None if (model := record_model(record, models)) is None else model.name
+            for record in records
+        ]
+    )
+    sol_rad = np.where(accurate_radiation[:, None], mean_radiation, np.nan)
+    eto = np.full((len(wind_height), len(records)), np.nan)
+    etr = np.full_like(eto, np.nan)
+
+    if (fao56 := model_names == MODEL_FAO56).any():
+        eto_fao56, etr_fao56 = estimate_reference_et_array(
+            day_of_year,
+            latitude,
+            elevation,
+            wind_height[:, None],
+            column("temp_min"),
+            column("temp_max"),
+            column("rh_min"),
+            column("rh_max"),
+            column("mean_pressure"),
+            column("mean_wind"),
+            sol_rad,
+            sunshine[threshold],
+            albedo[:, None],
+        )
+        eto = np.where(fao56, eto_fao56, eto)
+        etr = np.where(fao56, etr_fao56, etr)
+    if (priestley_taylor := model_names == MODEL_PRIESTLEY_TAYLOR).any():
+        eto_priestley_taylor = estimate_priestley_taylor_array(
+            day_of_year,
+            latitude,
+            elevation,
+            column("temp_min"),
+            column("temp_max"),
+            column("rh_min"),
+            column("rh_max"),
+            column("mean_pressure"),
+            sol_rad,
+            sunshine[threshold],
+            albedo[:, None],
+        )
+        eto = np.where(priestley_taylor, eto_priestley_taylor, eto)
+        etr = np.where(
+            priestley_taylor, eto_priestley_taylor * TALL_REFERENCE_RATIO, etr
+        )
+    if (hargreaves := model_names == MODEL_HARGREAVES).any():
+        # Needs none of the parameters, the same for every combination
+        eto_hargreaves = np.array(
+            [
+                estimate_hargreaves_daily(
+                    day, latitude, record.temp_min, record.temp_max
+                )
+                if model == MODEL_HARGREAVES
+                else np.nan
+                for day, record, model in zip(day_of_year, records, model_names)
+            ]
+        )
+        eto = np.where(hargreaves, eto_hargreaves, eto)
+        etr = np.where(hargreaves, eto_hargreaves * TALL_REFERENCE_RATIO, etr)
+
+    # the logged result, of the fallback policy or a model, where none applies
+    eto = np.round(np.where(np.isnan(eto), column("evapotranspiration"), eto), 2)
+    etr = np.round(
+        np.where(np.isnan(etr), column("evapotranspiration_tall"), etr), 2
+    )
+    eto = np.nan_to_num(eto)
+    etr = np.nan_to_num(etr)
+
+    precipitation = np.nan_to_num(column("precipitation"))
+    driver = etr if reference_crop == OPTION_TALL else eto
+    first = records[0]
+    start_bucket = (first.bucket or 0.0) - (first.bucket_delta or 0.0)
+    bucket = start_bucket + np.sum(precipitation - driver, axis=1)
+
+    return {
+        CONF_WIND_MEASUREMENT_HEIGHT: wind_height.tolist(),
+        ATTR_ALBEDO: albedo.tolist(),
+        CONF_SOLAR_RADIATION_THRESHOLD: [thresholds[i] for i in threshold],
+        CONF_ACCURATE_SOLAR_RADIATION: accurate_radiation.tolist(),
+        ATTR_EVAPOTRANSPIRATION: np.round(eto.sum(axis=1), 2).tolist(),
+        ATTR_MEAN_EVAPOTRANSPIRATION: np.round(eto.mean(axis=1), 2).tolist(),
+        ATTR_EVAPOTRANSPIRATION_TALL: np.round(etr.sum(axis=1), 2).tolist(),
+        ATTR_BUCKET: np.round(bucket, 2).tolist(),
+    }
@@ -0,0 +1,143 @@
+"""Worker pool shared by the calculation engines of all entries."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import threading
+import time
+from typing import Any, TypeVar
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import DOMAIN, WORKER_POOL_SIZE
+from .profiler import ProfileSession
+
+DATA_WORKER_POOL = f"{DOMAIN}_worker_pool"
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class TaskStats:
+    """Durations of the tasks run under one name."""
+
+    count: int = 0
+    total: float = 0.0  # [s]
+    last: float = 0.0  # [s]
+    max: float = 0.0  # [s]
+
+    def add(self, duration: float) -> None:
+        """Account for a finished task."""
+        self.count += 1
+        self.total += duration
+        self.last = duration
+        self.max = max(self.max, duration)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return stats with durations in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else None,
+            "last_ms": round(self.last * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class WorkerPool:
+    """Bounded thread pool for ETo computations and history reductions.
+
+    Work submitted by the engines queues up behind a fixed number of
+    threads, so a burst of entries rolling over at midnight cannot occupy
+    the executor Home Assistant uses for I/O.
+    """
+
+    def __init__(self, max_workers: int = WORKER_POOL_SIZE) -> None:
+        """Initialize the pool."""
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=DOMAIN
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._stats: dict[str, TaskStats] = {}
+        # Set while the profile service runs
+        self.profile_session: ProfileSession | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Return number of tasks waiting for a worker."""
+        return self._queued
+
+    @property
+    def running(self) -> int:
+        """Return number of tasks being worked on."""
+        return self._running
+
+    async def async_run(
+        self, name: str, target: Callable[..., _T], *args: Any
+    ) -> _T:
+        """Run target in the pool, accounting its duration under name."""
+
+        def _run() -> _T:
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            started = time.perf_counter()
+            try:
+                return self.run_profiled(target, *args)
+            finally:
+                duration = time.perf_counter() - started
+                with self._lock:
+                    self._running -= 1
+                    self._stats.setdefault(name, TaskStats()).add(duration)
+
+        with self._lock:
+            self._queued += 1
+        try:
+            future = self._executor.submit(_run)
+        except RuntimeError:
+            with self._lock:
+                self._queued -= 1
+            raise
+        return await asyncio.wrap_future(future)
+
+    def run_profiled(self, target: Callable[..., _T], *args: Any) -> _T:
+        """Run target, under the profiler if a profile session is active."""
+        if (session := self.profile_session) is None:
+            return target(*args)
+        return session.runcall(target, *args)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return pool state for monitoring."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "tasks": {name: stats.as_dict() for name, stats in self._stats.items()},
+            }
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping queued tasks."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@callback
+def async_get_worker_pool(hass: HomeAssistant) -> WorkerPool:
+    """Return the pool shared by all entries, creating it on first use."""
+    if (pool := hass.data.get(DATA_WORKER_POOL)) is not None:
+        return pool
+
+    pool = hass.data[DATA_WORKER_POOL] = WorkerPool()
+
+    @callback
+    def _shutdown(_: Event) -> None:
+        pool.shutdown()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _shutdown)
+    return pool
@@ -0,0 +1,230 @@
+"""Load test of many calculation engines sharing the same weather sensors.
+
+Skipped unless IRRIGATION_ESTIMATOR_LOAD_TEST is set. Engines run on a bare
+Home Assistant core, like in test_engine, one per config entry. Results are
+written as JSON so they can be compared across releases:
+
+    IRRIGATION_ESTIMATOR_LOAD_TEST=1 pytest tests/load --no-cov
+
+IRRIGATION_ESTIMATOR_LOAD_ENTRIES (200), IRRIGATION_ESTIMATOR_LOAD_RATE
+(events per second, 1000), IRRIGATION_ESTIMATOR_LOAD_DURATION (seconds, 10)
+and IRRIGATION_ESTIMATOR_LOAD_RESULTS (load_results.json) tune the run.
+"""
+import asyncio
+from datetime import timedelta
+import gc
+import json
+import os
+import random
+import statistics
+import time
+import tracemalloc
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT, __version__ as HA_VERSION
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+import pytest
+
+from custom_components.irrigation_estimator.const import DOMAIN, MODEL_FAO56
+from custom_components.irrigation_estimator.engine import CalculationEngine
+from custom_components.irrigation_estimator.worker_pool import DATA_WORKER_POOL
+
+from ..test_engine import CONFIG, UNITS
+
+if not os.environ.get("IRRIGATION_ESTIMATOR_LOAD_TEST"):
+    pytest.skip("load test not requested", allow_module_level=True)
+
+ENTRIES = int(os.environ.get("IRRIGATION_ESTIMATOR_LOAD_ENTRIES", "200"))
+RATE = int(os.environ.get("IRRIGATION_ESTIMATOR_LOAD_RATE", "1000"))
+DURATION = float(os.environ.get("IRRIGATION_ESTIMATOR_LOAD_DURATION", "10"))
+RESULTS = os.environ.get("IRRIGATION_ESTIMATOR_LOAD_RESULTS", "load_results.json")
+
+BASE_VALUES = {
+    "sensor.temperature": 20.0,
+    "sensor.humidity": 60.0,
+    "sensor.pressure": 1000.0,
+    "sensor.wind": 2.0,
+    "sensor.radiation": 400.0,
+    "sensor.rain": 0.0,
+}
+
+
+class LoopLagProbe:
+    """Measures how late the event loop wakes up a sleeping task."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """Initialize the probe."""
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(loop.time() - started - self.interval, 0.0))
+
+    def start(self) -> None:
+        """Start sampling."""
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> dict[str, float]:
+        """Stop sampling and return lag percentiles in milliseconds."""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        samples = sorted(self.samples) or [0.0]
+        return {
+            "p50_ms": round(statistics.median(samples) * 1000, 3),
+            "p99_ms": round(samples[int((len(samples) - 1) * 0.99)] * 1000, 3),
+            "max_ms": round(samples[-1] * 1000, 3),
+            "samples": len(self.samples),
+        }
+
+
+class Clock:
+    """Wall clock that can be moved ahead, shared by all engines."""
+
+    def __init__(self) -> None:
+        """Initialize the clock."""
+        self.offset = timedelta()
+
+    def __call__(self):
+        """Return the current time in UTC."""
+        return dt_util.utcnow() + self.offset
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    hass = HomeAssistant(str(tmp_path))
+    hass.config.latitude = 50.0
+    hass.config.elevation = 200
+    yield hass
+    await hass.async_block_till_done()
+    hass.data[DATA_WORKER_POOL].shutdown()
+
+
+def _set_sensors(hass: HomeAssistant, values: dict[str, float]) -> None:
+    for entity_id, value in values.items():
+        hass.states.async_set(
+            entity_id, round(value, 2), {ATTR_UNIT_OF_MEASUREMENT: UNITS[entity_id]}
+        )
+
+
+async def _drive_events(hass: HomeAssistant, rate: int, duration: float) -> int:
+    """Set sensor states at rate per second, return number of changes made.
+
+    A tick never sends more than its share, a backlog is dropped rather than
+    sent in one burst.
+    """
+    values = dict(BASE_VALUES)
+    entity_ids = list(values)
+    tick = 0.01
+    sent = 0
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    while (elapsed := loop.time() - started) < duration:
+        for _ in range(min(int(rate * (elapsed + tick)) - sent, int(rate * tick))):
+            entity_id = random.choice(entity_ids)
+            values[entity_id] = max(values[entity_id] + random.uniform(-1, 1), 0)
+            _set_sensors(hass, {entity_id: values[entity_id]})
+            sent += 1
+        await asyncio.sleep(tick)
+    return sent
+
+
+async def test_load(hass: HomeAssistant) -> None:
+    """Start many engines, drive events, roll over and stop them."""
+    results: dict = {
+        "ha_version": HA_VERSION,
+        "entries": ENTRIES,
+        "event_rate_target": RATE,
+        "duration_s": DURATION,
+    }
+    _set_sensors(hass, BASE_VALUES)
+    clock = Clock()
+    probe = LoopLagProbe()
+
+    gc.collect()
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    probe.start()
+    started = time.perf_counter()
+    engines = []
+    unsubscribes = []
+    for index in range(ENTRIES):
+        entry = ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title=f"Zone {index}",
+            data=CONFIG,
+            source="user",
+        )
+        engine = CalculationEngine(hass, entry, clock=clock)
+        # Listening like the entities of the entry do
+        unsubscribes.append(engine.async_add_listener(lambda: None))
+        engines.append(engine)
+    await asyncio.gather(*(engine._async_restore_history() for engine in engines))
+    await hass.async_block_till_done()
+    setup = time.perf_counter() - started
+    results["setup"] = {
+        "total_s": round(setup, 3),
+        "per_entry_ms": round(setup / ENTRIES * 1000, 3),
+        "loop_lag": await probe.stop(),
+    }
+    gc.collect()
+    results["memory_per_entry_kib"] = round(
+        (tracemalloc.get_traced_memory()[0] - memory_before) / ENTRIES / 1024, 1
+    )
+    tracemalloc.stop()
+
+    probe.start()
+    started = time.perf_counter()
+    sent = await _drive_events(hass, RATE, DURATION)
+    await hass.async_block_till_done()
+    elapsed = time.perf_counter() - started
+    results["events"] = {
+        "sent": sent,
+        "rate_achieved": round(sent / elapsed, 1),
+        "loop_lag": await probe.stop(),
+    }
+
+    # Every engine closes its day at once
+    now = dt_util.utcnow()
+    clock.offset = (
+        dt_util.start_of_local_day(dt_util.as_local(now).date() + timedelta(days=1))
+        + timedelta(seconds=10)
+        - now
+    )
+    probe.start()
+    started = time.perf_counter()
+    for engine in engines:
+        engine._async_midnight(None)
+    await hass.async_block_till_done()
+    results["rollover"] = {
+        "total_s": round(time.perf_counter() - started, 3),
+        "loop_lag": await probe.stop(),
+        "worker_pool": hass.data[DATA_WORKER_POOL].as_dict(),
+    }
+    assert all(engine.et_model == MODEL_FAO56 for engine in engines)
+
+    probe.start()
+    started = time.perf_counter()
+    for unsubscribe in unsubscribes:
+        unsubscribe()
+    await hass.async_block_till_done()
+    unload = time.perf_counter() - started
+    results["unload"] = {
+        "total_s": round(unload, 3),
+        "per_entry_ms": round(unload / ENTRIES * 1000, 3),
+        "loop_lag": await probe.stop(),
+    }
+
+    with open(RESULTS, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
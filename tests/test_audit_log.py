@@ -0,0 +1,80 @@
+"""Tests for the daily audit log."""
+from datetime import UTC, date, datetime
+
+import pytest
+
+from custom_components.irrigation_estimator.audit_log import (
+    AuditRecord,
+    DailyAuditLog,
+)
+
+
+def _record(day, eto=1.5):
+    return AuditRecord(
+        day,
+        datetime(2024, 1, 1, tzinfo=UTC),
+        0.001,
+        10.0,
+        20.0,
+        30.0,
+        70.0,
+        1013.0,
+        2.0,
+        None,
+        8.0,
+        0.0,
+        eto,
+        eto * 1.2,
+        -eto,
+        -eto,
+        100.0,
+    )
+
+
+def test_audit_log_append_and_read(tmp_path):
+    log = DailyAuditLog(str(tmp_path / "entry.audit"))
+    assert len(log) == 0
+    assert log.last() is None
+    assert log.get(date(2024, 5, 1)) is None
+
+    log.append(_record(date(2024, 5, 1), 1.0))
+    log.append(_record(date(2024, 5, 3), 3.0))
+    log.append(_record(date(2024, 5, 3), 3.5))
+    log.append(_record(date(2024, 5, 4), 4.0))
+
+    assert len(log) == 4
+    assert log.get(date(2024, 5, 1)).evapotranspiration == 1.0
+    assert log.get(date(2024, 5, 2)) is None
+    assert log.get(date(2024, 5, 3)).evapotranspiration == 3.5
+    assert log.get(date(2024, 5, 3)).mean_radiation is None
+    assert log.get(date(2024, 5, 4)).evapotranspiration_tall == pytest.approx(4.8)
+    assert log.last().date == date(2024, 5, 4)
+
+    records = log.read(date(2024, 5, 2), date(2024, 5, 3))
+    assert [record.evapotranspiration for record in records] == [3.0, 3.5]
+    assert len(log.read()) == 4
+
+
+def test_audit_log_rejects_older_records(tmp_path):
+    log = DailyAuditLog(str(tmp_path / "entry.audit"))
+    log.append(_record(date(2024, 5, 3)))
+
+    with pytest.raises(ValueError):
+        DailyAuditLog(log.path).append(_record(date(2024, 5, 2)))
+
+    log.remove()
+    assert len(log) == 0
+
+
+def test_audit_log_drops_partial_record(tmp_path):
+    log = DailyAuditLog(str(tmp_path / "entry.audit"))
+    log.append(_record(date(2024, 5, 1), 1.0))
+    # Crash halfway through the next record
+    with open(log.path, "ab") as file:
+        file.write(b"\x00" * 10)
+    assert len(log) == 1
+    assert log.last().evapotranspiration == 1.0
+
+    DailyAuditLog(log.path).append(_record(date(2024, 5, 2), 2.0))
+
+    assert [record.evapotranspiration for record in log.read()] == [1.0, 2.0]
@@ -0,0 +1,646 @@
+"""Tests for the calculation engine."""
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT
+from homeassistant.core import HomeAssistant, State
+import pytest
+
+from custom_components.irrigation_estimator import engine as engine_module
+from custom_components.irrigation_estimator.audit_log import AuditRecord
+from custom_components.irrigation_estimator.const import (
+    CONF_ACCURATE_SOLAR_RADIATION,
+    CONF_AREA,
+    CONF_ET_MODEL,
+    CONF_FLOW,
+    CONF_MAXIMUM_DURATION,
+    CONF_NUMBER_OF_SPRINKLERS,
+    CONF_PRECIPITATION_SENSOR_TYPE,
+    CONF_SENSOR_HUMIDITY,
+    CONF_SENSOR_PRECIPITATION,
+    CONF_SENSOR_PRESSURE,
+    CONF_SENSOR_SOLAR_RADIATION,
+    CONF_SENSOR_TEMPERATURE,
+    CONF_SENSOR_WINDSPEED,
+    CONF_SOLAR_RADIATION_THRESHOLD,
+    CONF_WEATHER_ENTITY,
+    CONF_WIND_MEASUREMENT_HEIGHT,
+    DOMAIN,
+    MODEL_FAO56,
+    MODEL_HARGREAVES,
+    MODEL_PRIESTLEY_TAYLOR,
+    OPTION_CUMULATIVE,
+    OPTION_HOURLY,
+)
+from custom_components.irrigation_estimator.engine import CalculationEngine
+from custom_components.irrigation_estimator.helpers import TrackerSummary
+from custom_components.irrigation_estimator.models import (
+    TALL_REFERENCE_RATIO,
+    EtModel,
+)
+from custom_components.irrigation_estimator.worker_pool import DATA_WORKER_POOL
+
+CONFIG = {
+    CONF_NUMBER_OF_SPRINKLERS: 4,
+    CONF_FLOW: 10.0,
+    CONF_AREA: 50.0,
+    CONF_SENSOR_TEMPERATURE: "sensor.temperature",
+    CONF_SENSOR_HUMIDITY: "sensor.humidity",
+    CONF_SENSOR_PRESSURE: "sensor.pressure",
+    CONF_SENSOR_WINDSPEED: "sensor.wind",
+    CONF_WIND_MEASUREMENT_HEIGHT: 2.0,
+    CONF_SENSOR_SOLAR_RADIATION: "sensor.radiation",
+    CONF_ACCURATE_SOLAR_RADIATION: False,
+    CONF_SOLAR_RADIATION_THRESHOLD: 200,
+    CONF_SENSOR_PRECIPITATION: "sensor.rain",
+    CONF_PRECIPITATION_SENSOR_TYPE: OPTION_CUMULATIVE,
+    CONF_MAXIMUM_DURATION: 0,
+}
+
+UNITS = {
+    "sensor.temperature": "°C",
+    "sensor.humidity": "%",
+    "sensor.pressure": "hPa",
+    "sensor.wind": "m/s",
+    "sensor.radiation": "W/m²",
+    "sensor.rain": "mm",
+}
+
+START = datetime(2024, 6, 1, tzinfo=UTC)
+
+needs_last_reported = pytest.mark.skipif(
+    not hasattr(State("sensor.pressure", "1000"), "last_reported"),
+    reason="States have no last_reported before Home Assistant 2024.4",
+)
+
+
+def _state(entity_id, value, timestamp):
+    return State(
+        entity_id,
+        str(value),
+        {ATTR_UNIT_OF_MEASUREMENT: UNITS[entity_id]},
+        last_changed=timestamp,
+        last_updated=timestamp,
+    )
+
+
+def _day(date):
+    states = []
+    for hour in range(24):
+        timestamp = date + timedelta(hours=hour, minutes=30)
+        states += [
+            _state("sensor.temperature", 15 + hour / 2, timestamp),
+            _state("sensor.humidity", 80 - hour, timestamp),
+            _state("sensor.pressure", 1000, timestamp),
+            _state("sensor.wind", 2, timestamp),
+            _state("sensor.radiation", 500 if 6 <= hour < 18 else 0, timestamp),
+        ]
+    states.append(_state("sensor.rain", 1.5, date + timedelta(hours=23)))
+    return states
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_block_till_done()
+    hass.data[DATA_WORKER_POOL].shutdown()
+
+
+def _engine(hass, now, config=CONFIG):
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Lawn",
+        data=config,
+        source="user",
+    )
+    return CalculationEngine(hass, entry, clock=lambda: now)
+
+
+async def test_replay_closes_days_by_event_time(hass):
+    engine = _engine(hass, START)
+
+    engine.async_ingest_states(_day(START))
+    assert engine.precipitation == 1.5
+    assert engine.sunshine_tracker.get_hours() == 12
+
+    # The first state of the next day closes the previous one
+    engine.async_ingest_states(
+        [_state("sensor.temperature", 14, START + timedelta(days=1, minutes=5))]
+    )
+    await hass.async_block_till_done()
+
+    assert engine.evapotranspiration > 0
+    assert engine.bucket == pytest.approx(1.5 - engine.evapotranspiration)
+    assert engine.quality == 1.0
+    assert engine.et_model == MODEL_FAO56
+    assert engine.temp_tracker.min == 14
+    records = await engine.async_read_audit_log()
+    assert [record.date for record in records] == [START.date()]
+    assert records[0].sunshine_hours == 12
+    assert engine.as_dict()["windows"]["precipitation_3d"] == 1.5
+
+
+async def test_degrades_to_lighter_models(hass):
+    engine = _engine(hass, START)
+    next_day = START + timedelta(days=1)
+
+    # No wind and pressure, Priestley-Taylor needs neither
+    engine.async_ingest_states(
+        state
+        for state in _day(START)
+        if state.entity_id not in ("sensor.wind", "sensor.pressure")
+    )
+    engine.async_ingest_states([_state("sensor.humidity", 50, next_day)])
+    await hass.async_block_till_done()
+
+    assert engine.et_model == MODEL_PRIESTLEY_TAYLOR
+    assert engine.evapotranspiration > 0
+    # Derived from ETo, Priestley-Taylor has no tall reference
+    assert engine.evapotranspiration_tall == pytest.approx(
+        engine.evapotranspiration * TALL_REFERENCE_RATIO, abs=0.01
+    )
+
+    # Temperature only
+    engine.async_ingest_states(
+        state for state in _day(next_day) if state.entity_id == "sensor.temperature"
+    )
+    engine.async_ingest_states(
+        [_state("sensor.temperature", 14, next_day + timedelta(days=1))]
+    )
+    await hass.async_block_till_done()
+
+    assert engine.et_model == MODEL_HARGREAVES
+    records = await engine.async_read_audit_log()
+    assert [record.date for record in records] == [START.date(), next_day.date()]
+
+
+async def test_failing_model_still_records_the_day(hass):
+    engine = _engine(hass, START)
+
+    def _fail(weather):
+        raise ValueError("math domain error")
+
+    engine._models = [EtModel(MODEL_FAO56, engine._quantities, _fail)]
+    engine.async_ingest_states(_day(START))
+    engine.async_ingest_states(
+        [_state("sensor.temperature", 14, START + timedelta(days=1))]
+    )
+    await hass.async_block_till_done()
+
+    # Carried forward by the default fallback policy
+    assert engine.evapotranspiration == 0
+    assert engine.bucket == 1.5
+    records = await engine.async_read_audit_log()
+    assert [record.precipitation for record in records] == [1.5]
+
+
+async def test_light_model_subscribes_to_fewer_sensors(hass):
+    engine = _engine(hass, START, CONFIG | {CONF_ET_MODEL: MODEL_HARGREAVES})
+
+    assert engine._entity_ids == ["sensor.temperature", "sensor.rain"]
+    assert list(engine.coverage) == [CONF_SENSOR_TEMPERATURE]
+
+    engine.async_ingest_states(_day(START))
+    engine.async_ingest_states(
+        [_state("sensor.temperature", 14, START + timedelta(days=1))]
+    )
+    await hass.async_block_till_done()
+
+    assert engine.et_model == MODEL_HARGREAVES
+    assert engine.quality == 1.0
+
+
+async def test_live_eto_scales_with_elapsed_time(hass):
+    engine = _engine(hass, START)
+    engine._hold_states = False
+    engine.async_ingest_states(
+        state for state in _day(START) if state.last_updated < START + timedelta(hours=12)
+    )
+
+    await engine._async_update_live_eto(START + timedelta(hours=12))
+    rate = engine._live_eto_rate
+    assert rate > 0
+    assert engine.evapotranspiration_today == round(rate * 0.5, 2)
+
+    # Same inputs, the rate is only scaled
+    await engine._async_update_live_eto(START + timedelta(hours=18))
+    assert engine.evapotranspiration_today == round(rate * 0.75, 2)
+    assert engine.worker_pool.as_dict()["tasks"]["live_eto"]["count"] == 1
+
+    engine.async_ingest_states(
+        [_state("sensor.temperature", 14, START + timedelta(days=1))]
+    )
+    assert engine.evapotranspiration_today is None
+    await hass.async_block_till_done()
+
+
+async def test_no_rollover_while_history_is_restored(hass):
+    engine = _engine(hass, START + timedelta(days=1, seconds=10))
+    engine._period_start = START
+    engine.async_ingest_states(_day(START))
+
+    engine._async_midnight(None)
+    await engine.async_update_daily()
+    await engine._async_update_live_eto(START + timedelta(hours=12))
+    await hass.async_block_till_done()
+
+    # Left to the catch-up
+    assert engine._period_start == START
+    assert await engine.async_read_audit_log() == []
+    assert engine.evapotranspiration_today is None
+
+
+@needs_last_reported
+async def test_steady_sensors_cover_recent_reports_only(hass):
+    engine = _engine(hass, START)
+    engine._hold_states = False
+    hass.states.async_set("sensor.pressure", "1000")
+    reported = hass.states.get("sensor.pressure").last_reported
+
+    engine._mark_steady_sensors(reported + timedelta(hours=1))
+    assert engine.coverage[CONF_SENSOR_PRESSURE].hours == 1
+
+    engine.coverage[CONF_SENSOR_PRESSURE].reset()
+    engine._mark_steady_sensors(reported + timedelta(hours=5))
+    assert engine.coverage[CONF_SENSOR_PRESSURE].hours == 0
+
+    # Reporting the same value again counts, though nothing changed
+    hass.states.async_set("sensor.pressure", "1000")
+    state = hass.states.get("sensor.pressure")
+    assert state.last_updated < state.last_reported
+    engine._mark_steady_sensors(state.last_reported + timedelta(hours=1))
+    assert engine.coverage[CONF_SENSOR_PRESSURE].hours == 1
+
+
+@needs_last_reported
+async def test_steady_weather_entity_reading_zero_covers(hass):
+    config = {
+        key: value
+        for key, value in CONFIG.items()
+        if key not in (CONF_SENSOR_TEMPERATURE, CONF_SENSOR_WINDSPEED)
+    } | {CONF_WEATHER_ENTITY: "weather.home"}
+    engine = _engine(hass, START, config)
+    engine._hold_states = False
+    # Freezing and calm
+    hass.states.async_set(
+        "weather.home", "clear-night", {"temperature": 0, "wind_speed": 0}
+    )
+    reported = hass.states.get("weather.home").last_reported
+
+    engine._mark_steady_sensors(reported + timedelta(hours=1))
+
+    assert engine.coverage[CONF_SENSOR_TEMPERATURE].hours == 1
+    assert engine.coverage[CONF_SENSOR_WINDSPEED].hours == 1
+
+
+async def test_entries_without_minimum_coverage_are_not_gated(hass):
+    engine = _engine(hass, START)
+    engine.async_ingest_states(
+        state for state in _day(START) if state.last_updated < START + timedelta(hours=6)
+    )
+    engine.async_ingest_states(
+        [_state("sensor.temperature", 14, START + timedelta(days=1))]
+    )
+    await hass.async_block_till_done()
+
+    assert engine.quality == 0.25
+    assert engine.et_model == MODEL_FAO56
+
+
+async def test_replay_is_independent_of_arrival_order(hass):
+    ordered = _engine(hass, START)
+    ordered.async_ingest_states(_day(START))
+    shuffled = _engine(hass, START)
+    shuffled.async_ingest_states(reversed(_day(START)))
+
+    assert shuffled.sunshine_tracker.get_hours() == ordered.sunshine_tracker.get_hours()
+    assert shuffled.precipitation == ordered.precipitation
+    assert shuffled.temp_tracker.max == ordered.temp_tracker.max
+
+
+async def test_non_numeric_states_are_skipped(hass):
+    engine = _engine(hass, START)
+    states = _day(START)
+    states.insert(
+        len(states) // 2,
+        State("sensor.temperature", "n/a", last_updated=START + timedelta(hours=12)),
+    )
+
+    # The bad state is in the batch that closes the day
+    engine.async_ingest_states(
+        [*states, _state("sensor.temperature", 14, START + timedelta(days=1))]
+    )
+    await hass.async_block_till_done()
+
+    assert engine.et_model == MODEL_FAO56
+    assert engine.temp_tracker.max == 14
+    records = await engine.async_read_audit_log()
+    assert records[0].temp_max == 26.5
+
+
+async def test_states_of_closed_days_are_dropped(hass):
+    engine = _engine(hass, START + timedelta(days=1))
+    engine.async_ingest_states(_day(START))
+
+    assert not engine.temp_tracker.is_tracking()
+
+
+async def test_catch_up_replays_missed_days(hass, monkeypatch):
+    now = START + timedelta(days=3, hours=1)
+    engine = _engine(hass, now)
+    engine._audit_log.append(
+        AuditRecord(
+            (START - timedelta(days=1)).date(),
+            START,
+            0.001,
+            *(None,) * 8,
+            0.0,
+            4.0,
+            4.8,
+            -4.0,
+            -4.0,
+            0.0,
+        )
+    )
+    engine.bucket = -4.0
+    engine.temp_tracker.update(40)
+    states = [*_day(START), *_day(START + timedelta(days=1))]
+    queries = []
+
+    def get_significant_states(hass, start, end, entity_ids, **kwargs):
+        queries.append((start, end, entity_ids))
+        return {
+            entity_id: [
+                state
+                for state in states
+                if state.entity_id == entity_id and start <= state.last_updated < end
+            ]
+            for entity_id in entity_ids
+        }
+
+    hass.config.components.add("recorder")
+    monkeypatch.setattr(
+        engine_module,
+        "get_instance",
+        lambda hass: SimpleNamespace(async_add_executor_job=hass.async_add_executor_job),
+    )
+    monkeypatch.setattr(
+        engine_module.history, "get_significant_states", get_significant_states
+    )
+
+    assert await engine.async_catch_up()
+    await hass.async_block_till_done()
+
+    # One query for all sensors per day, up to the moment the engine subscribed
+    assert queries == [
+        (START + timedelta(days=day), START + timedelta(days=day + 1), list(UNITS))
+        for day in range(3)
+    ] + [(START + timedelta(days=3), now, list(UNITS))]
+    records = await engine.async_read_audit_log()
+    assert [record.date for record in records] == [
+        (START + timedelta(days=day)).date() for day in range(-1, 3)
+    ]
+    # Restored trackers are replaced by the replay
+    assert records[1].temp_max == 26.5
+    # The day without data carries the last ETo forward
+    assert records[3].evapotranspiration == records[2].evapotranspiration
+    assert engine.bucket == pytest.approx(
+        -4.0 + 3.0 - sum(record.evapotranspiration for record in records[1:])
+    )
+    assert engine._period_start == START + timedelta(days=3)
+
+    # Nothing left to catch up
+    assert not await engine.async_catch_up()
+
+
+async def test_catch_up_fills_missed_hours_of_the_day(hass, monkeypatch):
+    now = START + timedelta(hours=12)
+    engine = _engine(
+        hass, now, CONFIG | {CONF_PRECIPITATION_SENSOR_TYPE: OPTION_HOURLY}
+    )
+    engine._audit_log.append(
+        AuditRecord(
+            (START - timedelta(days=1)).date(),
+            START,
+            0.001,
+            *(None,) * 8,
+            0.0,
+            4.0,
+            4.8,
+            -4.0,
+            -4.0,
+            0.0,
+        )
+    )
+    # 2 mm/h of rain from 02:00 to 04:00 while Home Assistant was down,
+    # ramping up and down over an hour
+    states = [
+        _state("sensor.rain", 2 if 2 <= hour < 4 else 0, START + timedelta(hours=hour))
+        for hour in range(12)
+    ] + [_state("sensor.temperature", 20, START + timedelta(hours=1))]
+
+    hass.config.components.add("recorder")
+    monkeypatch.setattr(
+        engine_module,
+        "get_instance",
+        lambda hass: SimpleNamespace(async_add_executor_job=hass.async_add_executor_job),
+    )
+    monkeypatch.setattr(
+        engine_module.history,
+        "get_significant_states",
+        lambda hass, start, end, entity_ids, **kwargs: {
+            entity_id: [state for state in states if state.entity_id == entity_id]
+            for entity_id in entity_ids
+        },
+    )
+
+    assert await engine.async_catch_up()
+    await hass.async_block_till_done()
+
+    assert engine.precipitation == pytest.approx(4.0)
+    assert engine.temp_tracker.max == 20
+    assert engine._period_start == START
+    assert len(await engine.async_read_audit_log()) == 1
+    assert not await engine.async_catch_up()
+
+
+async def test_restore_results_from_audit_log(hass):
+    engine = _engine(hass, START)
+    engine.async_ingest_states(_day(START))
+    engine.async_ingest_states(
+        [_state("sensor.temperature", 14, START + timedelta(days=1, minutes=5))]
+    )
+    await hass.async_block_till_done()
+
+    restored = _engine(hass, START + timedelta(days=1))
+    restored._audit_log = engine._audit_log
+    (record,) = await engine.async_read_audit_log()
+
+    # A state written after the day was logged wins
+    assert not await restored.async_restore_results(
+        record.computed_at + timedelta(minutes=1)
+    )
+    assert restored.bucket == 0.0
+    # A stale one or none does not
+    assert await restored.async_restore_results(
+        record.computed_at - timedelta(days=3)
+    )
+    assert await restored.async_restore_results(None)
+
+    assert restored.evapotranspiration == pytest.approx(engine.evapotranspiration)
+    assert restored.evapotranspiration_tall == pytest.approx(
+        engine.evapotranspiration_tall
+    )
+    assert restored.evapotranspiration_tall > restored.evapotranspiration
+    assert restored.bucket == pytest.approx(engine.bucket)
+    assert restored.runtime == pytest.approx(engine.runtime)
+
+
+async def test_what_if_without_solar_radiation_sensor(hass, monkeypatch):
+    config = {
+        key: value
+        for key, value in CONFIG.items()
+        if key != CONF_SENSOR_SOLAR_RADIATION
+    } | {CONF_ET_MODEL: MODEL_HARGREAVES}
+    engine = _engine(hass, START, config)
+    engine.async_ingest_states(_day(START))
+    engine.async_ingest_states(
+        [_state("sensor.temperature", 14, START + timedelta(days=1))]
+    )
+    await hass.async_block_till_done()
+
+    def state_changes_during_period(*args, **kwargs):
+        raise AssertionError("No sensor to read history of")
+
+    hass.config.components.add("recorder")
+    monkeypatch.setattr(
+        engine_module.history,
+        "state_changes_during_period",
+        state_changes_during_period,
+    )
+
+    result = await engine.async_what_if(None, None, accurate=[True])
+
+    assert result
+
+
+async def test_weather_entity_stands_in_for_sensors(hass):
+    config = {
+        key: value
+        for key, value in CONFIG.items()
+        if key
+        not in (CONF_SENSOR_TEMPERATURE, CONF_SENSOR_HUMIDITY, CONF_SENSOR_PRESSURE)
+    } | {CONF_WEATHER_ENTITY: "weather.home"}
+    engine = _engine(hass, START, config)
+
+    engine.async_ingest_states(
+        [
+            State(
+                "weather.home",
+                "sunny",
+                {
+                    "temperature": 68,
+                    "temperature_unit": "°F",
+                    "humidity": 55,
+                    "pressure": 1010,
+                    "pressure_unit": "hPa",
+                    "wind_speed": 36,
+                    "wind_speed_unit": "km/h",
+                },
+                last_updated=START + timedelta(hours=1),
+            ),
+            _state("sensor.wind", 2, START + timedelta(hours=2)),
+        ]
+    )
+
+    assert engine.temp_tracker.max == pytest.approx(20)
+    assert engine.rh_tracker.max == 55
+    assert engine.pressure_tracker.avg == 1010
+    # The wind sensor is configured, so the weather entity's wind is ignored
+    assert engine.wind_tracker.avg == 2
+    assert engine.coverage[CONF_SENSOR_TEMPERATURE].hours == 1
+
+
+async def test_weather_history_includes_attribute_updates(hass, monkeypatch):
+    config = {
+        key: value
+        for key, value in CONFIG.items()
+        if key != CONF_SENSOR_PRESSURE
+    } | {CONF_WEATHER_ENTITY: "weather.home"}
+    engine = _engine(hass, START + timedelta(hours=3), config)
+    queries = []
+
+    def get_significant_states(hass, start, end, entity_ids, **kwargs):
+        queries.append((entity_ids, kwargs))
+        # The condition stays sunny, only the attributes change
+        return {
+            "weather.home": [
+                State(
+                    "weather.home",
+                    "sunny",
+                    {"pressure": pressure, "pressure_unit": "hPa"},
+                    last_changed=START,
+                    last_updated=START + timedelta(hours=hour),
+                )
+                for hour, pressure in enumerate((1000, 1010, 1020))
+            ]
+        }
+
+    hass.config.components.add("recorder")
+    monkeypatch.setattr(
+        engine_module,
+        "get_instance",
+        lambda hass: SimpleNamespace(async_add_executor_job=hass.async_add_executor_job),
+    )
+    monkeypatch.setattr(
+        engine_module.history, "get_significant_states", get_significant_states
+    )
+    monkeypatch.setattr(
+        engine_module, "reduce_history", lambda *args: TrackerSummary()
+    )
+
+    await engine.async_retrieve_history()
+
+    assert queries == [(["weather.home"], {"significant_changes_only": False})]
+    assert engine.pressure_tracker.avg == pytest.approx(1010)
+
+
+async def test_redundant_sensors_are_fused(hass):
+    config = CONFIG | {
+        CONF_SENSOR_TEMPERATURE: ["sensor.temperature", "sensor.temperature_2"]
+    }
+    engine = _engine(hass, START, config)
+    second = _state("sensor.temperature", 14, START + timedelta(hours=1))
+
+    engine.async_ingest_states(
+        [
+            _state("sensor.temperature", 10, START + timedelta(hours=1)),
+            State("sensor.temperature_2", second.state, second.attributes,
+                  last_updated=second.last_updated),
+        ]
+    )
+
+    assert engine.temp_tracker.summary().count == 2
+    assert engine.temp_tracker.avg == 12
+
+
+async def test_options_are_applied_in_place(hass):
+    engine = _engine(hass, START)
+    engine.async_ingest_states(_day(START))
+    engine.bucket = -10.0
+
+    engine._config_entry = _engine(hass, START, CONFIG | {CONF_FLOW: 20.0})._config_entry
+    assert engine.async_apply_options()
+    assert engine.throughput == 80.0
+    assert engine.runtime == pytest.approx(10.0 / engine.precipitation_rate * 3600)
+    # Live trackers are kept
+    assert engine.temp_tracker.is_tracking()
+
+    engine._config_entry = _engine(
+        hass, START, CONFIG | {CONF_SENSOR_WINDSPEED: "sensor.wind_2"}
+    )._config_entry
+    assert not engine.async_apply_options()
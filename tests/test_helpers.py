@@ -6,10 +6,18 @@ from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
 import pytest
 
 from custom_components.irrigation_estimator.helpers import (
+    HourlyCoverage,
     MinMaxAvgTracker,
+    RateIntegrator,
+    ReorderBuffer,
     SunshineTracker,
+    TrackerSummary,
+    daylight_hours,
     estimate_fao56_daily,
+    estimate_hargreaves_daily,
+    estimate_reference_et_daily,
     get_config_value,
+    summarize_history,
 )
 
 
@@ -61,18 +69,100 @@ def test_min_max_avg_tracker_with_history():
     assert tracker.avg == 20
 
 
+def test_min_max_avg_tracker_history_merges_live_values():
+    tracker = MinMaxAvgTracker()
+    tracker.update(40)
+    tracker.load_history([Mock(state="10"), Mock(state="30")])
+
+    assert tracker.min == 10
+    assert tracker.max == 40
+    assert tracker.avg == pytest.approx(80 / 3)
+
+
+def test_summarize_history():
+    assert summarize_history(
+        [Mock(state="10"), Mock(state=STATE_UNKNOWN), Mock(state="30")]
+    ) == TrackerSummary(10, 30, 40, 2, 2)
+    assert summarize_history([Mock(state=STATE_UNAVAILABLE)]) == TrackerSummary()
+
+
+def test_tracker_summary_merge():
+    a = TrackerSummary(10, 20, 30, 2, 2)
+    b = TrackerSummary(5, 15, 10, 1, 1)
+    c = TrackerSummary(0, 50, 100, 4, 4)
+
+    assert a.merge(b).merge(c) == a.merge(b.merge(c))
+    assert a.merge(TrackerSummary()) == TrackerSummary().merge(a) == a
+    assert a.merge(b).avg == pytest.approx(40 / 3)
+
+    # Redundant sensors fused into one tracker
+    tracker = MinMaxAvgTracker()
+    tracker.update(12)
+    tracker.merge(b)
+    assert tracker.summary() == TrackerSummary(5, 15, 22, 2, 2)
+
+
+def test_hourly_coverage():
+    coverage = HourlyCoverage()
+    for hour in (0, 5, 5, 23):
+        coverage.mark(hour)
+
+    assert coverage.hours == 3
+    assert coverage.mask == 1 | 1 << 5 | 1 << 23
+
+    coverage.reset()
+    assert coverage.hours == 0
+
+
 def test_sunshine_tracker():
     tracker = SunshineTracker(radiation_watermark=200)
-    tracker.update(250)
-    tracker.update(150)
-    tracker.update(250)
+    start = datetime(2024, 5, 1, 12, 0)
+    tracker.update(250, start)
+    tracker.update(150, start + timedelta(hours=1))
+    tracker.update(250, start + timedelta(hours=3))
+    # late samples are ignored
+    tracker.update(250, start + timedelta(hours=2))
 
-    assert tracker.get_hours() > 0
+    assert tracker.get_hours() == 2
 
     tracker.reset()
     assert tracker.get_hours() == 0
 
 
+def test_reorder_buffer():
+    buffer = ReorderBuffer()
+    start = datetime(2024, 5, 1, 12, 0)
+    for minutes, item in ((2, "c"), (0, "a"), (1, "b"), (0, "a2")):
+        buffer.push(start + timedelta(minutes=minutes), item)
+
+    assert buffer.pop_before(start + timedelta(minutes=1)) == ["a", "a2"]
+    assert len(buffer) == 2
+    assert buffer.pop_before(None) == ["b", "c"]
+
+
+def test_rate_integrator():
+    integrator = RateIntegrator()
+    start = datetime(2024, 5, 1, 12, 0)
+
+    assert integrator.update(2.0, start) == 0
+    assert integrator.update(4.0, start + timedelta(minutes=30)) == pytest.approx(1.5)
+    # out of order samples are ignored
+    assert integrator.update(100.0, start) == 0
+    assert integrator.update(0.0, start + timedelta(hours=1)) == pytest.approx(1.0)
+    assert integrator.advance(start + timedelta(hours=2)) == 0
+
+    integrator.update(6.0, start + timedelta(hours=2))
+    assert integrator.advance(start + timedelta(hours=2, minutes=10)) == pytest.approx(1.0)
+
+    integrator.reset()
+    assert integrator.advance(start + timedelta(hours=3)) == 0
+
+
+def test_daylight_hours():
+    assert daylight_hours(80, 0.0) == pytest.approx(12, abs=0.1)
+    assert daylight_hours(172, 52.0) > daylight_hours(355, 52.0)
+
+
 def test_estimate_fao56_daily():
     result = estimate_fao56_daily(
         day_of_year=100,
@@ -90,3 +180,18 @@ def test_estimate_fao56_daily():
     )
     assert isinstance(result, float)
     assert result > 0
+
+
+def test_estimate_reference_et_daily():
+    weather = (100, 45.0, 100, 2, 10, 20, 30, 70, 1013, 2, None, 8)
+    eto, etr = estimate_reference_et_daily(*weather)
+    assert eto == pytest.approx(estimate_fao56_daily(*weather))
+    # Tall crop is rougher, ETr/ETo is typically 1.2 to 1.4 in dry wind
+    assert 1.1 * eto < etr < 1.5 * eto
+
+
+def test_estimate_hargreaves_daily():
+    # FAO-56 example 8, Ra = 32.2 MJ/m2/day in Rio de Janeiro on 3 September
+    assert estimate_hargreaves_daily(
+        246, -22.9, 14.8, 25.6
+    ) == pytest.approx(0.0023 * (20.2 + 17.8) * 10.8**0.5 * 0.408 * 32.2, rel=0.05)
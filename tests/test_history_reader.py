@@ -0,0 +1,76 @@
+"""Tests for the streaming history reduction."""
+from datetime import UTC, datetime, timedelta
+
+from homeassistant.components.recorder.db_schema import Base, States, StatesMeta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from custom_components.irrigation_estimator.helpers import TrackerSummary
+from custom_components.irrigation_estimator.history_reader import reduce_states
+
+START = datetime(2024, 6, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _add_states(session, entity_id, values):
+    meta = StatesMeta(entity_id=entity_id)
+    session.add(meta)
+    session.flush()
+    session.add_all(
+        States(
+            metadata_id=meta.metadata_id,
+            state=value,
+            last_updated_ts=(START + timedelta(seconds=second)).timestamp(),
+        )
+        for second, value in enumerate(values)
+    )
+    session.flush()
+    return meta.metadata_id
+
+
+def test_reduce_states_in_chunks(session):
+    values = [str(second % 100) for second in range(1000)]
+    values[500] = "unavailable"
+    metadata_id = _add_states(session, "sensor.wind", values)
+    _add_states(session, "sensor.pressure", ["1000"] * 10)
+
+    summary = reduce_states(
+        session, metadata_id, START, START + timedelta(seconds=900), chunk_size=64
+    )
+
+    assert (summary.min, summary.max, summary.count) == (0.0, 99.0, 899)
+    assert summary.weighted_sum == 9 * sum(range(100))
+
+
+def test_reduce_states_skips_attribute_updates(session):
+    metadata_id = _add_states(session, "sensor.wind", ["2", "4"])
+    session.add_all(
+        States(
+            metadata_id=metadata_id,
+            state=state,
+            last_changed_ts=(START + timedelta(seconds=changed)).timestamp(),
+            last_updated_ts=(START + timedelta(seconds=updated)).timestamp(),
+        )
+        for state, changed, updated in (("4", 1, 2), ("4", 1, 3), ("6", 4, 4))
+    )
+    session.flush()
+
+    summary = reduce_states(session, metadata_id, START, START + timedelta(hours=1))
+
+    assert (summary.min, summary.max, summary.count) == (2.0, 6.0, 3)
+
+
+def test_reduce_states_without_rows(session):
+    metadata_id = _add_states(session, "sensor.wind", [])
+
+    assert reduce_states(
+        session, metadata_id, START, START + timedelta(hours=1)
+    ) == TrackerSummary()
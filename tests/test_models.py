@@ -0,0 +1,68 @@
+"""Tests for the ET model registry."""
+import pytest
+
+from custom_components.irrigation_estimator.const import (
+    CONF_SENSOR_HUMIDITY,
+    CONF_SENSOR_SOLAR_RADIATION,
+    CONF_SENSOR_TEMPERATURE,
+    MODEL_FAO56,
+    MODEL_HARGREAVES,
+    MODEL_PRIESTLEY_TAYLOR,
+)
+from custom_components.irrigation_estimator.models import (
+    MODELS,
+    TALL_REFERENCE_RATIO,
+    DailyWeather,
+    lighter_models,
+    select_model,
+)
+
+WEATHER = DailyWeather(
+    day_of_year=180,
+    latitude=45.0,
+    elevation=100.0,
+    wind_meas_height=2.0,
+    temp_c_min=15.0,
+    temp_c_max=27.0,
+    rh_min=40.0,
+    rh_max=80.0,
+    atmos_pres=1000.0,
+    wind_m_s=2.0,
+    sol_rad=None,
+    sunshine_hours=8.0,
+)
+
+
+def test_select_best_supported_model():
+    assert select_model(MODELS[MODEL_FAO56].quantities).name == MODEL_FAO56
+    assert (
+        select_model(
+            (CONF_SENSOR_TEMPERATURE, CONF_SENSOR_HUMIDITY, CONF_SENSOR_SOLAR_RADIATION)
+        ).name
+        == MODEL_PRIESTLEY_TAYLOR
+    )
+    assert select_model((CONF_SENSOR_TEMPERATURE,)).name == MODEL_HARGREAVES
+    assert select_model((CONF_SENSOR_HUMIDITY,)) is None
+
+
+def test_lighter_models():
+    assert [model.name for model in lighter_models(MODEL_PRIESTLEY_TAYLOR)] == [
+        MODEL_PRIESTLEY_TAYLOR,
+        MODEL_HARGREAVES,
+    ]
+    models = lighter_models(MODEL_HARGREAVES)
+    assert select_model(MODELS[MODEL_FAO56].quantities, models).name == (
+        MODEL_HARGREAVES
+    )
+
+
+def test_models_agree_on_a_summer_day():
+    eto, etr = MODELS[MODEL_FAO56].estimate(WEATHER)
+    assert etr > eto
+
+    for name in (MODEL_PRIESTLEY_TAYLOR, MODEL_HARGREAVES):
+        estimate, tall = MODELS[name].estimate(WEATHER)
+        assert estimate == pytest.approx(eto, rel=0.2)
+        # Derived from ETo
+        assert tall == pytest.approx(estimate * TALL_REFERENCE_RATIO)
+        assert tall == pytest.approx(etr, rel=0.2)
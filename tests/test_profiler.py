@@ -0,0 +1,34 @@
+"""Tests for the profile session."""
+import pstats
+import threading
+
+from custom_components.irrigation_estimator.profiler import ProfileSession
+
+
+def _work(count):
+    return sum(i * i for i in range(count))
+
+
+def test_profile_session_merges_threads(tmp_path):
+    session = ProfileSession()
+    assert session.runcall(_work, 10) == 285
+
+    thread = threading.Thread(target=session.runcall, args=(_work, 1000))
+    thread.start()
+    thread.join()
+
+    assert session.calls == 2
+    top = session.top(5)
+    assert len(top) <= 5
+    work = next(row for row in top if row["function"].endswith("(_work)"))
+    assert work["calls"] == 2
+
+    path = tmp_path / "engine.prof"
+    assert session.dump(str(path))
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_profile_session_empty(tmp_path):
+    session = ProfileSession()
+    assert session.top(10) == []
+    assert not session.dump(str(tmp_path / "engine.prof"))
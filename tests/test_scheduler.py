@@ -0,0 +1,57 @@
+"""Tests for the irrigation scheduler."""
+import pytest
+
+from custom_components.irrigation_estimator.scheduler import (
+    ZoneDemand,
+    pack_schedule,
+    schedule_duration,
+)
+
+
+def _peak_flow(runs):
+    events = sorted(
+        [(run.start, run.flow) for run in runs] + [(run.end, -run.flow) for run in runs],
+        key=lambda event: (event[0], event[1]),
+    )
+    flow = peak = 0
+    for _, delta in events:
+        flow += delta
+        peak = max(peak, flow)
+    return peak
+
+
+def test_pack_schedule_respects_supply():
+    zones = [
+        ZoneDemand("a", 600, 20),
+        ZoneDemand("b", 300, 10),
+        ZoneDemand("c", 300, 10),
+        ZoneDemand("d", 0, 10),
+    ]
+    runs = pack_schedule(zones, 30)
+
+    assert {run.zone_id for run in runs} == {"a", "b", "c"}
+    assert _peak_flow(runs) <= 30
+    assert schedule_duration(runs) == pytest.approx(600)
+
+
+def test_pack_schedule_cycle_and_soak():
+    runs = pack_schedule([ZoneDemand("a", 900, 10, 300, 600)], 10)
+
+    assert [(run.start, run.duration) for run in runs] == [
+        (0, 300),
+        (900, 300),
+        (1800, 300),
+    ]
+
+
+def test_pack_schedule_fills_soak_with_other_zones():
+    zones = [ZoneDemand("a", 600, 10, 300, 600), ZoneDemand("b", 600, 10)]
+    runs = pack_schedule(zones, 10)
+
+    assert _peak_flow(runs) <= 10
+    assert schedule_duration(runs) == pytest.approx(1200)
+
+
+def test_pack_schedule_rejects_oversized_zone():
+    with pytest.raises(ValueError):
+        pack_schedule([ZoneDemand("a", 600, 40)], 30)
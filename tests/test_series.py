@@ -0,0 +1,55 @@
+"""Tests for the daily series."""
+from datetime import date, timedelta
+
+import pytest
+
+from custom_components.irrigation_estimator.const import (
+    ATTR_EVAPOTRANSPIRATION,
+    ATTR_PRECIPITATION,
+)
+from custom_components.irrigation_estimator.series import DailySeries
+
+START = date(2024, 6, 1)
+
+
+def test_rolling_totals():
+    series = DailySeries(capacity=7)
+    for day in range(10):
+        series.add(START + timedelta(days=day), [day, 1.0, 1.0 - day])
+
+    assert len(series) == 7
+    assert series.total(ATTR_EVAPOTRANSPIRATION, 3) == 7 + 8 + 9
+    assert series.total(ATTR_EVAPOTRANSPIRATION, 7) == sum(range(3, 10))
+    # Windows are capped at the capacity
+    assert series.total(ATTR_PRECIPITATION, 30) == 7
+    assert series.mean(ATTR_EVAPOTRANSPIRATION, 3) == 8
+
+
+def test_missing_values_and_days():
+    series = DailySeries(capacity=7)
+    series.add(START, [2.0, 1.0, -1.0])
+    series.add(START + timedelta(days=1), [None, 0.0, 0.0])
+    # A forced update adds up with the day
+    series.add(START + timedelta(days=1), [None, 2.0, 2.0])
+    series.add(START + timedelta(days=3), [4.0, 0.0, -4.0])
+
+    assert series.total(ATTR_PRECIPITATION, 3) == 2.0
+    assert series.total(ATTR_EVAPOTRANSPIRATION, 3) == 4.0
+    assert series.mean(ATTR_EVAPOTRANSPIRATION, 7) == 3.0
+    assert series.total(ATTR_EVAPOTRANSPIRATION, 1) == 4.0
+    assert DailySeries().total(ATTR_EVAPOTRANSPIRATION, 3) is None
+
+    with pytest.raises(ValueError):
+        series.add(START, [1.0, 1.0, 0.0])
+
+
+def test_as_dict():
+    series = DailySeries()
+    series.add(START, [3.0, 1.0, -2.0])
+
+    windows = series.as_dict()
+    assert windows["evapotranspiration_7d"] == 3.0
+    assert windows["mean_evapotranspiration_30d"] == 3.0
+    assert windows["bucket_delta_3d"] == -2.0
+    # Run time is a level, not a daily amount, and has no totals
+    assert "runtime_3d" not in windows
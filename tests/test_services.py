@@ -0,0 +1,69 @@
+"""Tests for the integration wide services."""
+from homeassistant.config_entries import ConfigEntries, ConfigEntry, ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+import pytest
+
+from custom_components.irrigation_estimator.const import (
+    ATTR_CONFIG_ENTRY_ID,
+    DOMAIN,
+    SERVICE_GET_STATUS,
+)
+from custom_components.irrigation_estimator.engine import CalculationEngine
+from custom_components.irrigation_estimator.services import async_setup_services
+from custom_components.irrigation_estimator.worker_pool import DATA_WORKER_POOL
+
+from .test_engine import CONFIG
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    hass = HomeAssistant(str(tmp_path))
+    hass.config_entries = ConfigEntries(hass, {})
+    async_setup_services(hass)
+    yield hass
+    await hass.async_block_till_done()
+    if DATA_WORKER_POOL in hass.data:
+        hass.data[DATA_WORKER_POOL].shutdown()
+
+
+def _add_entry(hass, title):
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title=title,
+        data=CONFIG,
+        source="user",
+    )
+    entry.runtime_data = CalculationEngine(hass, entry)
+    hass.config_entries._entries[entry.entry_id] = entry
+    entry._async_set_state(hass, ConfigEntryState.LOADED, None)
+    return entry
+
+
+async def test_get_status(hass):
+    entry = _add_entry(hass, "Lawn")
+    entry.runtime_data.bucket = -2.0
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_GET_STATUS, {}, blocking=True, return_response=True
+    )
+
+    status = response["entries"][entry.entry_id]
+    assert status["name"] == "Lawn"
+    assert status["bucket"] == -2.0
+    assert "windows" in status
+
+
+async def test_get_status_unknown_entry(hass):
+    _add_entry(hass, "Lawn")
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_GET_STATUS,
+            {ATTR_CONFIG_ENTRY_ID: "unknown"},
+            blocking=True,
+            return_response=True,
+        )
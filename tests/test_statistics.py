@@ -0,0 +1,67 @@
+"""Tests for long-term statistics rows."""
+from datetime import UTC, date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import homeassistant.util.dt as dt_util
+import pytest
+
+from custom_components.irrigation_estimator.audit_log import AuditRecord
+from custom_components.irrigation_estimator.statistics import (
+    build_statistics,
+    get_statistic_id,
+)
+
+
+def _record(day, evapotranspiration, precipitation, bucket):
+    return AuditRecord(
+        date(2024, 6, 1) + timedelta(days=day),
+        datetime(2024, 6, 2, tzinfo=UTC),
+        0.001,
+        *([None] * 8),
+        precipitation,
+        evapotranspiration,
+        None,
+        precipitation - (evapotranspiration or 0.0),
+        bucket,
+        0.0,
+    )
+
+
+def test_get_statistic_id():
+    assert get_statistic_id("01ABC", "bucket") == "irrigation_estimator:01abc_bucket"
+
+
+def test_build_statistics_running_sums():
+    sums = {"evapotranspiration": 10.0}
+    statistics = build_statistics(
+        [
+            _record(0, 3.0, 0.0, -3.0),
+            _record(1, None, 5.0, 2.0),
+            # a forced update adds to the same day
+            _record(1, 1.0, 0.0, 1.0),
+        ],
+        sums,
+    )
+
+    eto = statistics["evapotranspiration"]
+    assert [row["state"] for row in eto] == [3.0, 1.0]
+    assert [row["sum"] for row in eto] == [13.0, 14.0]
+    assert eto[0]["start"].minute == 0
+    assert eto[1]["start"] - eto[0]["start"] == timedelta(days=1)
+    assert [row["sum"] for row in statistics["precipitation"]] == [0.0, 5.0]
+    assert [row["mean"] for row in statistics["bucket"]] == [-3.0, 1.0]
+    assert sums["evapotranspiration"] == pytest.approx(14.0)
+    assert sums["bucket_delta"] == pytest.approx(1.0)
+
+
+def test_build_statistics_half_hour_zone():
+    dt_util.set_default_time_zone(ZoneInfo("Asia/Kolkata"))
+    try:
+        statistics = build_statistics([_record(0, 3.0, 0.0, -3.0)], {})
+    finally:
+        dt_util.set_default_time_zone(UTC)
+
+    # Local midnight is 18:30 UTC
+    assert statistics["evapotranspiration"][0]["start"] == datetime(
+        2024, 5, 31, 18, tzinfo=UTC
+    )
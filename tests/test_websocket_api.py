@@ -0,0 +1,165 @@
+"""Tests for the WebSocket commands."""
+from datetime import UTC, date, datetime
+
+from homeassistant.config_entries import ConfigEntries, ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+import pytest
+
+from custom_components.irrigation_estimator.audit_log import AuditRecord
+from custom_components.irrigation_estimator.const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_START_DATE,
+    DOMAIN,
+    SIGNAL_ENGINE_UPDATED,
+)
+from custom_components.irrigation_estimator.websocket_api import (
+    ws_history,
+    ws_subscribe,
+)
+from custom_components.irrigation_estimator.worker_pool import DATA_WORKER_POOL
+
+from .test_services import _add_entry
+
+
+class Connection:
+    """Collects what a command sends back."""
+
+    def __init__(self) -> None:
+        """Initialize the connection."""
+        self.subscriptions = {}
+        self.messages = []
+
+    def send_result(self, msg_id, result=None) -> None:
+        """Collect a result."""
+        self.messages.append({"id": msg_id, "type": "result", "result": result})
+
+    def send_message(self, message) -> None:
+        """Collect an event."""
+        self.messages.append(message)
+
+    def events(self) -> list[dict]:
+        """Return the events sent so far."""
+        return [
+            message["event"] for message in self.messages if message["type"] == "event"
+        ]
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    hass = HomeAssistant(str(tmp_path))
+    hass.config_entries = ConfigEntries(hass, {})
+    yield hass
+    await hass.async_block_till_done()
+    if DATA_WORKER_POOL in hass.data:
+        hass.data[DATA_WORKER_POOL].shutdown()
+
+
+def _record(day: int, bucket: float) -> AuditRecord:
+    return AuditRecord(
+        date(2024, 6, day),
+        datetime(2024, 6, day + 1, tzinfo=UTC),
+        0.001,
+        12.0,
+        24.0,
+        40.0,
+        80.0,
+        1000.0,
+        2.0,
+        None,
+        6.0,
+        1.0,
+        3.0,
+        3.6,
+        -2.0,
+        bucket,
+        0.0,
+    )
+
+
+async def test_subscribe_sends_snapshot_then_changes(hass):
+    lawn = _add_entry(hass, "Lawn")
+    beds = _add_entry(hass, "Beds")
+    connection = Connection()
+
+    ws_subscribe(hass, connection, {"id": 5, "type": f"{DOMAIN}/subscribe"})
+
+    assert connection.messages[0] == {"id": 5, "type": "result", "result": None}
+    (snapshot,) = connection.events()
+    assert snapshot["removed"] == []
+    assert set(snapshot["entries"]) == {lawn.entry_id, beds.entry_id}
+    assert snapshot["entries"][lawn.entry_id]["name"] == "Lawn"
+    assert "windows" in snapshot["entries"][lawn.entry_id]
+
+    lawn.runtime_data.bucket = -3.0
+    async_dispatcher_send(hass, SIGNAL_ENGINE_UPDATED, lawn.entry_id)
+    # Nothing changed
+    async_dispatcher_send(hass, SIGNAL_ENGINE_UPDATED, beds.entry_id)
+
+    assert connection.events()[1:] == [
+        {"entries": {lawn.entry_id: {"bucket": -3.0}}, "removed": []}
+    ]
+
+    connection.subscriptions[5]()
+    lawn.runtime_data.bucket = -4.0
+    async_dispatcher_send(hass, SIGNAL_ENGINE_UPDATED, lawn.entry_id)
+    assert len(connection.events()) == 2
+
+
+async def test_subscribe_removes_unloaded_entry(hass):
+    lawn = _add_entry(hass, "Lawn")
+    connection = Connection()
+    ws_subscribe(hass, connection, {"id": 5, "type": f"{DOMAIN}/subscribe"})
+
+    lawn._async_set_state(hass, ConfigEntryState.NOT_LOADED, None)
+    async_dispatcher_send(hass, SIGNAL_ENGINE_UPDATED, lawn.entry_id)
+    # Only once
+    async_dispatcher_send(hass, SIGNAL_ENGINE_UPDATED, lawn.entry_id)
+
+    assert connection.events()[1:] == [{"entries": {}, "removed": [lawn.entry_id]}]
+
+
+async def test_history_is_columnar(hass):
+    lawn = _add_entry(hass, "Lawn")
+    beds = _add_entry(hass, "Beds")
+    for day, bucket in ((1, -2.0), (2, -4.0), (3, -6.0)):
+        await hass.async_add_executor_job(
+            lawn.runtime_data._audit_log.append, _record(day, bucket)
+        )
+    connection = Connection()
+
+    await ws_history.__wrapped__(
+        hass,
+        connection,
+        {"id": 7, "type": f"{DOMAIN}/history", ATTR_START_DATE: date(2024, 6, 2)},
+    )
+
+    (message,) = connection.messages
+    entries = message["result"]["entries"]
+    assert entries[lawn.entry_id] == {
+        "date": ["2024-06-02", "2024-06-03"],
+        "evapotranspiration": [3.0, 3.0],
+        "precipitation": [1.0, 1.0],
+        "bucket_delta": [-2.0, -2.0],
+        "bucket": [-4.0, -6.0],
+        "runtime": [0.0, 0.0],
+    }
+    assert entries[beds.entry_id]["date"] == []
+
+
+async def test_history_of_unknown_entry(hass):
+    lawn = _add_entry(hass, "Lawn")
+    connection = Connection()
+
+    with pytest.raises(ServiceValidationError):
+        await ws_history.__wrapped__(
+            hass,
+            connection,
+            {
+                "id": 7,
+                "type": f"{DOMAIN}/history",
+                ATTR_CONFIG_ENTRY_ID: [lawn.entry_id, "unknown"],
+            },
+        )
+    assert connection.messages == []
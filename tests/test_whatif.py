@@ -0,0 +1,250 @@
+"""Tests for the what-if evaluation."""
+from datetime import UTC, date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from custom_components.irrigation_estimator.audit_log import AuditRecord
+from custom_components.irrigation_estimator.const import (
+    MODEL_HARGREAVES,
+    MODEL_PRIESTLEY_TAYLOR,
+    OPTION_TALL,
+)
+from custom_components.irrigation_estimator.helpers import (
+    estimate_fao56_daily,
+    estimate_hargreaves_daily,
+    estimate_priestley_taylor_daily,
+)
+from custom_components.irrigation_estimator.models import (
+    TALL_REFERENCE_RATIO,
+    lighter_models,
+)
+from custom_components.irrigation_estimator.whatif import (
+    evaluate_grid,
+    mean_by_day,
+    sunshine_hours_by_threshold,
+)
+
+
+def _records(days):
+    return [
+        AuditRecord(
+            date(2024, 6, 1) + timedelta(days=day),
+            datetime(2024, 6, 2, tzinfo=UTC),
+            0.001,
+            12.0,
+            24.0 + day,
+            40.0,
+            80.0,
+            1000.0,
+            2.0,
+            None,
+            6.0,
+            1.0,
+            3.0,
+            3.6,
+            -2.0,
+            -2.0,
+            0.0,
+        )
+        for day in range(days)
+    ]
+
+
+def test_sunshine_hours_by_threshold():
+    timestamps = np.array([0, 3600, 7200, 10800, 14400], dtype=float)
+    values = np.array([0, 100, 500, 300, 500], dtype=float)
+    day_index = np.array([0, 0, 0, 0, 1])
+
+    sunshine = sunshine_hours_by_threshold(
+        timestamps, values, day_index, 3, [0, 300, 400, 600]
+    )
+
+    np.testing.assert_allclose(sunshine[:, 0], [3, 2, 1, 0])
+    np.testing.assert_allclose(sunshine[:, 1], [1, 1, 1, 0])
+    assert np.isnan(sunshine[:, 2]).all()
+
+
+def test_mean_by_day():
+    means = mean_by_day(np.array([1.0, 3.0, 5.0]), np.array([0, 0, 2]), 3)
+    np.testing.assert_allclose(means, [2.0, np.nan, 5.0])
+
+
+def test_evaluate_grid_matches_scalar_estimate():
+    records = _records(3)
+    result = evaluate_grid(
+        records,
+        45.0,
+        100,
+        [2.0, 10.0],
+        [0.23],
+        [3500],
+        [False],
+        np.array([[6.0, 6.0, 6.0]]),
+        np.full(3, np.nan),
+    )
+
+    expected = [
+        round(
+            estimate_fao56_daily(
+                record.date.timetuple().tm_yday,
+                45.0,
+                100,
+                2.0,
+                record.temp_min,
+                record.temp_max,
+                record.rh_min,
+                record.rh_max,
+                record.mean_pressure,
+                record.mean_wind,
+                None,
+                record.sunshine_hours,
+            ),
+            2,
+        )
+        for record in records
+    ]
+    assert result["wind_meas_height"] == [2.0, 10.0]
+    assert result["evapotranspiration"][0] == pytest.approx(sum(expected))
+    assert result["bucket"][0] == pytest.approx(3 * 1.0 - sum(expected))
+    # wind measured higher up is slower at 2 m
+    assert result["evapotranspiration"][1] < result["evapotranspiration"][0]
+
+
+def test_evaluate_grid_keeps_logged_results_without_data():
+    records = _records(3)
+    records[1] = records[1]._replace(temp_min=None)
+    result = evaluate_grid(
+        records,
+        45.0,
+        100,
+        [2.0],
+        [0.23],
+        [3500],
+        [False],
+        np.full((1, 3), 6.0),
+        np.full(3, np.nan),
+    )
+    complete = evaluate_grid(
+        _records(3),
+        45.0,
+        100,
+        [2.0],
+        [0.23],
+        [3500],
+        [False],
+        np.full((1, 3), 6.0),
+        np.full(3, np.nan),
+    )
+    middle = evaluate_grid(
+        records[1:2],
+        45.0,
+        100,
+        [2.0],
+        [0.23],
+        [3500],
+        [False],
+        np.full((1, 1), 6.0),
+        np.full(1, np.nan),
+    )
+    assert middle["evapotranspiration"] == [3.0]
+    assert middle["evapotranspiration_tall"] == [3.6]
+    assert result["evapotranspiration"][0] < complete["evapotranspiration"][0]
+
+
+def test_evaluate_grid_with_lighter_models():
+    records = _records(2)
+    records[1] = records[1]._replace(rh_min=None)
+    result = evaluate_grid(
+        records,
+        45.0,
+        100,
+        [2.0, 10.0],
+        [0.2, 0.25],
+        [3500],
+        [False],
+        np.full((1, 2), 6.0),
+        np.full(2, np.nan),
+        lighter_models(MODEL_PRIESTLEY_TAYLOR),
+    )
+
+    record, degraded = records
+    priestley_taylor = estimate_priestley_taylor_daily(
+        record.date.timetuple().tm_yday,
+        45.0,
+        100,
+        record.temp_min,
+        record.temp_max,
+        record.rh_min,
+        record.rh_max,
+        record.mean_pressure,
+        None,
+        record.sunshine_hours,
+        0.2,
+    )
+    hargreaves = estimate_hargreaves_daily(
+        degraded.date.timetuple().tm_yday,
+        45.0,
+        degraded.temp_min,
+        degraded.temp_max,
+    )
+    assert result["evapotranspiration"][0] == pytest.approx(
+        round(priestley_taylor, 2) + round(hargreaves, 2)
+    )
+    # no wind in Priestley-Taylor
+    assert result["evapotranspiration"][2] == result["evapotranspiration"][0]
+    assert result["evapotranspiration"][1] < result["evapotranspiration"][0]
+    assert result["evapotranspiration_tall"][0] == pytest.approx(
+        round(priestley_taylor * TALL_REFERENCE_RATIO, 2)
+        + round(hargreaves * TALL_REFERENCE_RATIO, 2)
+    )
+
+    hargreaves_only = evaluate_grid(
+        records,
+        45.0,
+        100,
+        [2.0],
+        [0.23],
+        [3500],
+        [False],
+        np.full((1, 2), 6.0),
+        np.full(2, np.nan),
+        lighter_models(MODEL_HARGREAVES),
+    )
+    assert hargreaves_only["evapotranspiration"][0] > 0
+
+
+def test_evaluate_grid_bucket_follows_reference_crop():
+    records = _records(3)
+    result = evaluate_grid(
+        records,
+        45.0,
+        100,
+        [2.0],
+        [0.23],
+        [3500],
+        [False],
+        np.full((1, 3), 6.0),
+        np.full(3, np.nan),
+        reference_crop=OPTION_TALL,
+    )
+    assert result["evapotranspiration_tall"][0] > result["evapotranspiration"][0]
+    assert result["bucket"][0] == pytest.approx(
+        3 * 1.0 - result["evapotranspiration_tall"][0]
+    )
+
+
+def test_evaluate_grid_large():
+    records = _records(30)
+    result = evaluate_grid(
+        records,
+        45.0,
+        100,
+        np.linspace(1, 10, 25).tolist(),
+        np.linspace(0.15, 0.3, 20).tolist(),
+        [2000, 3000, 3500, 4000, 5000, 6000, 7000, 8000, 9000, 10000],
+        [False, True],
+        np.full((10, 30), 6.0),
+        np.full(30, 500.0),
+    )
+    assert len(result["evapotranspiration"]) == 10000
@@ -0,0 +1,50 @@
+"""Tests for the shared worker pool."""
+import asyncio
+import threading
+
+import pytest
+
+from custom_components.irrigation_estimator.worker_pool import WorkerPool
+
+
+async def test_worker_pool_runs_and_accounts_tasks():
+    pool = WorkerPool(1)
+    try:
+        assert await pool.async_run("sum", sum, [1, 2, 3]) == 6
+        stats = pool.as_dict()
+    finally:
+        pool.shutdown()
+
+    assert stats["queue_depth"] == 0
+    assert stats["running"] == 0
+    assert stats["tasks"]["sum"]["count"] == 1
+
+
+async def test_worker_pool_queue_depth():
+    pool = WorkerPool(1)
+    release = threading.Event()
+    try:
+        blocked = asyncio.ensure_future(pool.async_run("wait", release.wait))
+        queued = asyncio.ensure_future(pool.async_run("sum", sum, [1]))
+        await asyncio.sleep(0.05)
+        assert pool.running == 1
+        assert pool.queue_depth == 1
+
+        release.set()
+        assert await blocked is True
+        assert await queued == 1
+        assert pool.queue_depth == 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+async def test_worker_pool_propagates_errors():
+    pool = WorkerPool(1)
+    try:
+        with pytest.raises(ValueError):
+            await pool.async_run("float", float, "x")
+        assert pool.as_dict()["tasks"]["float"]["count"] == 1
+        assert pool.running == 0
+    finally:
+        pool.shutdown()